@@ -0,0 +1,83 @@
+"""
+Compares mapping the contour points of an RT Structure Set to pixels one
+point at a time, as calculate_pixels did before, with the vectorised
+calculate_pixels, and checks that the pixels are identical.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_calculate_pixels [points] [contours] [size]
+"""
+import time
+
+import numpy as np
+
+from benchmark.common import get_arguments
+from src.Model.ROI import calculate_pixels
+
+ORIENTATIONS = {
+    "head first supine": (False, False),
+    "feet first supine": (False, True),
+    "prone": (True, False),
+}
+
+
+def calculate_pixels_loop(pixlut, contour, prone=False, feetfirst=False):
+    """
+    The mapping of calculate_pixels before it was vectorised.
+    """
+    pixels = []
+    np_x = np.array(pixlut[0])
+    np_y = np.array(pixlut[1])
+    for i in range(0, len(contour), 3):
+        if prone:
+            x = np.argmin(np_x < contour[i])
+            y = np.argmin(np_y < contour[i + 1])
+        elif feetfirst:
+            x = np.argmin(np_x < contour[i])
+            y = np.argmax(np_y > contour[i + 1])
+        else:
+            x = np.argmax(np_x > contour[i])
+            y = np.argmax(np_y > contour[i + 1])
+        pixels.append([x, y])
+    return pixels
+
+
+def create_contours(points, contour_count, size):
+    """
+    :return: List of ContourData lists, circles around the centre of a
+        slice of size pixels of 1 mm.
+    """
+    per_contour = points // contour_count
+    angles = np.linspace(0, 2 * np.pi, per_contour, endpoint=False)
+    contours = []
+    for i in range(contour_count):
+        radius = size / 4 + i % 50
+        contours.append(np.stack([
+            radius * np.cos(angles), radius * np.sin(angles),
+            np.full(per_contour, float(i))], axis=1).ravel().tolist())
+    return contours
+
+
+def main(points, contour_count, size):
+    axis = list(np.arange(size) - size / 2 + 0.5)
+    pixlut = [axis, axis]
+    contours = create_contours(points, contour_count, size)
+    print("%s points in %s contours, %s pixels per row"
+          % (points, contour_count, size))
+
+    for label, (prone, feetfirst) in ORIENTATIONS.items():
+        start = time.perf_counter()
+        expected = [calculate_pixels_loop(pixlut, contour, prone, feetfirst)
+                    for contour in contours]
+        loop_time = time.perf_counter() - start
+        start = time.perf_counter()
+        pixels = [calculate_pixels(pixlut, contour, prone, feetfirst)
+                  for contour in contours]
+        vectorised_time = time.perf_counter() - start
+        print("%-17s: point by point %.3f s, vectorised %.3f s (%.0fx), "
+              "identical: %s"
+              % (label, loop_time, vectorised_time,
+                 loop_time / vectorised_time, pixels == expected))
+
+
+if __name__ == "__main__":
+    main(*get_arguments(100000, 200, 512))
@@ -0,0 +1,70 @@
+"""
+Compares colouring the windowed PET slices of a volume with OpenCV, as
+convert_pt_to_heatmap used to (applyColorMap, then a BGR to RGB
+conversion), with the colour map lookup tables, slice by slice and in
+one gather over the raw pixel values of the whole volume, and checks
+that the results are identical. Also compares scaling the coloured
+slices to the size they are shown at, as 24-bit and as 32-bit QImages.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_colormaps [slices] [size]
+"""
+import cv2
+import numpy as np
+from PySide6 import QtCore, QtGui
+
+from benchmark.common import LEVEL, WINDOW, best_time, get_arguments, \
+    random_volume
+from src.Model.CalculateImages import scaled_qimage
+from src.Model.Colormaps import apply_colormap, apply_window_colormap, \
+    unpack_rgb
+from src.Model.WindowingLUT import apply_window
+
+# Size the slices are scaled to
+SCALED_SIZE = 700
+
+
+def main(slices, size):
+    volume = random_volume((slices, size, size))
+    print("%s slices of %sx%s" % (slices, size, size))
+
+    def opencv():
+        return np.stack([cv2.cvtColor(cv2.applyColorMap(
+            apply_window(volume[i], WINDOW, LEVEL), cv2.COLORMAP_HOT),
+            cv2.COLOR_BGR2RGB) for i in range(slices)])
+
+    opencv_time, expected = best_time(opencv)
+    print("OpenCV, per slice: %.3f s" % opencv_time)
+
+    lut_time, rgb = best_time(lambda: np.stack(
+        [apply_colormap(apply_window(volume[i], WINDOW, LEVEL), "Heat")
+         for i in range(slices)]))
+    print("lookup table, per slice: %.3f s (%.1fx, identical: %s)"
+          % (lut_time, opencv_time / lut_time,
+             np.array_equal(unpack_rgb(rgb), expected)))
+
+    volume_time, rgb = best_time(
+        lambda: apply_window_colormap(volume, WINDOW, LEVEL, "Heat"))
+    print("window and colour lookup table, whole volume: %.3f s "
+          "(%.1fx, identical: %s)"
+          % (volume_time, opencv_time / volume_time,
+             np.array_equal(unpack_rgb(rgb), expected)))
+
+    def scale(image):
+        return image.scaled(SCALED_SIZE, SCALED_SIZE,
+                            QtCore.Qt.IgnoreAspectRatio,
+                            QtCore.Qt.SmoothTransformation)
+
+    rgb888_time, _ = best_time(lambda: [scale(QtGui.QImage(
+        expected[i], size, size, size * 3, QtGui.QImage.Format_RGB888))
+        for i in range(slices)])
+    print("scaling RGB888 images: %.3f s" % rgb888_time)
+    rgb32_time, _ = best_time(lambda: [scaled_qimage(
+        volume[i], WINDOW, LEVEL, SCALED_SIZE, SCALED_SIZE, color="Heat")
+        for i in range(slices)])
+    print("windowing, colouring and scaling RGB32 images: %.3f s (%.1fx)"
+          % (rgb32_time, (opencv_time + rgb888_time) / rgb32_time))
+
+
+if __name__ == "__main__":
+    main(*get_arguments(200, 512))
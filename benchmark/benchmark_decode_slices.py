@@ -0,0 +1,127 @@
+"""
+Measures the throughput of CalculateImages.decode_slices, which decodes
+and rescales the pixel data of an image series into a volume, for an
+uncompressed, an RLE Lossless and (if Pillow can write JPEG 2000) a
+JPEG 2000 Lossless series, with different numbers of threads.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_decode_slices [slices] [size] [workers ...]
+"""
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, features
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.encaps import encapsulate
+from pydicom.uid import ExplicitVRLittleEndian, JPEG2000Lossless, \
+    RLELossless, generate_uid
+
+from benchmark.common import get_arguments
+from src.Model import ImageLoading
+from src.Model.CalculateImages import decode_slices
+
+TRANSFER_SYNTAXES = ["uncompressed", "RLE", "JPEG 2000"]
+
+
+def create_series(directory, slices, size, transfer_syntax):
+    """
+    Write a series of CT images of random pixel values.
+    :param directory: Directory to write the files to.
+    :param slices: Number of slices.
+    :param size: Number of rows and columns of each slice.
+    :param transfer_syntax: One of TRANSFER_SYNTAXES.
+    :return: List of the paths of the files.
+    """
+    series_uid = generate_uid()
+    rng = np.random.default_rng(0)
+    files = []
+    for i in range(slices):
+        path = os.path.join(directory, "ct%04d.dcm" % i)
+        file_meta = FileMetaDataset()
+        file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.2"
+        file_meta.MediaStorageSOPInstanceUID = generate_uid()
+        file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+        ds = FileDataset(path, {}, file_meta=file_meta,
+                         preamble=b"\0" * 128)
+        ds.SOPClassUID = file_meta.MediaStorageSOPClassUID
+        ds.SOPInstanceUID = file_meta.MediaStorageSOPInstanceUID
+        ds.SeriesInstanceUID = series_uid
+        ds.Modality = "CT"
+        ds.ImageOrientationPatient = [1, 0, 0, 0, 1, 0]
+        ds.ImagePositionPatient = [0, 0, i * 2.5]
+        ds.PixelSpacing = [1, 1]
+        ds.RescaleSlope = 1
+        ds.RescaleIntercept = -1024
+        ds.Rows = size
+        ds.Columns = size
+        ds.BitsAllocated = 16
+        ds.BitsStored = 16
+        ds.HighBit = 15
+        ds.PixelRepresentation = 0
+        ds.SamplesPerPixel = 1
+        ds.PhotometricInterpretation = "MONOCHROME2"
+        pixels = rng.integers(0, 2000, (size, size)).astype(np.uint16)
+        ds.add_new(0x7FE00010, "OW", pixels.tobytes())
+        if transfer_syntax == "RLE":
+            ds.compress(RLELossless)
+        elif transfer_syntax == "JPEG 2000":
+            frame = io.BytesIO()
+            Image.fromarray(pixels).save(frame, format="JPEG2000",
+                                         no_jp2=True, irreversible=False)
+            ds.file_meta.TransferSyntaxUID = JPEG2000Lossless
+            ds.add_new(0x7FE00010, "OB", encapsulate([frame.getvalue()]))
+        ds.save_as(path, enforce_file_format=True)
+        files.append(path)
+    return files
+
+
+def time_decode(files, max_workers, repeats=3):
+    """
+    :param files: List of the files of a series.
+    :param max_workers: Number of threads passed to decode_slices.
+    :param repeats: Number of times the series is decoded.
+    :return: Tuple (best time in seconds, voxel array)
+    """
+    best_time = None
+    voxels = None
+    for _ in range(repeats):
+        read_data_dict, _ = ImageLoading.get_datasets(files, max_workers=1)
+        datasets = [read_data_dict[key] for key in read_data_dict
+                    if isinstance(key, int)]
+        start = time.perf_counter()
+        voxels = decode_slices(datasets, False, True, max_workers)
+        elapsed = time.perf_counter() - start
+        if best_time is None or elapsed < best_time:
+            best_time = elapsed
+    return best_time, voxels
+
+
+def main(slices, size, worker_counts):
+    print("%s slices of %sx%s, %s CPUs"
+          % (slices, size, size, os.cpu_count()))
+    for transfer_syntax in TRANSFER_SYNTAXES:
+        if transfer_syntax == "JPEG 2000" \
+                and not features.check("jpg_2000"):
+            print("%s: skipped, Pillow cannot write it" % transfer_syntax)
+            continue
+        with tempfile.TemporaryDirectory() as directory:
+            files = create_series(directory, slices, size, transfer_syntax)
+            serial_time, serial_voxels = time_decode(files, 1)
+            print("%-12s 1 thread:  %.3f s (%.0f slices/s)"
+                  % (transfer_syntax, serial_time, slices / serial_time))
+            for workers in worker_counts:
+                parallel_time, voxels = time_decode(files, workers)
+                print("%-12s %d threads: %.3f s (%.0f slices/s, %.2fx, "
+                      "identical result: %s)"
+                      % (transfer_syntax, workers, parallel_time,
+                         slices / parallel_time,
+                         serial_time / parallel_time,
+                         np.array_equal(voxels, serial_voxels)))
+
+
+if __name__ == "__main__":
+    arguments = get_arguments(100, 512)
+    main(arguments[0], arguments[1], arguments[2:] or [2, 4])
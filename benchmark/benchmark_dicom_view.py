@@ -0,0 +1,99 @@
+"""
+Measures the frame time of the DICOM views: the time update_view takes
+when the slider moves to another slice, when the same slice is shown
+again (e.g. after another view has moved), and when the cut lines of
+the four views move, with ROIs displayed on every slice.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_dicom_view [slices] [size] [ROIs]
+"""
+import time
+
+import numpy as np
+from PySide6 import QtCore, QtGui
+
+from benchmark.common import PIXMAP_ASPECT, get_arguments, \
+    random_volume, start_application
+from src.Model.CalculateImages import get_pixmaps
+from src.Model.PatientDictContainer import PatientDictContainer
+from src.View.mainpage.DicomCoronalView import DicomCoronalView
+from src.View.mainpage.DicomSagittalView import DicomSagittalView
+
+
+def create_polygons(slices, size, roi_count):
+    """
+    :return: Dictionary of the polygons of each ROI on each slice, like
+        dict_polygons_coronal: circles of 100 points.
+    """
+    angles = np.linspace(0, 2 * np.pi, 100, endpoint=False)
+    polygons = {}
+    for roi in range(roi_count):
+        radius = size / 4 + roi * 4
+        polygons["ROI %s" % roi] = [
+            [QtGui.QPolygonF([QtCore.QPointF(*point) for point in zip(
+                size / 2 + radius * np.cos(angles) + i % 7,
+                size / 2 + radius * np.sin(angles))])]
+            for i in range(slices)]
+    return polygons
+
+
+def frame_time(view, values, repeats=3):
+    """
+    :return: Mean time in milliseconds of update_view after each slider
+        value.
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for value in values:
+            view.slider.blockSignals(True)
+            view.slider.setValue(value)
+            view.slider.blockSignals(False)
+            view.update_view()
+    return (time.perf_counter() - start) / (repeats * len(values)) * 1000
+
+
+def main(slices, size, roi_count):
+    start_application()
+    volume = random_volume((size, slices, size))
+    print("%s slices of %sx%s, %s ROIs" % (slices, size, size, roi_count))
+
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    pixmaps = get_pixmaps(volume, 400, 800, PIXMAP_ASPECT)
+    for renderer in pixmaps:
+        # Render every pixmap first, so only the scene is measured
+        for i in range(len(renderer)):
+            renderer[i]
+    rois = {roi: {"name": "ROI %s" % roi} for roi in range(roi_count)}
+    patient_dict_container.set_initial_values(
+        None, {}, {}, pixmaps_axial=pixmaps[0], pixmaps_coronal=pixmaps[1],
+        pixmaps_sagittal=pixmaps[2], rois=rois,
+        selected_rois=list(rois),
+        roi_color_dict={roi: QtGui.QColor(255, 50 * roi % 255, 0)
+                        for roi in rois},
+        dict_polygons_coronal=create_polygons(slices, size, roi_count))
+
+    sagittal = DicomSagittalView(cut_line_color=QtGui.QColor(255, 0, 0))
+    coronal = DicomCoronalView(roi_color={},
+                               cut_line_color=QtGui.QColor(0, 0, 255))
+    coronal.set_views(sagittal, sagittal)
+
+    print("new slice:  %.2f ms per frame"
+          % frame_time(coronal, range(len(pixmaps[1]))))
+    print("same slice: %.2f ms per frame"
+          % frame_time(coronal, [len(pixmaps[1]) // 2] * 50))
+
+    # Moving the cut lines shows the same coronal slice
+    values = range(len(pixmaps[2]))
+    start = time.perf_counter()
+    for value in values:
+        sagittal.slider.blockSignals(True)
+        sagittal.slider.setValue(value)
+        sagittal.slider.blockSignals(False)
+        coronal.update_view()
+    print("cut lines:  %.2f ms per frame"
+          % ((time.perf_counter() - start) / len(values) * 1000))
+
+
+if __name__ == "__main__":
+    main(*get_arguments(100, 512, 10))
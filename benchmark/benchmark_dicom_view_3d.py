@@ -0,0 +1,73 @@
+"""
+Compares the cost of a window and level change in the 3D view when the
+windowed volume is rebuilt and copied into VTK, as DicomView3D used to,
+with updating the transfer functions of the volume property.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_dicom_view_3d [slices] [size]
+"""
+import time
+
+import numpy as np
+from vtkmodules.util import numpy_support
+from vtkmodules.util.vtkConstants import VTK_INT
+from vtkmodules.vtkCommonDataModel import vtkImageData
+
+from benchmark.common import get_arguments, random_volume, \
+    start_application
+from src.Model.PatientDictContainer import PatientDictContainer
+from src.Model.WindowingLUT import apply_window
+from src.View.mainpage.DicomView3D import DicomView3D
+
+WINDOWS = [(400, 800), (600, 700), (1500, 0), (350, 1000)]
+
+
+def rebuild_volume(volume, imdata, window, level):
+    """
+    The window and level change of DicomView3D before it used transfer
+    functions.
+    """
+    windowed = apply_window(volume.transpose(), window, level)
+    three_dimension_np_array = windowed.view(np.int8).transpose()
+    depth_array = numpy_support.numpy_to_vtk(
+        three_dimension_np_array.ravel(order="F"), deep=True,
+        array_type=VTK_INT)
+    imdata.GetPointData().SetScalars(depth_array)
+
+
+def main(slices, size):
+    start_application()
+    volume = random_volume((slices, size, size))
+    print("%s slices of %sx%s" % (slices, size, size))
+
+    imdata = vtkImageData()
+    imdata.SetDimensions(volume.shape)
+    start = time.perf_counter()
+    for window, level in WINDOWS:
+        rebuild_volume(volume, imdata, window, level)
+    rebuild_time = (time.perf_counter() - start) / len(WINDOWS)
+    print("rebuilding the volume: %.1f ms per window" % (rebuild_time * 1000))
+
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    patient_dict_container.set_initial_values(
+        None, {}, {}, pixel_values=volume, window=400, level=800)
+    view = DicomView3D()
+    view.initialize_volume_color()
+    start = time.perf_counter()
+    view.convert_pixel_values_to_vtk_3d_array()
+    print("uploading the raw volume once: %.1f ms"
+          % ((time.perf_counter() - start) * 1000))
+
+    start = time.perf_counter()
+    for window, level in WINDOWS:
+        patient_dict_container.set("window", window)
+        patient_dict_container.set("level", level)
+        view.update_volume_by_window_level()
+    update_time = (time.perf_counter() - start) / len(WINDOWS)
+    print("updating the transfer functions: %.3f ms per window (%.0fx)"
+          % (update_time * 1000, rebuild_time / update_time))
+
+
+if __name__ == "__main__":
+    main(*get_arguments(200, 512))
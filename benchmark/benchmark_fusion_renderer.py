@@ -0,0 +1,63 @@
+"""
+Compares rendering the fusion views as get_fused_window used to, which
+converted the whole fixed image to an array for every slice of every
+view, with the FusedPixmapRenderers, which convert both images once and
+colour-mix a slice when it is shown.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_fusion_renderer [slices] [size]
+"""
+import time
+
+import SimpleITK as sitk
+
+from benchmark.common import get_arguments, random_volume, \
+    start_application
+from src.constants import CT_RESCALE_INTERCEPT
+from src.Model.FusionRenderer import get_colormix, get_fused_pixmaps
+
+WINDOW = 500
+LEVEL = CT_RESCALE_INTERCEPT - 250
+
+
+def main(slices, size):
+    start_application()
+    fixed = sitk.GetImageFromArray(
+        random_volume((slices, size, size), -1000, 1500))
+    moving = sitk.GetImageFromArray(
+        random_volume((slices, size, size), -1000, 1500, seed=1))
+    print("%s slices of %sx%s" % (slices, size, size))
+
+    # The conversions and colour mixes of the previous get_fused_window,
+    # without the pixmaps
+    start = time.perf_counter()
+    for view, count in (("z", slices), ("y", size), ("x", size)):
+        for i in range(count):
+            sitk.GetArrayFromImage(fixed)
+            image_slice = {"z": (i,), "y": (slice(None), i),
+                           "x": (slice(None), slice(None), i)}[view]
+            get_colormix(sitk.GetArrayViewFromImage(fixed)[image_slice],
+                         sitk.GetArrayViewFromImage(moving)[image_slice],
+                         (-250, 500))
+    print("per slice conversion, every slice: %.3f s"
+          % (time.perf_counter() - start))
+
+    start = time.perf_counter()
+    renderers = get_fused_pixmaps(sitk.GetArrayFromImage(fixed),
+                                  sitk.GetArrayFromImage(moving),
+                                  WINDOW, LEVEL)
+    for renderer in renderers:
+        renderer[len(renderer) // 2]
+    print("renderers, first image of the 3 views: %.3f s"
+          % (time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for renderer in renderers:
+        renderer.set_window(WINDOW * 2, LEVEL)
+        renderer[len(renderer) // 2]
+    print("renderers, new window in the 3 views: %.3f s"
+          % (time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main(*get_arguments(100, 256))
@@ -0,0 +1,55 @@
+"""
+Compares the serial and the header-first parallel modes of
+ImageLoading.get_datasets on a directory of DICOM files.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_get_datasets <directory> [workers ...]
+"""
+import os
+
+from benchmark.common import best_time, get_arguments, get_directory
+from src.Model import ImageLoading
+
+
+def find_files(directory):
+    """
+    :param directory: Directory to search.
+    :return: List of the paths of all files in the directory and its
+        subdirectories.
+    """
+    file_list = []
+    for root, dirs, files in os.walk(directory, topdown=True):
+        for name in files:
+            file_list.append(os.path.join(root, name))
+    return file_list
+
+
+def time_get_datasets(files, max_workers, repeats=3):
+    """
+    :param files: List of files to pass to get_datasets.
+    :param max_workers: Number of workers to pass to get_datasets.
+    :param repeats: Number of times to run get_datasets.
+    :return: Tuple (best time in seconds, file_names_dict)
+    """
+    return best_time(lambda: ImageLoading.get_datasets(
+        files, max_workers=max_workers)[1], repeats)
+
+
+def main(directory, worker_counts):
+    files = find_files(directory)
+    print("%s files in %s" % (len(files), directory))
+
+    serial_time, serial_files = time_get_datasets(files, 1)
+    print("serial:     %.3f s" % serial_time)
+
+    for workers in worker_counts:
+        parallel_time, parallel_files = time_get_datasets(files, workers)
+        identical = list(serial_files.items()) == \
+            list(parallel_files.items())
+        print("%2d workers: %.3f s (%.2fx, identical result: %s)"
+              % (workers, parallel_time, serial_time / parallel_time,
+                 identical))
+
+
+if __name__ == "__main__":
+    main(get_directory(__doc__), get_arguments(first=2) or [2, 4, 8])
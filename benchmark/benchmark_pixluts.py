@@ -0,0 +1,87 @@
+"""
+Compares calculating the pixluts of every slice of a series one pixel at
+a time, as get_pixluts did before, with the Pixluts looking them up, and
+checks that the pixluts are identical.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_pixluts [slices] [size]
+"""
+import time
+
+import numpy as np
+from pydicom import dataset
+
+from benchmark.common import get_arguments
+from src.Model.Pixluts import get_pixluts
+
+
+def calculate_matrix_loop(img_ds):
+    """
+    The calculation of calculate_matrix before it was vectorised.
+    """
+    dist_row = img_ds.PixelSpacing[0]
+    dist_col = img_ds.PixelSpacing[1]
+    orientation = img_ds.ImageOrientationPatient
+    position = img_ds.ImagePositionPatient
+    matrix_m = np.array(
+        [[orientation[0] * dist_row, orientation[3] * dist_col, 0,
+          position[0]],
+         [orientation[1] * dist_row, orientation[4] * dist_col, 0,
+          position[1]],
+         [orientation[2] * dist_row, orientation[5] * dist_col, 0,
+          position[2]],
+         [0, 0, 0, 1]], dtype=float)
+    x = []
+    y = []
+    for i in range(0, img_ds.Columns):
+        i_mat = np.matmul(matrix_m, np.array([[i], [0], [0], [1]], float))
+        x.append(float(i_mat[0, 0]))
+    for j in range(0, img_ds.Rows):
+        j_mat = np.matmul(matrix_m, np.array([[0], [j], [0], [1]], float))
+        y.append(float(j_mat[1, 0]))
+    return np.array(x), np.array(y)
+
+
+def create_series(slices, size):
+    """
+    :return: Dictionary of the datasets of a series of slices of size
+        pixels of 0.976 mm, 2.5 mm apart, keyed as in
+        PatientDictContainer.dataset.
+    """
+    series = {}
+    for i in range(slices):
+        img_ds = dataset.Dataset()
+        img_ds.SOPInstanceUID = "1.2.3.%s" % i
+        img_ds.PixelSpacing = [0.9765625, 0.9765625]
+        img_ds.ImageOrientationPatient = [1, 0, 0, 0, 1, 0]
+        img_ds.ImagePositionPatient = [-250.0, -180.5, -400.0 + 2.5 * i]
+        img_ds.Rows = size
+        img_ds.Columns = size
+        series[i] = img_ds
+    return series
+
+
+def main(slices, size):
+    series = create_series(slices, size)
+    print("%s slices of %sx%s" % (slices, size, size))
+
+    start = time.perf_counter()
+    expected = {img_ds.SOPInstanceUID: calculate_matrix_loop(img_ds)
+                for img_ds in series.values()}
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pixluts = get_pixluts(series)
+    looked_up = {uid: pixluts[uid] for uid in pixluts}
+    lookup_time = time.perf_counter() - start
+
+    identical = all(np.array_equal(looked_up[uid][axis], expected[uid][axis])
+                    for uid in expected for axis in (0, 1))
+    print("pixel by pixel %.3f s, looked up %.4f s (%.0fx), %s pixluts "
+          "calculated, identical: %s"
+          % (loop_time, lookup_time, loop_time / lookup_time,
+             pixluts.get_statistics()["calculated"], identical))
+
+
+if __name__ == "__main__":
+    main(*get_arguments(200, 512))
@@ -0,0 +1,66 @@
+"""
+Compares rendering every pixmap of a volume up front, as get_pixmaps
+used to, with rendering the pixmaps on demand while scrolling back and
+forth through the axial slices, and reports the hit rate and memory use
+of the pixmap cache and the time to show a new window and level.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_pixmap_renderer [slices] [size] [cache MB]
+"""
+import time
+
+from benchmark.common import LEVEL, PIXMAP_ASPECT, WINDOW, \
+    get_arguments, random_volume, start_application
+from src.Model.CalculateImages import get_pixmaps
+from src.Model.PixmapRenderer import PixmapCache, pixmap_bytes
+
+
+def main(slices, size, cache_mb):
+    start_application()
+    volume = random_volume((slices, size, size))
+    print("%s slices of %sx%s" % (slices, size, size))
+
+    start = time.perf_counter()
+    pixmaps = get_pixmaps(volume, WINDOW, LEVEL, PIXMAP_ASPECT)
+    total_bytes = 0
+    for renderer in pixmaps:
+        for i in range(len(renderer)):
+            total_bytes += pixmap_bytes(renderer.render(i))
+    print("up front:  %.3f s, %.0f MB of pixmaps"
+          % (time.perf_counter() - start, total_bytes / 2 ** 20))
+
+    start = time.perf_counter()
+    axial = get_pixmaps(volume, WINDOW, LEVEL, PIXMAP_ASPECT)[0]
+    axial.cache = PixmapCache(cache_mb * 2 ** 20)
+    axial[slices // 2]
+    print("on demand: first image after %.3f s"
+          % (time.perf_counter() - start))
+
+    # Scroll through a third of the slices around the centre, 5 times
+    scroll = list(range(slices // 3, 2 * slices // 3))
+    start = time.perf_counter()
+    for _ in range(5):
+        for i in scroll + scroll[::-1]:
+            axial[i]
+    elapsed = time.perf_counter() - start
+    statistics = axial.get_statistics()
+    print("scrolling: %.2f ms per slice, hit rate %.1f%%, %s evictions, "
+          "%.0f of %.0f MB used"
+          % (elapsed / (10 * len(scroll)) * 1000,
+             statistics["hit_rate"] * 100, statistics["evictions"],
+             statistics["resident_bytes"] / 2 ** 20,
+             statistics["budget_bytes"] / 2 ** 20))
+
+    # A new window and level only re-renders the 4 slices on screen
+    pixmaps = get_pixmaps(volume, WINDOW, LEVEL, PIXMAP_ASPECT)
+    start = time.perf_counter()
+    for renderer in pixmaps:
+        renderer.set_window(WINDOW * 2, LEVEL - 100)
+    for renderer in (pixmaps[0], pixmaps[0], pixmaps[1], pixmaps[2]):
+        renderer[len(renderer) // 2]
+    print("windowing: %.1f ms until the 4 views show the new window"
+          % ((time.perf_counter() - start) * 1000))
+
+
+if __name__ == "__main__":
+    main(*get_arguments(200, 512, 256))
@@ -0,0 +1,120 @@
+"""
+Selects and deselects each of a number of ROIs several times, once
+calculating the polygons of the three views every time an ROI is
+selected, as StructureTab.update_dict_polygons did before, and once
+keeping them in a PolygonCache, and reports the time taken.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_polygon_cache [ROIs] [toggles] [slices]
+"""
+import time
+
+import numpy as np
+
+from benchmark.common import get_arguments, start_application
+from benchmark.benchmark_pixluts import create_series
+from src.Model.PatientDictContainer import PatientDictContainer
+from src.Model.Pixluts import get_pixluts
+from src.Model.PolygonCache import PolygonCache
+from src.Model.ROI import calc_roi_polygon, get_roi_contour_pixel, \
+    transform_rois_contours
+
+SIZE = 512
+VIEW_ASPECTS = {"axial": None, "coronal": 1.0, "sagittal": 1.0}
+
+
+def create_raw_contours(series, roi_count, points):
+    """
+    :return: Dictionary of the ContourData of each slice of each ROI,
+        circles of points points on every slice, as returned by
+        ImageLoading.get_raw_contour_data.
+    """
+    angles = np.linspace(0, 2 * np.pi, points, endpoint=False)
+    raw_contour = {}
+    for roi in range(roi_count):
+        radius = 20 + 5 * roi
+        raw_contour["ROI %s" % roi] = {
+            img_ds.SOPInstanceUID: [np.stack([
+                radius * np.cos(angles), radius * np.sin(angles),
+                np.full(points, img_ds.ImagePositionPatient[2])],
+                axis=1).ravel().tolist()]
+            for img_ds in series.values()}
+    return raw_contour
+
+
+def calculate_dict_polygons(patient_dict_container, roi_name):
+    """
+    The calculation of the polygons of an ROI in update_dict_polygons.
+    """
+    polygons = {"axial": {}, "coronal": {}, "sagittal": {}}
+    contours_axial = get_roi_contour_pixel(
+        patient_dict_container.get("raw_contour"), [roi_name],
+        patient_dict_container.get("pixluts"))
+    contours_coronal, contours_sagittal = \
+        transform_rois_contours(contours_axial)
+    for slice_id in patient_dict_container.get("dict_uid").values():
+        polygons["axial"][slice_id] = calc_roi_polygon(
+            roi_name, slice_id, contours_axial)
+    for slice_id in range(SIZE):
+        polygons["coronal"][slice_id] = calc_roi_polygon(
+            roi_name, slice_id, contours_coronal)
+        polygons["sagittal"][slice_id] = calc_roi_polygon(
+            roi_name, slice_id, contours_sagittal)
+    return polygons
+
+
+def toggle(patient_dict_container, roi_names, toggles, polygon_cache):
+    """
+    Selects each ROI toggles times.
+    :param polygon_cache: PolygonCache keeping the polygons, or None to
+        calculate them every time.
+    :return: Seconds taken.
+    """
+    start = time.perf_counter()
+    for _ in range(toggles):
+        for roi_name in roi_names:
+            if polygon_cache is None:
+                calculate_dict_polygons(patient_dict_container, roi_name)
+                continue
+            polygon_cache.use_rtss(patient_dict_container.get("dataset_rtss"))
+            polygons = {view: polygon_cache.get(roi_name, view, aspect)
+                        for view, aspect in VIEW_ASPECTS.items()}
+            if None in polygons.values():
+                polygons = calculate_dict_polygons(patient_dict_container,
+                                                   roi_name)
+                for view, aspect in VIEW_ASPECTS.items():
+                    polygon_cache.put(roi_name, view, aspect,
+                                      polygons[view])
+    return time.perf_counter() - start
+
+
+def main(roi_count, toggles, slices):
+    start_application()
+    series = create_series(slices, SIZE)
+    raw_contour = create_raw_contours(series, roi_count, 200)
+    print("%s ROIs on %s slices, each selected %s times"
+          % (roi_count, slices, toggles))
+
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    patient_dict_container.set_initial_values(
+        None, series, {}, pixluts=get_pixluts(series),
+        raw_contour=raw_contour, dataset_rtss=object(),
+        dict_uid={i: img_ds.SOPInstanceUID
+                  for i, img_ds in series.items()})
+    roi_names = list(raw_contour)
+
+    uncached = toggle(patient_dict_container, roi_names, toggles, None)
+    polygon_cache = PolygonCache()
+    cached = toggle(patient_dict_container, roi_names, toggles,
+                    polygon_cache)
+    statistics = polygon_cache.get_statistics()
+    print("calculated every time %.2f s, cached %.2f s (%.1fx), "
+          "%.1f MB of polygons cached"
+          % (uncached, cached, uncached / cached,
+             statistics["resident_bytes"] / 1024 / 1024))
+    patient_dict_container.clear()
+
+
+if __name__ == "__main__":
+    main(*get_arguments(20, 5, 50))
@@ -0,0 +1,46 @@
+"""
+Compares scrolling through slices that have not been rendered yet at
+full resolution with scrolling through their previews, and reports the
+time to show each slice and the memory used by the pixmaps of both.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_preview_pyramid [slices] [size]
+"""
+import time
+
+from benchmark.common import LEVEL, WINDOW, get_arguments, \
+    random_volume, start_application
+from src.Model.PixmapRenderer import PixmapCache, PixmapRenderer
+
+
+def scroll(volume, size, preview_size):
+    """
+    Shows every slice once, as a view does while its slider is dragged.
+    :return: Tuple of the milliseconds per slice and the megabytes of
+        pixmaps held in the cache afterwards.
+    """
+    renderer = PixmapRenderer(volume, "axial", WINDOW, LEVEL, size, size,
+                              cache=PixmapCache(2 ** 40))
+    renderer.preview_size = preview_size
+    start = time.perf_counter()
+    for i in range(len(renderer)):
+        renderer.preview(i)
+    elapsed = time.perf_counter() - start
+    return (elapsed / len(renderer) * 1000,
+            renderer.get_statistics()["resident_bytes"] / 2 ** 20)
+
+
+def main(slices, size):
+    start_application()
+    volume = random_volume((slices, size, size))
+    print("%s slices of %sx%s" % (slices, size, size))
+
+    for label, preview_size in (("full", 0), ("1/2", size // 2),
+                                ("1/4", size // 4)):
+        milliseconds, megabytes = scroll(volume, size, preview_size)
+        print("%-4s resolution: %5.2f ms per slice, %6.1f MB of pixmaps"
+              % (label, milliseconds, megabytes))
+
+
+if __name__ == "__main__":
+    main(*get_arguments(100, 1024))
@@ -0,0 +1,83 @@
+"""
+Measures the time to the first image when a patient's image series is
+opened all at once and progressively: reading the files, decoding the
+pixel data and rendering the axial pixmap of the central slice (plus,
+when opened all at once, every other pixmap).
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_progressive_open <directory> [first slices]
+"""
+import time
+
+from benchmark.benchmark_get_datasets import find_files
+from benchmark.common import LEVEL, PIXMAP_ASPECT, WINDOW, \
+    get_arguments, get_directory, start_application
+from src.Model import ImageLoading
+from src.Model.CalculateImages import convert_raw_data, get_pixmaps
+from src.Model.ProgressiveLoading import ProgressiveImageLoader
+
+
+def render_all(pixmaps):
+    """
+    Render every pixmap of the 3 views, as get_pixmaps did before the
+    pixmaps were rendered on demand.
+    """
+    for renderer in pixmaps:
+        for i in range(len(renderer)):
+            renderer.render(i)
+
+
+def time_full_open(files):
+    """
+    :param files: List of the files of an image series.
+    :return: Time in seconds until every pixmap has been rendered.
+    """
+    start = time.perf_counter()
+    read_data_dict, _ = ImageLoading.get_datasets(files)
+    pixel_values = convert_raw_data(read_data_dict, False,
+                                    read_data_dict[0].Modality == "CT")
+    render_all(get_pixmaps(pixel_values, WINDOW, LEVEL, PIXMAP_ASPECT))
+    return time.perf_counter() - start
+
+
+def time_progressive_open(files, first_slices):
+    """
+    :param files: List of the files of an image series.
+    :param first_slices: Number of slices decoded before the first image
+        is shown.
+    :return: Tuple (time to the first image, time until every slice has
+        been decoded and every pixmap rendered) in seconds.
+    """
+    start = time.perf_counter()
+    read_data_dict, _ = ImageLoading.get_datasets(files,
+                                                  read_pixel_data=False)
+    loader = ProgressiveImageLoader(read_data_dict,
+                                    read_data_dict[0].Modality == "CT",
+                                    first_slices)
+    loader.load_first_slices()
+    loader.get_axial_pixmaps(WINDOW, LEVEL, PIXMAP_ASPECT,
+                             indices=loader.order[:first_slices])
+    first_image = time.perf_counter() - start
+
+    loader.load_remaining()
+    pixmaps = loader.get_pixmaps(WINDOW, LEVEL, PIXMAP_ASPECT)
+    render_all(pixmaps)
+    return first_image, time.perf_counter() - start
+
+
+def main(directory, first_slices):
+    start_application()
+    files = find_files(directory)
+    print("%s files in %s" % (len(files), directory))
+
+    full_time = time_full_open(files)
+    print("all at once:  first image after %.3f s" % full_time)
+
+    first_image, total = time_progressive_open(files, first_slices)
+    print("progressive:  first image after %.3f s (%.1fx), "
+          "all slices after %.3f s" % (first_image, full_time / first_image,
+                                       total))
+
+
+if __name__ == "__main__":
+    main(get_directory(__doc__), *get_arguments(5, first=2))
@@ -0,0 +1,56 @@
+"""
+Compares rendering every axial pixmap of a volume one slice at a time in
+the GUI thread with rendering them in the RenderPipeline with a growing
+number of worker threads.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_render_pipeline [slices] [size] [max workers]
+"""
+import os
+import time
+
+from PySide6 import QtCore
+
+from benchmark.common import LEVEL, PIXMAP_ASPECT, WINDOW, \
+    get_arguments, random_volume, start_application
+from src.Model.CalculateImages import get_pixmaps
+from src.Model.RenderPipeline import RenderPipeline
+
+
+def main(slices, size, max_workers):
+    start_application()
+    volume = random_volume((slices, size, size))
+    print("%s slices of %sx%s, %s CPU cores"
+          % (slices, size, size, os.cpu_count()))
+
+    renderer = get_pixmaps(volume, WINDOW, LEVEL, PIXMAP_ASPECT)[0]
+    start = time.perf_counter()
+    for i in range(slices):
+        renderer[i]
+    serial = time.perf_counter() - start
+    print("GUI thread: %.3f s" % serial)
+
+    workers = 1
+    while workers <= max_workers:
+        renderer = get_pixmaps(volume, WINDOW, LEVEL, PIXMAP_ASPECT)[0]
+        pipeline = RenderPipeline(workers)
+        loop = QtCore.QEventLoop()
+
+        def on_pixmap_ready(pixmaps, index):
+            if pipeline.is_idle():
+                loop.quit()
+
+        pipeline.pixmap_ready.connect(on_pixmap_ready)
+        start = time.perf_counter()
+        pipeline.submit_renderer(renderer, range(slices))
+        loop.exec()
+        elapsed = time.perf_counter() - start
+        print("%2s workers: %.3f s (%.1fx), at most %s slices pending"
+              % (workers, elapsed, serial / elapsed,
+                 pipeline.get_statistics()["peak_pending"]))
+        pipeline.executor.shutdown()
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(*get_arguments(200, 512, 16))
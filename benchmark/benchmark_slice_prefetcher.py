@@ -0,0 +1,76 @@
+"""
+Scrolls through the axial slices of a volume at a steady rate, once
+rendering each slice when it is shown and once with a SlicePrefetcher
+rendering the slices ahead of the slider, and reports the time the GUI
+thread spends showing each slice.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_slice_prefetcher [slices] [size] [ms per slice]
+"""
+import time
+
+import numpy as np
+from PySide6 import QtCore
+
+from benchmark.common import LEVEL, WINDOW, get_arguments, \
+    random_volume, start_application
+from src.Model.CalculateImages import get_pixmaps
+from src.Model.RenderPipeline import RenderPipeline
+from src.Model.SlicePrefetcher import SlicePrefetcher
+
+# The pixmaps are scaled to twice the size of the slices, as in a
+# maximised single view
+PIXMAP_ASPECT = {"axial": 2.0, "coronal": 2.0, "sagittal": 2.0}
+
+
+def scroll(volume, interval, max_slices):
+    """
+    Shows the slices one after the other, every interval milliseconds.
+    :return: Tuple of the mean and the maximum milliseconds taken to show
+        a slice, and the number of slices rendered in the GUI thread.
+    """
+    renderer = get_pixmaps(volume, WINDOW, LEVEL, PIXMAP_ASPECT)[0]
+    pipeline = RenderPipeline()
+    prefetcher = SlicePrefetcher(pipeline, max_slices)
+    times = []
+    loop = QtCore.QEventLoop()
+    timer = QtCore.QTimer()
+    timer.setInterval(interval)
+
+    def show_next():
+        index = len(times)
+        if index == len(renderer):
+            loop.quit()
+            return
+        start = time.perf_counter()
+        renderer[index]
+        times.append(time.perf_counter() - start)
+        prefetcher.slice_changed(renderer, index)
+
+    timer.timeout.connect(show_next)
+    timer.start()
+    loop.exec()
+    timer.stop()
+    prefetcher.cancel()
+    pipeline.executor.shutdown()
+    statistics = renderer.get_statistics()
+    # Slices rendered in the pipeline are stored with put, not counted as
+    # misses, so the misses are the slices rendered when shown
+    return (np.mean(times) * 1000, np.max(times) * 1000,
+            statistics["misses"])
+
+
+def main(slices, size, interval):
+    start_application()
+    volume = random_volume((slices, size, size))
+    print("%s slices of %sx%s, shown every %s ms"
+          % (slices, size, size, interval))
+
+    for label, max_slices in (("on demand", 0), ("prefetched", 8)):
+        mean, worst, misses = scroll(volume, interval, max_slices)
+        print("%-10s: %5.2f ms per slice (at most %5.2f ms), %s slices "
+              "rendered when shown" % (label, mean, worst, misses))
+
+
+if __name__ == "__main__":
+    main(*get_arguments(100, 512, 20))
@@ -0,0 +1,116 @@
+"""
+Drags the slider of a coronal view linked to a sagittal view through
+every slice, one value every 2 ms as mouse events arrive, once redrawing
+the views for every value as value_changed used to, and once through the
+UpdateScheduler, and reports the redraws and the time the GUI thread
+spends on them.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_update_scheduler [slices] [size] [ROIs]
+"""
+import time
+
+from PySide6 import QtCore, QtGui
+
+from benchmark.benchmark_dicom_view import create_polygons
+from benchmark.common import PIXMAP_ASPECT, get_arguments, \
+    random_volume, start_application
+from src.Model.CalculateImages import get_pixmaps
+from src.Model.PatientDictContainer import PatientDictContainer
+from src.View.mainpage.DicomCoronalView import DicomCoronalView
+from src.View.mainpage.DicomSagittalView import DicomSagittalView
+from src.View.mainpage.UpdateScheduler import get_update_scheduler
+
+# Milliseconds between two slider values while dragging
+EVENT_INTERVAL = 2
+
+
+def drag(view, immediate):
+    """
+    Moves the slider of a view through all of its values.
+    :param immediate: Redraw the views after every value.
+    :return: Seconds spent in the GUI thread.
+    """
+    scheduler = get_update_scheduler()
+    values = iter(range(view.slider.maximum() + 1))
+    loop = QtCore.QEventLoop()
+    timer = QtCore.QTimer()
+    timer.setInterval(EVENT_INTERVAL)
+    busy = [0.0]
+
+    def next_value():
+        start = time.perf_counter()
+        value = next(values, None)
+        if value is None:
+            scheduler.flush()
+            loop.quit()
+        else:
+            view.slider.setValue(value)
+            if immediate:
+                scheduler.flush()
+        busy[0] += time.perf_counter() - start
+
+    # The frames drawn by the scheduler are timed as well
+    flush = scheduler.flush
+
+    def timed_flush():
+        start = time.perf_counter()
+        flush()
+        busy[0] += time.perf_counter() - start
+
+    scheduler.timer.timeout.disconnect()
+    scheduler.timer.timeout.connect(timed_flush)
+    timer.timeout.connect(next_value)
+    timer.start()
+    loop.exec()
+    timer.stop()
+    scheduler.timer.timeout.disconnect()
+    scheduler.timer.timeout.connect(flush)
+    return busy[0]
+
+
+def main(slices, size, roi_count):
+    start_application()
+    volume = random_volume((size, slices, size))
+    print("%s slices of %sx%s, %s ROIs, a slider value every %s ms"
+          % (slices, size, size, roi_count, EVENT_INTERVAL))
+
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    pixmaps = get_pixmaps(volume, 400, 800, PIXMAP_ASPECT)
+    for renderer in pixmaps:
+        # Render every pixmap first, so only the redraws are measured
+        for i in range(len(renderer)):
+            renderer[i]
+    rois = {roi: {"name": "ROI %s" % roi} for roi in range(roi_count)}
+    patient_dict_container.set_initial_values(
+        None, {}, {}, pixmaps_axial=pixmaps[0], pixmaps_coronal=pixmaps[1],
+        pixmaps_sagittal=pixmaps[2], rois=rois,
+        selected_rois=list(rois),
+        roi_color_dict={roi: QtGui.QColor(255, 50 * roi % 255, 0)
+                        for roi in rois},
+        dict_polygons_coronal=create_polygons(slices, size, roi_count))
+
+    sagittal = DicomSagittalView(cut_line_color=QtGui.QColor(255, 0, 0))
+    coronal = DicomCoronalView(roi_color={},
+                               cut_line_color=QtGui.QColor(0, 0, 255))
+    coronal.set_views(sagittal, sagittal)
+    # Only the redraws are measured
+    coronal.prefetcher.max_slices = 0
+    scheduler = get_update_scheduler()
+
+    for label, immediate in (("every value", True), ("coalesced", False)):
+        before = scheduler.get_statistics()
+        busy = drag(coronal, immediate)
+        after = scheduler.get_statistics()
+        counts = {key: after[key] - before[key] for key in after}
+        print("%-11s: %4s of %4s updates rendered (%s coalesced) in %s "
+              "frames, %.0f ms busy"
+              % (label, counts["rendered"], counts["requested"],
+                 counts["coalesced"], counts["frames"], busy * 1000))
+    scheduler.clear()
+    patient_dict_container.clear()
+
+
+if __name__ == "__main__":
+    main(*get_arguments(100, 512, 10))
@@ -0,0 +1,59 @@
+"""
+Compares windowing a volume slice by slice with the arithmetic
+scaled_pixmap used before (cast, subtract, divide, two clamps, cast)
+with windowing it through a lookup table, slice by slice and in one
+call over the whole volume, and checks that the results are identical.
+
+Usage (from the root of the repository):
+python -m benchmark.benchmark_windowing_lut [slices] [size]
+"""
+import time
+
+import numpy as np
+
+from benchmark.common import LEVEL, WINDOW, best_time, get_arguments, \
+    random_volume
+from src.Model.WindowingLUT import apply_window, get_window_lut
+
+
+def window_arithmetic(np_pixels, window, level):
+    """
+    The windowing of scaled_pixmap before it used lookup tables.
+    """
+    np_pixels = np_pixels.astype(np.int16)
+    np_pixels = (np_pixels - level) / window * 255
+    np_pixels[np_pixels < 0] = 0
+    np_pixels[np_pixels > 255] = 255
+    return np_pixels.astype(np.int8)
+
+
+def main(slices, size):
+    volume = random_volume((slices, size, size), -1024, 3000)
+    print("%s slices of %sx%s" % (slices, size, size))
+
+    arithmetic_time, expected = best_time(lambda: np.stack(
+        [window_arithmetic(volume[i], WINDOW, LEVEL)
+         for i in range(slices)]))
+    print("arithmetic, per slice: %.3f s" % arithmetic_time)
+
+    start = time.perf_counter()
+    get_window_lut.cache_clear()
+    get_window_lut(WINDOW, LEVEL)
+    print("building a lookup table: %.2f ms"
+          % ((time.perf_counter() - start) * 1000))
+
+    lut_time, windowed = best_time(lambda: np.stack(
+        [apply_window(volume[i], WINDOW, LEVEL) for i in range(slices)]))
+    print("lookup table, per slice: %.3f s (%.1fx, identical: %s)"
+          % (lut_time, arithmetic_time / lut_time,
+             np.array_equal(windowed, expected.view(np.uint8))))
+
+    volume_time, windowed = best_time(
+        lambda: apply_window(volume, WINDOW, LEVEL))
+    print("lookup table, whole volume: %.3f s (%.1fx, identical: %s)"
+          % (volume_time, arithmetic_time / volume_time,
+             np.array_equal(windowed, expected.view(np.uint8))))
+
+
+if __name__ == "__main__":
+    main(*get_arguments(200, 512))
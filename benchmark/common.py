@@ -0,0 +1,77 @@
+"""
+Setup shared by the benchmarks: the Qt application that pixmaps and
+widgets need, the command line arguments, random volumes and timing.
+"""
+import sys
+import time
+
+import numpy as np
+from PySide6 import QtWidgets
+
+WINDOW = 400
+LEVEL = 800
+PIXMAP_ASPECT = {"axial": 1.0, "coronal": 1.0, "sagittal": 1.0}
+
+# The application, kept for as long as the benchmark runs
+_application = None
+
+
+def start_application():
+    """
+    Creates the QApplication that pixmaps and widgets need, unless there
+    already is one.
+    :return: The QApplication.
+    """
+    global _application
+    _application = QtWidgets.QApplication.instance() \
+        or QtWidgets.QApplication([])
+    return _application
+
+
+def get_arguments(*defaults, first=1):
+    """
+    :param defaults: Default value of each integer argument.
+    :param first: Index in sys.argv of the first integer argument.
+    :return: List of the integer command line arguments, followed by the
+        defaults of the arguments not given.
+    """
+    arguments = [int(arg) for arg in sys.argv[first:]]
+    return arguments + list(defaults[len(arguments):])
+
+
+def get_directory(usage):
+    """
+    :param usage: Printed, before exiting, if no directory is given.
+    :return: The directory given as the first command line argument.
+    """
+    if len(sys.argv) < 2:
+        print(usage)
+        sys.exit(1)
+    return sys.argv[1]
+
+
+def random_volume(shape, low=0, high=2000, seed=0):
+    """
+    :param shape: Shape of the volume.
+    :param low: Lowest pixel value.
+    :param high: Pixel value above the highest.
+    :param seed: Seed of the random number generator.
+    :return: int16 array of random pixel values.
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(low, high, shape).astype(np.int16)
+
+
+def best_time(function, repeats=3):
+    """
+    :return: Tuple (best time in seconds, result of the function).
+    """
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
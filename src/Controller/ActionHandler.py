@@ -355,13 +355,13 @@ class ActionHandler:
         dt = self.patient_dict_container.dataset[slider_id]
         row_s = dt.PixelSpacing[0]
         col_s = dt.PixelSpacing[1]
-        dt.convert_pixel_data()
+        pixel_array = self.patient_dict_container.get_pixel_array(slider_id)
         pixmap = self.patient_dict_container.get("pixmaps_axial")[slider_id]
         self.__main_page.call_class.run_transect(
             self.__main_page,
             view,
             pixmap,
-            dt._pixel_array.transpose(),
+            pixel_array.transpose(),
             row_s,
             col_s
         )
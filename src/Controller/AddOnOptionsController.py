@@ -12,6 +12,8 @@ from PySide6.QtCore import Slot
 from src.View.AddOnOptions import *
 from src.View.InputDialogs import *
 from src.Controller.PathHandler import data_path
+from src.Model.DisplayStyle import get_display_style
+from src.Model.PerformanceOptions import reload_performance_options
 
 
 # Create the Add-On Options class based on the UI from the file in
@@ -22,26 +24,13 @@ class AddOnOptions(QtWidgets.QMainWindow, UIAddOnOptions):
 
     def __init__(self, window):  # initialization function
         super(AddOnOptions, self).__init__()
-        # read configuration file for line and fill options
-        with open(data_path("line&fill_configuration"), "r") \
-                as stream:
-            elements = stream.readlines()
-            # if file is not empty, each line represents the last saved
-            # configuration in the given order
-            if len(elements) > 0:
-                roi_line = int(elements[0].replace("\n", ""))
-                roi_opacity = int(elements[1].replace("\n", ""))
-                iso_line = int(elements[2].replace("\n", ""))
-                iso_opacity = int(elements[3].replace("\n", ""))
-                line_width = float(elements[4].replace("\n", ""))
-            else:  # if file is empty for some reason, use the default
-                # measures below
-                roi_line = 1
-                roi_opacity = 10
-                iso_line = 2
-                iso_opacity = 5
-                line_width = 2.0
-            stream.close()
+        # the last saved line and fill options
+        style = get_display_style()
+        roi_line = style.roi_line
+        roi_opacity = style.roi_opacity
+        iso_line = style.iso_line
+        iso_opacity = style.iso_opacity
+        line_width = style.line_width
         # initialise the UI
         self.window = window
         self.setup_ui(self, roi_line, roi_opacity, iso_line,
@@ -419,6 +408,10 @@ class AddOnOptions(QtWidgets.QMainWindow, UIAddOnOptions):
             stream.write(str(self.line_width.currentText()))
             stream.write("\n")
             stream.close()
+        # Redraw the views with the new line and fill options
+        get_display_style().reload()
+        # Pick up any change to performanceOptions.json
+        reload_performance_options()
 
         # Save the default directory and clinical data CSV directory
         configuration = Configuration()
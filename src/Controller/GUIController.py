@@ -4,10 +4,14 @@ from PySide6 import QtCore, QtWidgets, QtGui
 from PySide6.QtWidgets import QMessageBox
 
 from src.Controller.PathHandler import resource_path
+from src.Model.DisplayStyle import get_display_style
 from src.Model.InitialModel import create_initial_model
 from src.Model.MovingDictContainer import MovingDictContainer
 from src.Model.MovingModel import read_images_for_fusion
 from src.Model.PatientDictContainer import PatientDictContainer
+from src.Model.ProgressiveLoading import record_load_time
+from src.Model.RenderPipeline import get_render_pipeline
+from src.Model.Worker import Worker
 from src.View.BatchProcessingWindow import UIBatchProcessingWindow
 from src.View.FirstTimeWelcomeWindow import UIFirstTimeWelcomeWindow
 from src.View.ImageFusion.ImageFusionWindow import UIImageFusionWindow
@@ -15,6 +19,7 @@ from src.View.OpenPatientWindow import UIOpenPatientWindow
 from src.View.PyradiProgressBar import PyradiExtended
 from src.View.WelcomeWindow import UIWelcomeWindow
 from src.View.mainpage.MainPage import UIMainWindow
+from src.View.mainpage.UpdateScheduler import get_update_scheduler
 
 from src.View.PTCTFusion.OpenPTCTPatientWindow import UIOpenPTCTPatientWindow
 from src.Model.PTCTDictContainer import PTCTDictContainer
@@ -159,6 +164,10 @@ class MainWindow(QtWidgets.QMainWindow, UIMainWindow):
             self.open_image_fusion)
         self.pyradi_trigger.connect(self.pyradiomics_handler)
         self.pet_ct_tab.load_pt_ct_signal.connect(self.initialise_pt_ct)
+        get_render_pipeline().pixmap_ready.connect(self.on_pixmap_rendered)
+        # Redraw the views when the add-on options change the line and
+        # fill styles of the ROIs and isodoses
+        get_display_style().style_changed.connect(self.update_views)
 
     def update_ui(self):
         create_initial_model()
@@ -177,6 +186,88 @@ class MainWindow(QtWidgets.QMainWindow, UIMainWindow):
     def initialise_pt_ct(self):
         self.pt_ct_signal.emit()
 
+    def start_progressive_loading(self):
+        """
+        Records the time taken to show the first image and, if the patient
+        was opened progressively, decodes the remaining image slices in
+        the background, with the progress shown in the status bar.
+        """
+        patient_dict_container = PatientDictContainer()
+        record_load_time(patient_dict_container, "time_to_first_image")
+        loader = patient_dict_container.get("progressive_loader")
+        if loader is None:
+            return
+
+        worker = Worker(loader.load_remaining, progress_callback=True)
+        worker.signals.progress.connect(
+            lambda progress: self.on_slices_loaded(loader, progress))
+        worker.signals.result.connect(
+            lambda result: self.on_progressive_loading_finished(
+                loader, result))
+        self.statusBar().showMessage("Loading slices...")
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def on_slices_loaded(self, loader, progress):
+        """
+        Renders the pixmaps of the slices decoded in the background, in
+        the threads of the RenderPipeline.
+        :param loader: The ProgressiveImageLoader decoding the slices.
+        :param progress: Tuple (text, percentage, list of slice indices).
+        """
+        patient_dict_container = PatientDictContainer()
+        if patient_dict_container.is_empty() or \
+                patient_dict_container.get("progressive_loader") is not loader:
+            return
+        text, percentage, indices = progress
+        loader.submit_axial_pixmaps(
+            get_render_pipeline(),
+            patient_dict_container.get("window"),
+            patient_dict_container.get("level"),
+            patient_dict_container.get("pixmap_aspect"),
+            patient_dict_container.get("pixmaps_axial"), indices)
+        self.statusBar().showMessage("%s %s%%" % (text, percentage))
+
+    def on_pixmap_rendered(self, pixmaps, index):
+        """
+        Updates the axial views if they show a slice whose pixmap has
+        just been rendered in the background.
+        :param pixmaps: The pixmaps the pixmap was stored in.
+        :param index: Index of the slice.
+        """
+        patient_dict_container = PatientDictContainer()
+        if patient_dict_container.is_empty() or \
+                pixmaps is not patient_dict_container.get("pixmaps_axial") \
+                or not hasattr(self, "dicom_axial_view"):
+            return
+        for view in [self.dicom_single_view, self.dicom_axial_view]:
+            if view.slider.value() == index:
+                view.update_view()
+
+    def on_progressive_loading_finished(self, loader, complete):
+        """
+        Switches the 3 views to pixmaps rendered on demand once every
+        slice has been decoded in the background.
+        :param loader: The ProgressiveImageLoader decoding the slices.
+        :param complete: True if every slice was decoded.
+        """
+        patient_dict_container = PatientDictContainer()
+        if not complete or patient_dict_container.is_empty() or \
+                patient_dict_container.get("progressive_loader") is not loader:
+            return
+        pixmaps_axial, pixmaps_coronal, pixmaps_sagittal = \
+            loader.get_pixmaps(
+                patient_dict_container.get("window"),
+                patient_dict_container.get("level"),
+                patient_dict_container.get("pixmap_aspect"))
+        patient_dict_container.set("pixmaps_axial", pixmaps_axial)
+        patient_dict_container.set("pixmaps_coronal", pixmaps_coronal)
+        patient_dict_container.set("pixmaps_sagittal", pixmaps_sagittal)
+        patient_dict_container.set("progressive_loader", None)
+        self.statusBar().clearMessage()
+        self.dicom_coronal_view.update_view()
+        self.dicom_sagittal_view.update_view()
+        record_load_time(patient_dict_container, "time_to_full_load")
+
     def load_pt_ct_tab(self):
         pcd = PTCTDictContainer()
         if not pcd.is_empty():
@@ -234,6 +325,7 @@ class MainWindow(QtWidgets.QMainWindow, UIMainWindow):
                 "Plastimatch's executable is installed.")
 
     def cleanup(self):
+        get_update_scheduler().clear()
         patient_dict_container = PatientDictContainer()
         patient_dict_container.clear()
         # Close 3d vtk widget
@@ -104,6 +104,7 @@ class Controller:
         progress_window.update_progress(("Loading complete!", 100))
         progress_window.close()
         self.main_window.show()
+        self.main_window.start_progressive_loading()
         self.open_patient_window.close()
         self.image_fusion_window.close()
         self.pt_ct_window.close()
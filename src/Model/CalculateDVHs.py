@@ -7,6 +7,7 @@ from dicompylercore import dvhcalc
 from pydicom.dataset import Dataset
 from pydicom.sequence import Sequence
 from pydicom.tag import Tag
+from src.Model.DatasetRegistry import DatasetRegistry
 from src.Model.PatientDictContainer import PatientDictContainer
 
 
@@ -251,6 +252,8 @@ def dvh2rtdose(dict_dvh):
 
     path = patient_dict_container.filepaths['rtdose']
     patient_dict_container.dataset['rtdose'].save_as(path)
+    # The file now matches the dataset in memory, which can be reused
+    DatasetRegistry().register(path, patient_dict_container.dataset['rtdose'])
 
 
 def rtdose2dvh():
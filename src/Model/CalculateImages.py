@@ -1,41 +1,142 @@
-import cv2
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pydicom
 from PySide6 import QtCore, QtGui
 
 import src.constants as constant
-
-
-def convert_raw_data(ds, rescaled=True, is_ct=False):
+from src.Model.Colormaps import apply_colormap, apply_window_colormap
+from src.Model.ImageVolume import ImageVolume, allocate_voxels, \
+    find_voxels, get_volume_geometry
+from src.Model.LazyPixelData import LazyPixelValues
+from src.Model.PerformanceOptions import get_performance_option
+from src.Model.SliceGeometry import get_slice_geometry, \
+    has_slice_geometry
+from src.Model.WindowingLUT import apply_window, lut_indices
+
+
+def convert_raw_data(ds, rescaled=True, is_ct=False, cache=None,
+                     slice_geometry=None):
     """
     Convert the raw pixel data to readable pixel data in every image dataset
     :param ds: A dictionary of datasets of all the DICOM files of the patient
     :param rescaled: A boolean to determine if the data has already
     been rescaled
     :param is_ct: Boolean to determine if data is CT for rescaling
-    :return: np_pixels, a list of pixel arrays of all slices of the patient
+    :param cache: A PixelArrayCache. If given, the pixel data of each
+    slice is decoded and rescaled when it is first accessed instead of
+    here, and held in the cache.
+    :param slice_geometry: SliceGeometry of the slices, in slice order,
+    from which the spacing between slices is taken. Read from the
+    slices if not given and every slice has a position.
+    :return: np_pixels, an ImageVolume of all slices of the patient. The
+    pixel array of each slice's dataset is a view of its axial slice.
+    LazyPixelValues of the slices if a cache is given.
     """
     non_img_list = ['rtss', 'rtdose', 'rtplan', 'rtimage']
-    np_pixels = []
-
-    # Do the conversion to every slice (except RTSS, RTDOSE, RTPLAN)
-    for key in ds:
-        if key not in non_img_list:
-            if isinstance(key, str) and key[0:3] == 'sr-':
-                continue
-            else:
-                # dataset of current slice
-                np_tmp = ds[key]
-                np_tmp.convert_pixel_data()
-                if not rescaled:
-                    # Perform the rescale
-                    data_arr = np_tmp._pixel_array
-                    slope, intercept = get_rescale(np_tmp, is_ct)
-                    data_arr = (data_arr * slope + intercept)
-                    # Store the rescaled data
-                    ds[key]._pixel_array = data_arr
-                np_pixels.append(np_tmp._pixel_array)
-    return np_pixels
+
+    # Every slice (except RTSS, RTDOSE, RTPLAN and SRs)
+    image_keys = [key for key in ds if key not in non_img_list
+                  and not (isinstance(key, str) and key[0:3] == 'sr-')]
+    if not image_keys:
+        return []
+
+    if cache is not None:
+        lazy_datasets = []
+        for key in image_keys:
+            rescale = (1, 0) if rescaled else get_rescale(ds[key], is_ct)
+            cache.add(ds[key], rescale)
+            lazy_datasets.append(ds[key])
+        return LazyPixelValues(lazy_datasets, cache)
+
+    image_datasets = [ds[key] for key in image_keys]
+    if slice_geometry is None and has_slice_geometry(image_datasets):
+        slice_geometry = get_slice_geometry(image_datasets)
+    spacing, orientation, origin = get_volume_geometry(ds[image_keys[0]],
+                                                       slice_geometry)
+
+    if rescaled:
+        # Datasets already stored in a volume are not copied again
+        for key in image_keys:
+            ds[key].convert_pixel_data()
+        voxels = find_voxels([ds[key]._pixel_array for key in image_keys])
+        if voxels is not None:
+            return ImageVolume(voxels, spacing, orientation, origin)
+
+    voxels = decode_slices(image_datasets, rescaled, is_ct,
+                           get_performance_option("decode_workers"))
+    return ImageVolume(voxels, spacing, orientation, origin)
+
+
+def decode_slices(datasets, rescaled=True, is_ct=False, max_workers=1):
+    """
+    Decode and rescale the pixel data of every slice straight into a new
+    volume, in a thread pool if max_workers is more than 1. The decoders
+    of compressed transfer syntaxes and NumPy's rescaling release the
+    GIL, so the slices are decoded in parallel. Each slice is stored at
+    its own index, so the order of the slices is kept.
+    :param datasets: List of the datasets of the slices.
+    :param rescaled: A boolean to determine if the data has already
+    been rescaled
+    :param is_ct: Boolean to determine if data is CT for rescaling
+    :param max_workers: Number of threads decoding slices.
+    :return: The voxel array. The pixel array of each dataset is a view
+    of its slice.
+    """
+    # The first slice sets the shape and type of the volume
+    data_arr = convert_slice(datasets[0], rescaled, is_ct)
+    voxels = allocate_voxels(
+        (len(datasets),) + data_arr.shape, data_arr.dtype,
+        get_performance_option("volume_memmap"))
+    voxels[0] = data_arr
+    datasets[0]._pixel_array = voxels[0]
+
+    # Slices that need a wider type than the volume, by index
+    wider_slices = {}
+
+    def decode(i):
+        slice_arr = convert_slice(datasets[i], rescaled, is_ct)
+        if np.can_cast(slice_arr.dtype, voxels.dtype):
+            voxels[i] = slice_arr
+            datasets[i]._pixel_array = voxels[i]
+        else:
+            wider_slices[i] = slice_arr
+
+    if max_workers > 1 and len(datasets) > 2:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Consume the iterator so any error is raised here
+            list(executor.map(decode, range(1, len(datasets))))
+    else:
+        for i in range(1, len(datasets)):
+            decode(i)
+
+    if wider_slices:
+        voxels = voxels.astype(
+            np.result_type(voxels, *wider_slices.values()))
+        for i, slice_arr in wider_slices.items():
+            voxels[i] = slice_arr
+        for i, dataset in enumerate(datasets):
+            dataset._pixel_array = voxels[i]
+
+    return voxels
+
+
+def convert_slice(np_tmp, rescaled=True, is_ct=False):
+    """
+    Convert the raw pixel data of one image dataset to readable pixel data
+    :param np_tmp: dataset of the slice
+    :param rescaled: A boolean to determine if the data has already
+    been rescaled
+    :param is_ct: Boolean to determine if data is CT for rescaling
+    :return: the pixel array of the slice
+    """
+    np_tmp.convert_pixel_data()
+    data_arr = np_tmp._pixel_array
+    if not rescaled:
+        # Perform the rescale
+        slope, intercept = get_rescale(np_tmp, is_ct)
+        data_arr = (data_arr * slope + intercept)
+    return data_arr
 
 
 def get_rescale(np_tmp, is_ct):
@@ -103,146 +204,166 @@ def scaled_pixmap(np_pixels, window, level, width, height,
     :param color: String for conversion of pixels to specified color map
     :return: pixmap, a QPixmap of the slice
     """
+    return QtGui.QPixmap.fromImage(scaled_qimage(
+        np_pixels, window, level, width, height, fusion, color))
 
-    # Rescale pixel arrays
-    np_pixels = np_pixels.astype(np.int16)
-    if window != 0 and level != 0:
-        # Transformation applied to each individual pixel to unique
-        # contrast level
-        np_pixels = (np_pixels - level) / window * 255
-    else:
-        max_val = np.amax(np_pixels)
-        min_val = np.amin(np_pixels)
-        np_pixels = (np_pixels - min_val) / (max_val - min_val) * 255
 
-    np_pixels[np_pixels < 0] = 0
-    np_pixels[np_pixels > 255] = 255
-    np_pixels = np_pixels.astype(np.int8)
-
-    # Process heatmap for conversion of the np_pixels to rgb for the purpose
-    # of displaying the PT/CT view in RGB colorspace.
-
-    # Convert numpy array data to QImage for PySide6
-    if color == "Heat":
+def scaled_qimage(np_pixels, window, level, width, height,
+                  fusion=False, color=None,
+                  transformation=QtCore.Qt.SmoothTransformation):
+    """
+    Rescale the numpy pixels of image and convert to a QImage of the
+    size it is displayed at. Unlike creating a QPixmap, this can be done
+    outside the GUI thread.
 
-        pixmap = QtGui.QPixmap(convert_pt_to_heatmap(np_pixels))
+    :param np_pixels: A list of converted pixel arrays
+    :param window: Window width of windowing function
+    :param level: Level value of windowing function
+    :param width: Pixel width of the window
+    :param height: Pixel height of the window
+    :param fusion: Boolean to set scaling for overlayed images
+    :param color: String for conversion of pixels to specified color map
+    :param transformation: Qt.TransformationMode the image is rescaled
+    with
+    :return: qimage, a QImage of the slice that owns its pixels
+    """
 
+    if window == 0 or level == 0:
+        # Stretch the pixel values between their minimum and maximum
+        indices = lut_indices(np_pixels).view(np.int16)
+        max_val = int(np.amax(indices))
+        min_val = int(np.amin(indices))
+        if max_val > min_val:
+            window, level = max_val - min_val, min_val
+        else:
+            window = None
+
+    # Window the pixel arrays through a lookup table, and convert numpy
+    # array data to QImage for PySide6
+    if color is None:
+        if window is None:
+            np_pixels = np.zeros(np.shape(np_pixels), np.uint8)
+        else:
+            np_pixels = apply_window(np_pixels, window, level)
+        qimage = grayscale_qimage(np_pixels)
     else:
-        # Generate a grayscale image and set pixmap to the image
-        bytes_per_line = np_pixels.shape[1]
-
-        qimage = QtGui.QImage(
-            np_pixels,
-            np_pixels.shape[1],
-            np_pixels.shape[0],
-            bytes_per_line,
-            QtGui.QImage.Format_Indexed8)
-
-        pixmap = QtGui.QPixmap(qimage)
+        # The PT/CT view is displayed in RGB colorspace, windowed and
+        # colored in one lookup
+        if window is None:
+            np_pixels = apply_colormap(
+                np.zeros(np.shape(np_pixels), np.uint8), color)
+        else:
+            np_pixels = apply_window_colormap(np_pixels, window, level,
+                                              color)
+        qimage = rgb_qimage(np_pixels)
 
     if fusion:
         width = constant.DEFAULT_WINDOW_SIZE
         height = constant.DEFAULT_WINDOW_SIZE
 
-    # Rescale the image accordingly
-    pixmap = pixmap.scaled(width, height, QtCore.Qt.IgnoreAspectRatio,
-                           QtCore.Qt.SmoothTransformation)
-    return pixmap
+    # Rescale the image accordingly. An image that already has the size
+    # is returned as is by scaled(), still pointing at the numpy pixels.
+    scaled = qimage.scaled(width, height, QtCore.Qt.IgnoreAspectRatio,
+                           transformation)
+    if scaled.size() == qimage.size():
+        scaled = scaled.copy()
+    return scaled
 
 
-def convert_pt_to_heatmap(np_pixels):
+def convert_pt_to_heatmap(np_pixels, color="Heat"):
     """
     Converts the grayscale of the pixel array associated with the PET images
     to a RGB image with a colormap/heat map applied to it.
 
+    :param np_pixels: Windowed pixel array, with values between 0 and 255
+    :param color: Name of the colormap, one of Colormaps.COLORMAPS
     Returns:
         qimage [Qimage]: The converted heatmap
     """
-    # Conversion of the array to UINT8, color spaces do not like int8.
-    arr8 = np_pixels.astype(np.uint8)
+    return rgb_qimage(apply_colormap(np_pixels, color))
 
-    # Apply a colormap to the imageset (np array)
-    heatmap = cv2.applyColorMap(arr8, cv2.COLORMAP_HOT)
 
-    # Convert the BGR colorspace to RGB, this is needed as cv2 works in BGR 
-    # colorspace as opposed to RGB colorspace.
-    heatmap = cv2.cvtColor(heatmap, cv2.COLOR_BGR2RGB)
+def grayscale_qimage(np_pixels):
+    """
+    :param np_pixels: 2D array of 8-bit gray values
+    :return: QImage of the pixels, sharing their memory
+    """
+    bytes_per_line = np_pixels.shape[1]
+    return QtGui.QImage(
+        np_pixels,
+        np_pixels.shape[1],
+        np_pixels.shape[0],
+        bytes_per_line,
+        QtGui.QImage.Format_Grayscale8)
 
-    # Fix as colored images have 3*8 bits = 3 bytes instead of one
-    bytes_per_line = np_pixels.shape[1] * 3
 
-    qimage = QtGui.QImage(
-        heatmap,
-        heatmap.shape[1],
-        heatmap.shape[0],
+def rgb_qimage(rgb):
+    """
+    :param rgb: 2D array of colours packed as 0xffRRGGBB, see Colormaps
+    :return: QImage of the colours, sharing their memory
+    """
+    # Colored images have 4 bytes per pixel instead of one
+    bytes_per_line = rgb.shape[1] * 4
+    return QtGui.QImage(
+        rgb,
+        rgb.shape[1],
+        rgb.shape[0],
         bytes_per_line,
-        QtGui.QImage.Format_RGB888)
-
-    return qimage
+        QtGui.QImage.Format_RGB32)
 
 
 def get_pixmaps(pixel_array, window, level, pixmap_aspect,
                 fusion=False, color=None):
     """
-    Get a dictionary of pixmaps.
+    Get the pixmaps of the axial, coronal and sagittal views. The pixmaps
+    are rendered when they are first requested, and are kept in a
+    PixmapCache shared by the 3 views.
 
-    :param pixel_array: A list of converted pixel arrays
+    :param pixel_array: An ImageVolume, LazyPixelValues or list of
+    converted pixel arrays
     :param window: Window width of windowing function
     :param level: Level value of windowing function
     :param pixmap_aspect: Scaling ratio for axial, coronal, and sagittal pixmaps
     :param fusion: Boolean to determine if pixmaps will be fused
     :param color: String for conversion of pixels to specified color map
-    :return: dict_pixmaps, a dictionary of all pixmaps within the patient.
-    """
-    # Convert pixel array to numpy 3d array
-    pixel_array_3d = np.array(pixel_array)
-
-    # Pixmaps dictionaries of 3 views
-    dict_pixmaps_axial = {}
-    dict_pixmaps_coronal = {}
-    dict_pixmaps_sagittal = {}
-
-    axial_width, axial_height = scaled_size(
-        pixel_array_3d.shape[1] * pixmap_aspect["axial"],
-        pixel_array_3d.shape[2])
-    coronal_width, coronal_height = scaled_size(
-        pixel_array_3d.shape[1],
-        pixel_array_3d.shape[0] *
-        pixmap_aspect["coronal"])
-    sagittal_width, sagittal_height = scaled_size(
-        pixel_array_3d.shape[2] * pixmap_aspect["sagittal"],
-        pixel_array_3d.shape[0])
-
-    for i in range(pixel_array_3d.shape[0]):
-        dict_pixmaps_axial[i] = scaled_pixmap(
-            pixel_array_3d[i, :, :],
-            window,
-            level,
-            axial_width,
-            axial_height,
-            fusion,
-            color)
-
-    for i in range(pixel_array_3d.shape[1]):
-        dict_pixmaps_coronal[i] = scaled_pixmap(
-            pixel_array_3d[:, i, :],
-            window,
-            level,
-            coronal_width,
-            coronal_height,
-            fusion,
-            color)
-
-        dict_pixmaps_sagittal[i] = scaled_pixmap(
-            pixel_array_3d[:, :, i],
-            window,
-            level,
-            sagittal_width,
-            sagittal_height,
-            fusion,
-            color)
-
-    return dict_pixmaps_axial, dict_pixmaps_coronal, dict_pixmaps_sagittal
+    :return: Tuple of the PixmapRenderers of the axial, coronal and
+    sagittal views, which are indexed by slice like dictionaries.
+    """
+    # Imported here as PixmapRenderer renders slices with scaled_pixmap
+    from src.Model.PixmapRenderer import PixmapCache, PixmapRenderer
+
+    # View the pixel arrays as a numpy 3d array. This does not copy an
+    # ImageVolume. The slices of LazyPixelValues are decoded one at a time
+    # as they are rendered, rather than all stacked into a new array.
+    if isinstance(pixel_array, LazyPixelValues):
+        pixel_array_3d = pixel_array
+    else:
+        pixel_array_3d = np.asarray(pixel_array)
+
+    cache = PixmapCache()
+    sizes = get_pixmap_sizes(pixel_array_3d.shape, pixmap_aspect)
+    return tuple(
+        PixmapRenderer(pixel_array_3d, view, window, level, width, height,
+                       fusion, color, cache)
+        for view, (width, height) in zip(("axial", "coronal", "sagittal"),
+                                         sizes))
+
+
+def get_pixmap_sizes(shape, pixmap_aspect):
+    """
+    Get the sizes of the pixmaps of the 3 views of a volume.
+
+    :param shape: Shape of the volume (slices, rows, columns)
+    :param pixmap_aspect: Scaling ratio for axial, coronal, and sagittal
+    pixmaps
+    :return: Tuple of the (width, height) of the axial, coronal and
+    sagittal pixmaps
+    """
+    axial_size = scaled_size(shape[1] * pixmap_aspect["axial"], shape[2])
+    coronal_size = scaled_size(shape[1], shape[0] * pixmap_aspect["coronal"])
+    sagittal_size = scaled_size(shape[2] * pixmap_aspect["sagittal"],
+                                shape[0])
+    return axial_size, coronal_size, sagittal_size
 
 
 def scaled_size(width, height):
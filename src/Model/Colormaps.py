@@ -0,0 +1,128 @@
+"""
+RGB colour maps through lookup tables.
+
+A colour map is a table of the RGB colour of each of the 256 windowed
+values, built once. The colours are packed into 32-bit integers
+0xffRRGGBB, the layout of a QImage of Format_RGB32, which Qt scales and
+turns into pixmaps without converting it first. Colouring a windowed
+slice, or a whole slab of slices, is then one np.take over the windowed
+values. The colour map and a window and level can also be combined into
+one table of the colour of each 16-bit pixel value, so raw pixel values
+are windowed and coloured in a single gather.
+
+"Heat" is OpenCV's COLORMAP_HOT, which the PET images have always been
+shown with. The other colour maps are the well-known colour palettes of
+the DICOM standard (PS3.6 Annex B) used in nuclear medicine.
+
+Example usage:
+rgb = apply_window_colormap(volume, window, level, "Hot Iron")
+"""
+import functools
+
+import cv2
+import numpy as np
+
+from src.Model.WindowingLUT import get_window_lut, lut_indices
+
+try:
+    from pydicom.pixels import apply_color_lut
+except ImportError:
+    # pydicom < 3
+    from pydicom.pixel_data_handlers.util import apply_color_lut
+
+# UIDs of the well-known colour palettes of the DICOM standard
+DICOM_PALETTES = {
+    "Hot Iron": "1.2.840.10008.1.5.1",
+    "PET": "1.2.840.10008.1.5.2",
+    "Hot Metal Blue": "1.2.840.10008.1.5.3",
+    "PET 20 Step": "1.2.840.10008.1.5.4",
+}
+
+# Names of the colour maps
+COLORMAPS = ("Heat",) + tuple(DICOM_PALETTES)
+
+
+@functools.lru_cache(maxsize=None)
+def get_colormap_lut(name):
+    """
+    Build the lookup table of a colour map.
+
+    :param name: Name of the colour map, one of COLORMAPS.
+    :return: Read-only array of the 256 colours of the windowed values,
+    packed as 0xffRRGGBB.
+    """
+    values = np.arange(256, dtype=np.uint8)
+    if name == "Heat":
+        rgb = cv2.applyColorMap(values.reshape(1, -1), cv2.COLORMAP_HOT)
+        # OpenCV colours are BGR
+        rgb = rgb[0, :, ::-1]
+    elif name in DICOM_PALETTES:
+        rgb = apply_color_lut(values, palette=DICOM_PALETTES[name])
+    else:
+        raise ValueError("Unknown colour map '%s'" % name)
+    rgb = rgb.astype(np.uint32)
+    lut = 0xff000000 | rgb[:, 0] << 16 | rgb[:, 1] << 8 | rgb[:, 2]
+    lut.flags.writeable = False
+    return lut
+
+
+@functools.lru_cache(maxsize=8)
+def get_window_colormap_lut(window, level, name):
+    """
+    Build the lookup table of a window and level followed by a colour
+    map.
+
+    :param window: Window width of windowing function
+    :param level: Lowest pixel value of the window
+    :param name: Name of the colour map, one of COLORMAPS.
+    :return: Read-only array of the packed colour of each 16-bit pixel
+    value, indexed like get_window_lut.
+    """
+    lut = get_colormap_lut(name)[get_window_lut(window, level)]
+    lut.flags.writeable = False
+    return lut
+
+
+def apply_colormap(pixels, name, out=None):
+    """
+    Colour windowed pixel values.
+
+    :param pixels: Array of windowed values between 0 and 255, of any
+    shape.
+    :param name: Name of the colour map, one of COLORMAPS.
+    :param out: uint32 array to store the colours in.
+    :return: C ordered array of the colours, packed as 0xffRRGGBB, of the
+    shape of pixels.
+    """
+    pixels = np.asarray(pixels)
+    if pixels.dtype != np.uint8:
+        pixels = pixels.astype(np.uint8)
+    return np.take(get_colormap_lut(name), pixels, out=out)
+
+
+def apply_window_colormap(pixels, window, level, name, out=None):
+    """
+    Window and colour an array of pixel values in a single gather.
+
+    :param pixels: Array of pixel values of any shape, e.g. a slice or a
+    volume.
+    :param window: Window width of windowing function
+    :param level: Lowest pixel value of the window
+    :param name: Name of the colour map, one of COLORMAPS.
+    :param out: uint32 array to store the colours in.
+    :return: C ordered array of the colours, packed as 0xffRRGGBB, of the
+    shape of pixels.
+    """
+    return np.take(get_window_colormap_lut(window, level, name),
+                   lut_indices(pixels), out=out)
+
+
+def unpack_rgb(colors):
+    """
+    :param colors: Array of colours packed as 0xffRRGGBB.
+    :return: uint8 array of the shape of colors plus a last axis of the
+    red, green and blue values.
+    """
+    colors = np.asarray(colors, dtype=np.uint32)
+    return np.stack([colors >> 16, colors >> 8, colors],
+                    axis=-1).astype(np.uint8)
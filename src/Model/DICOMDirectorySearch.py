@@ -1,10 +1,41 @@
 import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from pydicom import dcmread
 from pydicom.errors import InvalidDicomError
 
+from src.Model.DICOMIndex import DICOMIndex
 from src.Model.DICOMStructure import DICOMStructure, Patient, Study, \
-    Series, Image
+    Series, Image, REFERENCED_OBJECT_ATTRIBUTES
+from src.Model.PerformanceOptions import get_performance_option
+
+# The only attributes needed to place a file in the DICOMStructure.
+# Reading just these avoids parsing (and loading) the rest of the file.
+SEARCH_TAGS = [
+    "PatientID",
+    "PatientName",
+    "StudyInstanceUID",
+    "StudyDescription",
+    "SeriesInstanceUID",
+    "SeriesDescription",
+    "SOPInstanceUID",
+    "SOPClassUID",
+    "Modality",
+    "FrameOfReferenceUID",
+    "ReferencedFrameOfReferenceSequence",
+    "ReferencedStructureSetSequence",
+    "ReferencedRTPlanSequence",
+    "ReferencedFrameOfReferenceUID",
+]
+
+# Number of files read by a worker at a time. Small enough that an
+# interrupted search stops quickly.
+SEARCH_CHUNK_SIZE = 64
+
+# Minimum number of seconds between two progress updates.
+PROGRESS_INTERVAL = 0.1
 
 
 def get_dicom_structure(path, interrupt_flag, progress_callback):
@@ -13,6 +44,12 @@ def get_dicom_structure(path, interrupt_flag, progress_callback):
     Patient>Study>Series>Image structure based on the DICOM files in the
     directory and subdirectories.
 
+    When the "use_dicom_index" performance option is set, the attributes
+    of each file are stored in the DICOMIndex, and only files that are
+    new or have changed since the last search are read. Only the
+    attributes in SEARCH_TAGS are read from each file, by a pool of
+    "search_workers" threads while the directory is still being walked.
+
     :param path: The root directory to search from.
     :param interrupt_flag: A threading.Event() flag to indicate whether
         or not the process has been interrupted.
@@ -20,113 +57,373 @@ def get_dicom_structure(path, interrupt_flag, progress_callback):
         the current search.
     :return: Complete DICOMStructure object with associated DICOM files
     """
+    index = None
+    indexed_records = {}
+    if get_performance_option("use_dicom_index"):
+        try:
+            index = DICOMIndex()
+            indexed_records = index.get_records(path)
+        except sqlite3.Error:
+            # Fall back to reading every file
+            index = None
 
-    dicom_structure = DICOMStructure()
+    # Records are kept in the order the files are found so that the
+    # structure does not depend on the order the files are read in.
+    records = []
+    progress = SearchProgress(progress_callback)
+    reader = FileRecordReader(records, interrupt_flag, progress)
 
-    files_searched = 0
+    try:
+        for file_path in walk_directory(path):
+            if interrupt_flag.is_set():
+                return
 
-    files_with_no_patient_id = 1
+            # Fix to program crashing when encountering DICOMDIR files
+            if os.path.basename(file_path) == "DICOMDIR":
+                progress.update(1)
+                continue
+
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                progress.update(1)
+                continue
+
+            record = indexed_records.pop(file_path, None)
+            if record is None or record["size"] != file_stat.st_size \
+                    or record["mtime"] != file_stat.st_mtime:
+                records.append(None)
+                reader.add(len(records) - 1, file_path, file_stat)
+            else:
+                records.append(record)
+                progress.update(1)
+
+        new_records = reader.finish()
+    finally:
+        reader.close()
+    save_records(index, new_records)
+    if interrupt_flag.is_set():
+        return
+
+    progress.finish()
+    if index is not None:
+        # Whatever is left was not found by this search
+        try:
+            index.remove_records(indexed_records.keys())
+        except sqlite3.Error:
+            pass
+
+    return build_dicom_structure(
+        [record for record in records if record is not None])
+
+
+class SearchProgress:
+    """
+    Counts the files searched and emits the count through the progress
+    callback at most once every PROGRESS_INTERVAL seconds.
+    """
+
+    def __init__(self, progress_callback):
+        """
+        :param progress_callback: A function that receives the progress
+            of the current search.
+        """
+        self.progress_callback = progress_callback
+        self.files_searched = 0
+        self.last_emit_time = None
+
+    def update(self, files_searched):
+        """
+        :param files_searched: Number of files searched since the last
+            update.
+        """
+        self.files_searched += files_searched
+        now = time.monotonic()
+        if self.last_emit_time is None \
+                or now - self.last_emit_time >= PROGRESS_INTERVAL:
+            self.last_emit_time = now
+            self.progress_callback.emit("%s" % self.files_searched)
+
+    def finish(self):
+        """
+        Emits the final count of files searched.
+        """
+        self.progress_callback.emit("%s" % self.files_searched)
+
+
+class FileRecordReader:
+    """
+    Reads the records of the files found by a search while the directory
+    is still being walked. Files are read in chunks of SEARCH_CHUNK_SIZE,
+    by a pool of "search_workers" threads, or as soon as a chunk is
+    filled when there is only one worker.
+    """
+
+    def __init__(self, records, interrupt_flag, progress):
+        """
+        :param records: List of records to fill in.
+        :param interrupt_flag: A threading.Event() flag to indicate
+            whether or not the process has been interrupted.
+        :param progress: The SearchProgress of the current search.
+        """
+        self.records = records
+        self.interrupt_flag = interrupt_flag
+        self.progress = progress
+        # Reading headers is mostly bound by the CPU, so there is
+        # nothing to gain from more workers than CPUs
+        self.max_workers = min(get_performance_option("search_workers"),
+                               os.cpu_count() or 1)
+        self.executor = None
+        self.chunk = []
+        # Dictionary of the chunk read by each pending future
+        self.pending = {}
+        self.new_records = []
+
+    def add(self, position, file_path, file_stat):
+        """
+        Queues a file to be read.
+        :param position: Position of the file's record in records.
+        :param file_path: Path of the file.
+        :param file_stat: Result of os.stat for the file.
+        """
+        self.chunk.append((position, file_path, file_stat))
+        if len(self.chunk) >= SEARCH_CHUNK_SIZE:
+            self.read_chunk()
+
+    def read_chunk(self):
+        """
+        Reads the queued files, or hands them to the pool of workers.
+        """
+        chunk, self.chunk = self.chunk, []
+        if not chunk:
+            return
+        if self.max_workers <= 1:
+            for position, file_path, file_stat in chunk:
+                if self.interrupt_flag.is_set():
+                    return
+                self.store(position, read_file_record(file_path, file_stat))
+                self.progress.update(1)
+            return
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.pending[self.executor.submit(read_file_chunk, chunk)] = chunk
+        self.collect(0)
+
+    def collect(self, timeout):
+        """
+        Stores the records of the chunks that have been read.
+        :param timeout: Number of seconds to wait for a chunk to be read.
+        """
+        done, _ = wait(self.pending, timeout=timeout,
+                       return_when=FIRST_COMPLETED)
+        for future in done:
+            chunk = self.pending.pop(future)
+            for (position, _, _), record in zip(chunk, future.result()):
+                self.store(position, record)
+            self.progress.update(len(chunk))
+
+    def store(self, position, record):
+        """
+        Puts a record that has been read in the records list.
+        """
+        self.records[position] = record
+        if record is not None:
+            self.new_records.append(record)
+
+    def finish(self):
+        """
+        Reads the files still queued and waits for the workers.
+        :return: List of the records read, for saving to the index. When
+            the search is interrupted, this holds the records read so
+            far.
+        """
+        self.read_chunk()
+        while self.pending and not self.interrupt_flag.is_set():
+            self.collect(PROGRESS_INTERVAL)
+        return self.new_records
+
+    def close(self):
+        """
+        Cancels the chunks that have not been read yet and shuts the pool
+        of workers down without waiting for the chunks being read.
+        """
+        if self.executor is None:
+            return
+        # shutdown(cancel_futures=True) needs Python 3.9
+        for future in self.pending:
+            future.cancel()
+        self.executor.shutdown(wait=False)
+        self.executor = None
+
+
+def read_file_chunk(chunk):
+    """
+    Reads the records of a chunk of files. Run by the search workers.
+    :param chunk: List of tuples (position in records, file path,
+        os.stat result).
+    :return: List of records, in the order of the chunk.
+    """
+    return [read_file_record(file_path, file_stat)
+            for _, file_path, file_stat in chunk]
 
+
+def walk_directory(path):
+    """
+    Generates the paths of the files in the given directory and its
+    subdirectories, skipping hidden files and directories.
+    :param path: The root directory to search from.
+    :return: Generator of file paths.
+    """
     for root, dirs, files in os.walk(path, topdown=True):
         files = [f for f in files if not f[0] == '.']
         dirs[:] = [d for d in dirs if not d[0] == '.']
         for file in files:
-            if file[0] == '.':
-                break
-            if interrupt_flag.is_set():
-                return
+            yield root + os.sep + file
 
-            # The progress is updated first because the total files
-            # represent ALL files inside the selected directory, not
-            # just the DICOM files. Otherwise, most files would be
-            # skipped and the progress would be inaccurate.
-            files_searched += 1
-            progress_callback.emit("%s" % files_searched)
 
-            # Fix to program crashing when encountering DICOMDIR files
-            if file == "DICOMDIR":
-                continue
+def save_records(index, records):
+    """
+    Saves the given records to the index, if there is one.
+    :param index: A DICOMIndex object, or None.
+    :param records: List of records to save.
+    """
+    if index is None:
+        return
+    try:
+        index.update_records(records)
+    except sqlite3.Error:
+        pass
+
+
+def read_file_record(file_path, file_stat):
+    """
+    Reads a file and creates the record used to build the DICOMStructure
+    and to store the file in the DICOMIndex.
+    :param file_path: Path of the file.
+    :param file_stat: Result of os.stat for the file.
+    :return: Dictionary of the file's attributes, or None if the file
+        could not be read.
+    """
+    record = {
+        "path": file_path,
+        "size": file_stat.st_size,
+        "mtime": file_stat.st_mtime,
+        "is_dicom": 0,
+    }
+    try:
+        dicom_file = dcmread(file_path, stop_before_pixels=True,
+                             specific_tags=SEARCH_TAGS)
+    except InvalidDicomError:
+        return record
+    except (FileNotFoundError, PermissionError):
+        return None
+
+    record["is_dicom"] = 1
+    if 'PatientID' in dicom_file:
+        record["patient_id"] = str(dicom_file.PatientID)
+    if 'PatientName' in dicom_file:
+        record["patient_name"] = str(dicom_file.PatientName)
+    record["study_uid"] = dicom_file.get("StudyInstanceUID")
+    record["study_description"] = dicom_file.get("StudyDescription")
+    record["series_uid"] = dicom_file.get("SeriesInstanceUID")
+    record["series_description"] = dicom_file.get("SeriesDescription")
+
+    if "SOPInstanceUID" in dicom_file \
+            and "SOPClassUID" in dicom_file \
+            and "Modality" in dicom_file:
+        record["sop_instance_uid"] = dicom_file.SOPInstanceUID
+        record["sop_class_uid"] = dicom_file.SOPClassUID
+        record["modality"] = dicom_file.Modality
+
+        series = Series(record["series_uid"])
+        series.add_referenced_objects(dicom_file)
+        record.update(series.get_referenced_objects())
+
+    return record
+
+
+def build_dicom_structure(records):
+    """
+    Creates a DICOMStructure from a list of file records.
+    :param records: List of records, as created by read_file_record, in
+        the order the files were found.
+    :return: Complete DICOMStructure object with associated DICOM files
+    """
+    dicom_structure = DICOMStructure()
+    files_with_no_patient_id = 1
+
+    for record in records:
+        if not record["is_dicom"]:
+            continue
+
+        if record.get("patient_id") is not None:
+            patient_id = record["patient_id"]
+        else:
+            patient_id = "no_id_" + str(files_with_no_patient_id)
+            files_with_no_patient_id += 1
+
+        if record.get("sop_instance_uid") is None:
+            continue
+        add_record(dicom_structure, patient_id, record)
 
-            file_path = root + os.sep + file
-            try:
-                dicom_file = dcmread(file_path)
-            except (InvalidDicomError, FileNotFoundError, PermissionError):
-                pass
-            else:
-                if 'PatientID' in dicom_file:
-                    patient_id = dicom_file.PatientID
-                else:
-                    patient_id = "no_id_" + str(files_with_no_patient_id)
-                    files_with_no_patient_id += 1
-
-                if "SOPInstanceUID" in dicom_file \
-                        and "SOPClassUID" in dicom_file \
-                        and "Modality" in dicom_file:
-                    new_image = Image(file_path,
-                                      dicom_file.SOPInstanceUID,
-                                      dicom_file.SOPClassUID,
-                                      dicom_file.Modality)
-                    if not dicom_structure.has_patient(patient_id):
-                        # TODO there is definitely a more efficient way of
-                        #  doing this
-                        new_series = Series(dicom_file.SeriesInstanceUID)
-                        new_series.series_description = dicom_file.get(
-                            "SeriesDescription")
-                        new_series.add_referenced_objects(dicom_file)
-                        new_series.add_image(new_image)
-
-                        new_study = Study(dicom_file.StudyInstanceUID)
-                        new_study.study_description = dicom_file.get(
-                            "StudyDescription")
-                        new_study.add_series(new_series)
-
-                        new_patient = Patient(patient_id,
-                                              dicom_file.PatientName)
-                        new_patient.add_study(new_study)
-
-                        dicom_structure.add_patient(new_patient)
-                    else:
-                        existing_patient = dicom_structure.get_patient(
-                            dicom_file.PatientID)
-                        if not existing_patient.has_study(
-                                dicom_file.StudyInstanceUID):
-                            new_series = Series(dicom_file.SeriesInstanceUID)
-                            new_series.series_description = dicom_file.get(
-                                "SeriesDescription")
-                            new_series.add_referenced_objects(dicom_file)
-                            new_series.add_image(new_image)
-
-                            new_study = Study(dicom_file.StudyInstanceUID)
-                            new_study.study_description = dicom_file.get(
-                                "StudyDescription")
-                            new_study.add_series(new_series)
-
-                            existing_patient.add_study(new_study)
-                        else:
-                            existing_study = existing_patient.get_study(
-                                dicom_file.StudyInstanceUID)
-                            if not existing_study.has_series(
-                                    dicom_file.SeriesInstanceUID):
-                                new_series = Series(
-                                    dicom_file.SeriesInstanceUID)
-                                new_series.series_description = dicom_file.get(
-                                    "SeriesDescription")
-                                new_series.add_referenced_objects(dicom_file)
-                                new_series.add_image(new_image)
-
-                                existing_study.add_series(new_series)
-                            else:
-                                existing_series = existing_study.get_series(
-                                    dicom_file.SeriesInstanceUID)
-                                if not existing_series.has_image(
-                                        dicom_file.SOPInstanceUID):
-                                    existing_series.series_description = \
-                                        dicom_file.get("SeriesDescription")
-                                    existing_series.add_image(new_image)
-                                    
     return dicom_structure
 
 
-if __name__ == "__main__":
-    ds = get_dicom_structure("XR.Identified")
-    print(ds.get_files())
+def add_record(dicom_structure, patient_id, record):
+    """
+    Adds the Image of a file record to the DICOMStructure, creating its
+    Patient, Study and Series if they do not exist yet.
+    :param dicom_structure: The DICOMStructure to add to.
+    :param patient_id: The ID of the patient the file belongs to.
+    :param record: Dictionary of the file's attributes.
+    """
+    new_image = Image(record["path"], record["sop_instance_uid"],
+                      record["sop_class_uid"], record["modality"])
+
+    existing_patient = dicom_structure.get_patient(patient_id)
+    if existing_patient is None:
+        new_patient = Patient(patient_id, record.get("patient_name"))
+        new_patient.add_study(create_study(record, new_image))
+        dicom_structure.add_patient(new_patient)
+    elif not existing_patient.has_study(record["study_uid"]):
+        existing_patient.add_study(create_study(record, new_image))
+    else:
+        existing_study = existing_patient.get_study(record["study_uid"])
+        if not existing_study.has_series(record["series_uid"]):
+            existing_study.add_series(create_series(record, new_image))
+        else:
+            existing_series = existing_study.get_series(
+                record["series_uid"])
+            if not existing_series.has_image(record["sop_instance_uid"]):
+                existing_series.series_description = \
+                    record.get("series_description")
+                existing_series.add_image(new_image)
+
+
+def create_study(record, image):
+    """
+    :param record: Dictionary of a file's attributes.
+    :param image: The Image object of the file.
+    :return: A new Study containing a new Series with the image.
+    """
+    new_study = Study(record["study_uid"])
+    new_study.study_description = record.get("study_description")
+    new_study.add_series(create_series(record, image))
+    return new_study
+
+
+def create_series(record, image):
+    """
+    :param record: Dictionary of a file's attributes.
+    :param image: The Image object of the file.
+    :return: A new Series containing the image.
+    """
+    new_series = Series(record["series_uid"])
+    new_series.series_description = record.get("series_description")
+    new_series.set_referenced_objects(
+        {attribute: value for attribute, value in record.items()
+         if attribute in REFERENCED_OBJECT_ATTRIBUTES
+         and value is not None})
+    new_series.add_image(image)
+    return new_series
@@ -0,0 +1,184 @@
+import os
+import sqlite3
+from pathlib import Path
+
+from src.Model.Configuration import set_up_hidden_dir
+from src.Model.DICOMStructure import REFERENCED_OBJECT_ATTRIBUTES
+from src.Model.Singleton import Singleton
+
+# Columns of the DICOM_FILES table, in the order they are stored. Every
+# file found by the directory search gets a row so that files which are
+# not DICOM files are not read again on the next search.
+INDEX_COLUMNS = [
+    "path",
+    "size",
+    "mtime",
+    "is_dicom",
+    "patient_id",
+    "patient_name",
+    "study_uid",
+    "study_description",
+    "series_uid",
+    "series_description",
+    "sop_instance_uid",
+    "sop_class_uid",
+    "modality",
+] + REFERENCED_OBJECT_ATTRIBUTES
+
+
+class DICOMIndex(metaclass=Singleton):
+    """
+    This Singleton class is a persistent index of the files found by
+    DICOMDirectorySearch. It is stored in a sqlite database in the hidden
+    directory and holds, for each file, its size and modification time
+    along with the DICOM attributes needed to build a DICOMStructure.
+    This allows a directory to be searched again without reading the
+    files that have not changed since the last search.
+    Example usage:
+    index = DICOMIndex()
+    records = index.get_records(path)
+    """
+
+    def __init__(self, db_file='DICOMIndex.db'):
+        """
+        The database is not opened until the index is first used, so
+        that its path can be changed beforehand.
+        :param db_file: Name of the database file in the hidden
+            directory.
+        """
+        self.db_file = db_file
+        self.db_file_path = None
+        self.index_set_up = False
+
+    def connect(self):
+        """
+        Opens a connection to the database, creating the DICOM_FILES
+        table the first time.
+        :return: The sqlite3 connection.
+        """
+        if self.db_file_path is None:
+            set_up_hidden_dir()
+            self.db_file_path = Path(
+                os.environ['USER_ONKODICOM_HIDDEN']).joinpath(self.db_file)
+        connection = sqlite3.connect(self.db_file_path)
+        if not self.index_set_up:
+            self.set_up_index_db(connection)
+            self.index_set_up = True
+        return connection
+
+    def set_up_index_db(self, connection):
+        """
+        Create the DICOM_FILES table inside the SQLite database
+        :param connection: Connection to the database.
+        """
+        columns = ",\n".join("%s %s" % (column, column_type(column))
+                             for column in INDEX_COLUMNS)
+        connection.execute("""
+                    CREATE TABLE IF NOT EXISTS DICOM_FILES (
+                        %s
+                    );
+                """ % columns)
+        connection.commit()
+
+    def set_db_file_path(self, path):
+        """
+        Changes the path of the database file, which is opened when the
+        index is next used. Used by tests to keep the user's index
+        untouched.
+        :param path: Path of the new database file.
+        """
+        self.db_file_path = path
+        self.index_set_up = False
+
+    def get_records(self, path):
+        """
+        :param path: The root directory of a search.
+        :return: Dictionary of the records of all indexed files below the
+        given directory, keyed by file path. Each record is a dictionary
+        keyed by the names in INDEX_COLUMNS.
+        """
+        prefix = directory_prefix(path)
+        connection = self.connect()
+        try:
+            cursor = connection.execute(
+                "SELECT %s FROM DICOM_FILES WHERE substr(path, 1, ?) = ?"
+                % ", ".join(INDEX_COLUMNS), (len(prefix), prefix))
+            records = {row[0]: dict(zip(INDEX_COLUMNS, row))
+                       for row in cursor}
+        finally:
+            connection.close()
+        return records
+
+    def update_records(self, records):
+        """
+        Adds the given records to the index, replacing any existing
+        records for the same files.
+        :param records: List of records, as returned by get_records.
+        """
+        if not records:
+            return
+        connection = self.connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO DICOM_FILES (%s) VALUES (%s)"
+                    % (", ".join(INDEX_COLUMNS),
+                       ", ".join("?" * len(INDEX_COLUMNS))),
+                    [[column_value(record.get(column))
+                      for column in INDEX_COLUMNS]
+                     for record in records])
+        finally:
+            connection.close()
+
+    def remove_records(self, paths):
+        """
+        Removes the records of the given files from the index.
+        :param paths: Iterable of file paths.
+        """
+        paths = [(path,) for path in paths]
+        if not paths:
+            return
+        connection = self.connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "DELETE FROM DICOM_FILES WHERE path = ?", paths)
+        finally:
+            connection.close()
+
+
+def column_type(column):
+    """
+    :param column: Name of a column in INDEX_COLUMNS.
+    :return: The column definition used in the DICOM_FILES table.
+    """
+    if column == "path":
+        return "TEXT PRIMARY KEY"
+    if column in ("size", "is_dicom"):
+        return "INTEGER"
+    if column == "mtime":
+        return "REAL"
+    return "TEXT"
+
+
+def column_value(value):
+    """
+    :param value: A value of a record.
+    :return: The value as a type that can be stored by sqlite. pydicom
+    values such as UIDs and PersonNames are stored as text.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return str(value)
+
+
+def directory_prefix(path):
+    """
+    :param path: A directory path.
+    :return: The prefix shared by the paths of all files below the
+    directory.
+    """
+    path = str(path)
+    if path.endswith(os.sep):
+        return path
+    return path + os.sep
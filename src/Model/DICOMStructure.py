@@ -2,6 +2,16 @@ from PySide6.QtCore import Qt
 
 from src.Model.DICOMWidgetItem import DICOMWidgetItem
 
+# Attributes of a Series that are read from the referenced objects of a
+# DICOM file.
+REFERENCED_OBJECT_ATTRIBUTES = [
+    "frame_of_reference_uid",
+    "ref_image_series_uid",
+    "ref_rtstruct_instance_uid",
+    "ref_rtplan_instance_uid",
+    "referenced_frame_of_reference_uid",
+]
+
 
 class DICOMStructure:
     """
@@ -423,6 +433,24 @@ class Series:
         else:
             self.ref_rtplan_instance_uid = ''
 
+    def get_referenced_objects(self):
+        """
+        :return: Dictionary of the referenced object attributes set by
+        add_referenced_objects, keyed by attribute name.
+        """
+        return {attribute: getattr(self, attribute)
+                for attribute in REFERENCED_OBJECT_ATTRIBUTES
+                if hasattr(self, attribute)}
+
+    def set_referenced_objects(self, referenced_objects):
+        """
+        Sets the referenced object attributes from a dictionary returned
+        by get_referenced_objects.
+        :param referenced_objects: Dictionary of attribute names and values.
+        """
+        for attribute, value in referenced_objects.items():
+            setattr(self, attribute, value)
+
     def has_image(self, image_uid):
         """
         :param image_uid: A SOPInstanceUID to check.
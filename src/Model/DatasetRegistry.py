@@ -0,0 +1,147 @@
+import os
+import threading
+import weakref
+
+from pydicom import dcmread
+
+from src.Model.Singleton import Singleton
+
+
+class DatasetRegistry(metaclass=Singleton):
+    """
+    This Singleton class holds the datasets that have already been read
+    from disk, keyed by file path, so that a file read when a patient is
+    opened is not read again by every part of the program that needs it
+    (e.g. the RTSS and RTDOSE, which are needed for ROI, DVH and DICOM
+    tree data). A dataset is only handed out while the file's
+    modification time and size are unchanged; otherwise the file is
+    read again.
+
+    The image slices of a series are registered together, and are only
+    referenced weakly: they are handed out while the patient still holds
+    them, but the registry does not keep every slice in memory. The
+    registry is cleared with the PatientDictContainer when the patient
+    is closed.
+
+    The registry counts hits and misses so the number of reads it saves
+    can be seen.
+    Example usage:
+    dataset_rtss = DatasetRegistry().get(file_names_dict['rtss'])
+    """
+
+    def __init__(self):
+        self.datasets = {}
+        # Dictionary of the weakly referenced slices of each series, by
+        # SeriesInstanceUID, and of the series of each slice's file
+        self.series = {}
+        self.series_keys = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def register(self, path, dataset):
+        """
+        Adds a dataset that has been read from the given file, replacing
+        any dataset already registered for it.
+        :param path: Path of the file the dataset was read from.
+        :param dataset: The PyDicom dataset.
+        """
+        key = registry_key(path)
+        try:
+            file_stat = os.stat(key)
+        except OSError:
+            return
+        with self._lock:
+            self.datasets[key] = \
+                (file_stat.st_mtime_ns, file_stat.st_size, dataset)
+
+    def register_series(self, series_uid, paths, datasets):
+        """
+        Adds the image slices of a series that have been read, replacing
+        any slices already registered for the series. The slices are
+        only referenced weakly.
+        :param series_uid: SeriesInstanceUID of the slices.
+        :param paths: List of the paths of the files the slices were read
+            from.
+        :param datasets: List of the PyDicom datasets, in the same order
+            as paths.
+        """
+        slices = {}
+        for path, dataset in zip(paths, datasets):
+            key = registry_key(path)
+            try:
+                file_stat = os.stat(key)
+            except OSError:
+                continue
+            slices[key] = (file_stat.st_mtime_ns, file_stat.st_size,
+                           weakref.ref(dataset))
+        with self._lock:
+            for key in self.series.pop(series_uid, {}):
+                del self.series_keys[key]
+            self.series[series_uid] = slices
+            for key in slices:
+                self.series_keys[key] = series_uid
+
+    def get(self, path, force=False):
+        """
+        Gets the dataset of a file, reading the file if it has not been
+        read before or has changed since.
+        :param path: Path of the file.
+        :param force: Passed to dcmread when the file is read.
+        :return: The PyDicom dataset of the file.
+        """
+        key = registry_key(path)
+        file_stat = os.stat(key)
+        with self._lock:
+            series_uid = self.series_keys.get(key)
+            if series_uid is None:
+                entry = self.datasets.get(key)
+                dataset = entry[2] if entry is not None else None
+            else:
+                entry = self.series[series_uid][key]
+                # None if the slice is no longer held by the patient
+                dataset = entry[2]()
+            if dataset is not None and entry[0] == file_stat.st_mtime_ns \
+                    and entry[1] == file_stat.st_size:
+                self.hits += 1
+                return dataset
+            self.misses += 1
+
+        dataset = dcmread(key, force=force)
+        with self._lock:
+            if series_uid is not None and key in self.series_keys:
+                self.series[series_uid][key] = \
+                    (file_stat.st_mtime_ns, file_stat.st_size,
+                     weakref.ref(dataset))
+            else:
+                self.datasets[key] = \
+                    (file_stat.st_mtime_ns, file_stat.st_size, dataset)
+        return dataset
+
+    def clear(self):
+        """
+        Removes all datasets and series, e.g. when the patient is closed.
+        The hit and miss counts are kept.
+        """
+        with self._lock:
+            self.datasets = {}
+            self.series = {}
+            self.series_keys = {}
+
+    def get_statistics(self):
+        """
+        :return: Dictionary of the number of hits and misses, of the
+            datasets held and of the series registered.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "datasets": len(self.datasets),
+                    "series": len(self.series)}
+
+
+def registry_key(path):
+    """
+    :param path: A file path, as a string or Path.
+    :return: The normalised absolute path used as a registry key.
+    """
+    return os.path.normcase(os.path.abspath(os.fspath(path)))
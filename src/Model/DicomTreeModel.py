@@ -0,0 +1,175 @@
+"""
+A lazy Qt item model of a DICOM dataset, for the DICOM tree view.
+
+Nothing is read from the dataset when the model is created. The rows
+under a node are only created when the view asks for them, i.e. when the
+node is expanded, and the value of an element is only formatted when its
+row is displayed. Opening a large RTSS therefore costs nothing until its
+ROI Contour Sequence is expanded, and then only for the items shown.
+"""
+from PySide6 import QtCore
+
+# Columns of the model
+COLUMNS = ["Name", "Value", "Tag", "VM", "VR"]
+
+# Elements that are not shown in the tree
+HIDDEN_ELEMENTS = ["Pixel Data"]
+
+# Values with more than this number of values (e.g. ContourData) are
+# shown shortened, with the number of values left out.
+MAX_DISPLAYED_VALUES = 64
+
+
+class DicomTreeNode:
+    """
+    A node of the DICOM tree: a dataset (or sequence item), a data
+    element, or the root of the tree.
+    """
+
+    def __init__(self, name, parent=None, row=0, dataset=None,
+                 data_element=None):
+        """
+        :param name: Text of the node's Name column.
+        :param parent: Parent DicomTreeNode, None for the root.
+        :param row: Row of the node under its parent.
+        :param dataset: The dataset or sequence item, for dataset nodes.
+        :param data_element: The data element, for element nodes.
+        """
+        self.name = name
+        self.parent = parent
+        self.row = row
+        self.dataset = dataset
+        self.data_element = data_element
+        self._children = None
+        self._text = None
+
+    def has_children(self):
+        """
+        :return: True if the node has rows under it, without creating
+            them.
+        """
+        if self.dataset is not None:
+            return len(self.dataset) > 0
+        if self.data_element is not None:
+            return self.data_element.VR == "SQ" \
+                and len(self.data_element.value) > 0
+        return False
+
+    def children(self):
+        """
+        :return: List of the node's child nodes, created on first use.
+        """
+        if self._children is None:
+            self._children = []
+            if self.dataset is not None:
+                for data_element in self.dataset:
+                    if data_element.name in HIDDEN_ELEMENTS:
+                        continue
+                    self._children.append(DicomTreeNode(
+                        data_element.name, self, len(self._children),
+                        data_element=data_element))
+            elif self.data_element is not None \
+                    and self.data_element.VR == "SQ":
+                for i, item in enumerate(self.data_element.value):
+                    self._children.append(DicomTreeNode(
+                        "item " + str(i), self, i, dataset=item))
+        return self._children
+
+    def text(self, column):
+        """
+        :param column: Index of the column.
+        :return: Text of the given column.
+        """
+        if column == 0:
+            return self.name
+        if self.data_element is None or self.data_element.VR == "SQ":
+            return ""
+        if self._text is None:
+            self._text = ["",
+                          format_value(self.data_element),
+                          repr(self.data_element.tag),
+                          str(self.data_element.VM),
+                          str(self.data_element.VR)]
+        return self._text[column]
+
+
+class DicomTreeModel(QtCore.QAbstractItemModel):
+    """
+    Read-only item model of a DICOM dataset with the columns Name, Value,
+    Tag, VM and VR.
+    """
+
+    def __init__(self, dataset=None, parent=None):
+        """
+        :param dataset: The PyDicom dataset shown by the model, or None
+            for an empty model.
+        :param parent: Parent QObject.
+        """
+        super().__init__(parent)
+        self.root = DicomTreeNode("", dataset=dataset)
+
+    def node(self, index):
+        """
+        :param index: A QModelIndex of the model.
+        :return: The DicomTreeNode of the index.
+        """
+        if index.isValid():
+            return index.internalPointer()
+        return self.root
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column,
+                                self.node(parent).children()[row])
+
+    def parent(self, index=QtCore.QModelIndex()):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self.root:
+            return QtCore.QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.node(parent).children())
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(COLUMNS)
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return False
+        return self.node(parent).has_children()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+        return index.internalPointer().text(index.column())
+
+    def headerData(self, section, orientation,
+                   role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal \
+                and role == QtCore.Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+
+def format_value(data_element):
+    """
+    :param data_element: A data element that is not a sequence.
+    :return: The element's value as text. Values with more than
+        MAX_DISPLAYED_VALUES values are shortened.
+    """
+    if data_element.VM > MAX_DISPLAYED_VALUES:
+        shown = ", ".join(str(value) for value
+                          in data_element.value[:MAX_DISPLAYED_VALUES])
+        return "[%s, ...] (%s values)" % (shown, data_element.VM)
+    return str(data_element.value)
@@ -0,0 +1,114 @@
+"""
+Line and fill styles of the ROIs and isodoses drawn on the DICOM views.
+
+The styles chosen in the add-on options are stored in
+line&fill_configuration. They are read once, and the QPen and QBrush of
+each ROI and isodose colour are created the first time that colour is
+drawn and reused afterwards, so drawing a slice reads no file. When the
+add-on options are saved, the styles are loaded again and style_changed
+is emitted for the views to be redrawn.
+
+Example usage:
+pen, brush = get_display_style().get_roi_pen_brush(color)
+"""
+from PySide6 import QtCore, QtGui
+
+from src.Controller.PathHandler import data_path
+
+
+class DisplayStyle(QtCore.QObject):
+    """
+    The line and fill styles of ROIs and isodoses, and the pens and
+    brushes of the colours drawn with them.
+    """
+
+    # Emitted when the styles have been loaded again
+    style_changed = QtCore.Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.roi_line = 1
+        self.roi_opacity = 10
+        self.iso_line = 2
+        self.iso_opacity = 5
+        self.line_width = 2.0
+        # (pen, brush) by ("roi" or "iso", RGB value of the colour)
+        self.pens = {}
+        self.load()
+
+    def load(self):
+        """
+        Read the styles from line&fill_configuration, and drop the pens
+        and brushes created with the previous styles.
+        """
+        with open(data_path("line&fill_configuration"), "r") as stream:
+            elements = stream.readlines()
+        # if file is not empty, each line represents the last saved
+        # configuration in the given order, else the defaults are kept
+        if len(elements) > 0:
+            self.roi_line = int(elements[0].replace("\n", ""))
+            self.roi_opacity = int(elements[1].replace("\n", ""))
+            self.iso_line = int(elements[2].replace("\n", ""))
+            self.iso_opacity = int(elements[3].replace("\n", ""))
+            self.line_width = float(elements[4].replace("\n", ""))
+        self.pens = {}
+
+    def reload(self):
+        """
+        Load the styles again after line&fill_configuration has been
+        saved, and notify the views.
+        """
+        self.load()
+        self.style_changed.emit()
+
+    def get_roi_pen_brush(self, color):
+        """
+        :param color: QColor of the ROI.
+        :return: Tuple of the QPen of the outline and the QBrush of the
+            fill of the ROI. They are shared, and must not be changed.
+        """
+        return self.get_pen_brush("roi", color, self.roi_line,
+                                  self.roi_opacity)
+
+    def get_isodose_pen_brush(self, color):
+        """
+        :param color: QColor of the isodose level.
+        :return: Tuple of the QPen of the outline and the QBrush of the
+            fill of the isodose. They are shared, and must not be changed.
+        """
+        return self.get_pen_brush("iso", color, self.iso_line,
+                                  self.iso_opacity)
+
+    def get_pen_brush(self, kind, color, line, opacity):
+        """
+        :param kind: "roi" or "iso".
+        :param color: QColor of the outline and fill.
+        :param line: Style of the contour line. NoPen: 0  SolidLine: 1
+            DashLine: 2  DotLine: 3  DashDotLine: 4  DashDotDotLine: 5
+        :param opacity: Opacity of the fill, in percent.
+        :return: Tuple of the QPen and the QBrush.
+        """
+        key = (kind, color.rgb())
+        if key not in self.pens:
+            pen = QtGui.QPen(
+                QtGui.QColor(color.red(), color.green(), color.blue()))
+            pen.setStyle(QtCore.Qt.PenStyle(line))
+            pen.setWidthF(self.line_width)
+            brush_color = QtGui.QColor(color)
+            brush_color.setAlpha(int((opacity / 100) * 255))
+            self.pens[key] = (pen, QtGui.QBrush(brush_color))
+        return self.pens[key]
+
+
+_display_style = None
+
+
+def get_display_style():
+    """
+    :return: The DisplayStyle shared by the views, loaded the first time
+        this is called.
+    """
+    global _display_style
+    if _display_style is None:
+        _display_style = DisplayStyle()
+    return _display_style
@@ -0,0 +1,109 @@
+"""
+On-demand rendering of the pixmaps of an image fusion.
+
+The fixed image and the registered moving image are converted to arrays
+once. A FusedPixmapRenderer colour-mixes the slice of both arrays that a
+fusion view asks for, and keeps the pixmap in a PixmapCache like the
+other views. A new window and level only drops the rendered pixmaps;
+the arrays are reused.
+"""
+import numpy as np
+from PySide6 import QtCore, QtGui
+from skimage.color import hsv2rgb
+
+from src.constants import CT_RESCALE_INTERCEPT, DEFAULT_WINDOW_SIZE
+from src.Model.PixmapRenderer import PixmapCache, PixmapRenderer, \
+    get_view_slice
+from src.Model.WindowingLUT import apply_window
+
+
+class FusedPixmapRenderer(PixmapRenderer):
+    """
+    The colour-mixed pixmaps of one view of a fixed and a registered
+    moving volume.
+    """
+
+    def __init__(self, fixed, moving, view, window, level, cache=None):
+        """
+        :param fixed: 3D array of the fixed image (slices, rows, columns).
+        :param moving: 3D array of the moving image, resampled onto the
+            grid of the fixed image.
+        :param view: "axial", "coronal" or "sagittal".
+        :param window: Window width of windowing function
+        :param level: Level value of windowing function, as stored in
+            the PatientDictContainer.
+        :param cache: The PixmapCache holding the rendered pixmaps. A new
+            cache is created if None.
+        """
+        super().__init__(fixed, view, window, level, DEFAULT_WINDOW_SIZE,
+                         DEFAULT_WINDOW_SIZE, cache=cache)
+        self.moving = moving
+
+    def render_image(self, index, step=1):
+        """
+        Renders the colour-mixed image of a slice as a QImage.
+        :param index: Index of the slice.
+        :param step: Only every step-th row and column of the slice is
+            rendered, into an image step times smaller, for a preview.
+        """
+        windowing = (int(self.level - CT_RESCALE_INTERCEPT),
+                     int(self.window))
+        rgb = get_colormix(
+            self.get_slice(index)[::step, ::step],
+            get_view_slice(self.moving, self.view, index)[::step, ::step],
+            windowing)
+        rgb = np.ascontiguousarray((255 * rgb).astype(np.uint8))
+        qimage = QtGui.QImage(rgb, rgb.shape[1], rgb.shape[0],
+                              rgb.shape[1] * 3, QtGui.QImage.Format_RGB888)
+        if step == 1:
+            scaled = qimage.scaled(self.width, self.height,
+                                   QtCore.Qt.IgnoreAspectRatio,
+                                   QtCore.Qt.SmoothTransformation)
+        else:
+            scaled = qimage.scaled(max(1, round(self.width / step)),
+                                   max(1, round(self.height / step)),
+                                   QtCore.Qt.IgnoreAspectRatio,
+                                   QtCore.Qt.FastTransformation)
+        # scaled() does not copy an image that already has the size
+        return scaled.copy() if scaled.size() == qimage.size() else scaled
+
+
+def get_fused_pixmaps(fixed, moving, window, level):
+    """
+    :param fixed: 3D array of the fixed image.
+    :param moving: 3D array of the moving image, resampled onto the grid
+        of the fixed image.
+    :param window: Window width of windowing function
+    :param level: Level value of windowing function
+    :return: Tuple of the FusedPixmapRenderers of the axial, coronal and
+        sagittal views, sharing one PixmapCache.
+    """
+    cache = PixmapCache()
+    return tuple(FusedPixmapRenderer(fixed, moving, view, window, level,
+                                     cache)
+                 for view in ("axial", "coronal", "sagittal"))
+
+
+def get_colormix(fixed_slice, moving_slice, windowing, color_rotation=0.35):
+    """
+    Mixes a slice of the fixed and the moving image into one colored
+    image, like platipy's generate_comparison_colormix, with both slices
+    windowed through a lookup table.
+    :param fixed_slice: 2D array of the fixed image.
+    :param moving_slice: 2D array of the moving image.
+    :param windowing: Lower bound and width of the window.
+    :param color_rotation: Hue of the pixels brighter in the fixed
+        image. The pixels brighter in the moving image get the opposite
+        hue.
+    :return: Array of RGB values between 0 and 1.
+    """
+    lower, width = windowing
+    fixed = apply_window(fixed_slice, width, lower, scale=1.0,
+                         dtype=np.float32)
+    moving = apply_window(moving_slice, width, lower, scale=1.0,
+                          dtype=np.float32)
+    hsv = np.stack([np.where(fixed > moving, color_rotation,
+                             0.5 + color_rotation),
+                    np.abs(fixed - moving),
+                    (fixed + moving) / 2], axis=-1)
+    return hsv2rgb(hsv)
@@ -1,6 +1,6 @@
 import collections
 
-import pydicom
+from src.Model.DatasetRegistry import DatasetRegistry
 
 
 def get_tree(ds, label=0):
@@ -98,18 +98,33 @@ class DicomTree(object):
         :param filename: dicom file path
         """
         self.filename = filename
+        self._dict = None
         if self.filename is not None:
             self.dataset = self.read_dcm(filename)
-            self.dict = self.dataset_to_dict(self.dataset)
+
+    @property
+    def dict(self):
+        """
+        The dataset as an ordered dictionary, converted the first time it
+        is used.
+        """
+        if self._dict is None:
+            self._dict = self.dataset_to_dict(self.dataset)
+        return self._dict
+
+    @dict.setter
+    def dict(self, value):
+        self._dict = value
 
     def read_dcm(self, filename):
         """
-        Read dicom file to dataset
+        Read dicom file to dataset, reusing the dataset if the file has
+        already been read
 
         :param filename: dicom file path
         :return: dataset, dataset of the dicom file
         """
-        dataset = pydicom.dcmread(filename, force=True)
+        dataset = DatasetRegistry().get(filename, force=True)
         return dataset
 
     def data_element_to_dict(self, data_element):
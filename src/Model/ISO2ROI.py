@@ -4,6 +4,7 @@ from src.Model import ImageLoading
 from src.Model import ROI
 from src.Model.Isodose import get_dose_grid
 from src.Model.PatientDictContainer import PatientDictContainer
+from src.Model.Pixluts import get_container_pixluts
 
 
 class ISO2ROI:
@@ -127,6 +128,8 @@ class ISO2ROI:
         patient_dict_container = PatientDictContainer()
         dataset_rtss = patient_dict_container.get("dataset_rtss")
         pixmaps = patient_dict_container.get("pixmaps_axial")
+        pixluts = get_container_pixluts(patient_dict_container)
+        dict_dose_pixluts = patient_dict_container.get("dose_pixluts")
         slider_min = 0
         slider_max = len(pixmaps) - 1
 
@@ -161,12 +164,10 @@ class ISO2ROI:
 
                 # Get required data for calculating ROI
                 dataset = patient_dict_container.dataset[i]
-                pixlut = patient_dict_container.get("pixluts")
-                pixlut = pixlut[dataset.SOPInstanceUID]
+                pixlut = pixluts[dataset.SOPInstanceUID]
                 z_coord = dataset.SliceLocation
                 curr_slice_uid = patient_dict_container.get("dict_uid")[i]
-                dose_pixluts = patient_dict_container.get("dose_pixluts")
-                dose_pixluts = dose_pixluts[curr_slice_uid]
+                dose_pixluts = dict_dose_pixluts[curr_slice_uid]
 
                 # Loop through each contour for each slice.
                 # Convert the pixel points to RCS points, append z value
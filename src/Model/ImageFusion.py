@@ -1,5 +1,3 @@
-from PySide6 import QtCore, QtGui
-
 import json
 import numpy as np
 import SimpleITK as sitk
@@ -10,14 +8,13 @@ import os
 from copy import deepcopy
 from pydicom.tag import Tag
 
-from src.constants import CT_RESCALE_INTERCEPT
 from src.Controller.PathHandler import data_path
 
 from src.Model.PatientDictContainer import PatientDictContainer
 from src.Model.MovingDictContainer import MovingDictContainer
+from src.Model.FusionRenderer import FusedPixmapRenderer, \
+    get_fused_pixmaps
 from platipy.imaging.registration.linear import linear_registration
-from platipy.imaging.visualisation.utils import generate_comparison_colormix, \
-    return_slice
 
 
 # Utility Functions
@@ -335,18 +332,22 @@ def create_fused_model(old_images, new_image):
 def get_fused_window(level, window):
     """
     Apply windowing on the fixed and moving (linear-registered) images.
+    The images are converted to arrays once, and the pixmaps are
+    colour-mixed when a fusion view asks for them. When the fusion views
+    already show the images, only the window and level of their pixmaps
+    are changed.
     
     Args:
         level(int): the level (midpoint) of windowing
         window(any): the window (range) of windowing
     
     Return:
-        color_axial (QtGui.QPixmap): pixmap of the registered image from axial 
-        view
-        color_sagittal (QtGui.QPixmap): pixmap of the registered image from 
-        sagittal view
-        color_coronal (QtGui.QPixmap): pixmap of the registered image from 
-        coronal view
+        color_axial (FusedPixmapRenderer): pixmaps of the registered image
+        from axial view
+        color_sagittal (FusedPixmapRenderer): pixmaps of the registered
+        image from sagittal view
+        color_coronal (FusedPixmapRenderer): pixmaps of the registered
+        image from coronal view
         tfm (sitk.CompositeTransform): transformation object containing data 
         that is a product from linear_registration
     """
@@ -355,37 +356,43 @@ def get_fused_window(level, window):
     old_images = patient_dict_container.get("sitk_original")
     fused_image = patient_dict_container.get("fused_images")
     tfm = fused_image[1]
-    array = sitk.GetArrayFromImage(old_images).shape
-
-    axial_slice_count = array[0]
-    coronal_slice_count = array[1]
-    sagittal_slice_count = array[1]
-
-    sp_plane, _, sp_slice = old_images.GetSpacing()
-    asp = (1.0 * sp_slice) / sp_plane
-
-    color_axial = {}
-    color_sagittal = {}
-    color_coronal = {}
-
-    windowing = (int(level - CT_RESCALE_INTERCEPT), int(window))
-
-    for i in range(axial_slice_count):
-        color_axial[i] = \
-            get_fused_pixmap(old_images, fused_image[0], asp, i, "axial",
-                             windowing)
+    fixed, moving = get_fusion_arrays(old_images, fused_image[0])
+
+    renderers = [patient_dict_container.get("color_" + view)
+                 for view in ("axial", "coronal", "sagittal")]
+    if all(isinstance(renderer, FusedPixmapRenderer)
+           and renderer.volume is fixed and renderer.moving is moving
+           for renderer in renderers):
+        for renderer in renderers:
+            renderer.set_window(window, level)
+        color_axial, color_coronal, color_sagittal = renderers
+    else:
+        color_axial, color_coronal, color_sagittal = \
+            get_fused_pixmaps(fixed, moving, window, level)
 
-    for i in range(sagittal_slice_count):
-        color_sagittal[i] = \
-            get_fused_pixmap(old_images, fused_image[0], asp, i, "sagittal",
-                             windowing)
+    return color_axial, color_sagittal, color_coronal, tfm
 
-    for i in range(coronal_slice_count):
-        color_coronal[i] = \
-            get_fused_pixmap(old_images, fused_image[0], asp, i, "coronal",
-                             windowing)
 
-    return color_axial, color_sagittal, color_coronal, tfm
+def get_fusion_arrays(orig_image, fused_image):
+    """
+    Converts the fixed and registered moving images to arrays, once for
+    each pair of images.
+    Args:
+        orig_image(sitk.Image): the fixed image
+        fused_image(sitk.Image): the moving image, registered to the
+        fixed image
+    Return:
+        Tuple of the arrays of the fixed and moving images.
+    """
+    patient_dict_container = PatientDictContainer()
+    cached = patient_dict_container.get("fusion_arrays")
+    if cached is None or cached[0] is not orig_image \
+            or cached[1] is not fused_image:
+        cached = (orig_image, fused_image,
+                  sitk.GetArrayFromImage(orig_image),
+                  sitk.GetArrayFromImage(fused_image))
+        patient_dict_container.set("fusion_arrays", cached)
+    return cached[2], cached[3]
 
 
 # Can be expanded to peform all of platipy's registrations
@@ -443,106 +450,3 @@ def register_images(image_1, image_2):
         store_object_into_dcm = True
 
     return img_ct, tfm, store_object_into_dcm
-
-
-def get_fused_pixmap(orig_image, fused_image, aspect,
-                     slice_num, view, windowing=(-250, 500)):
-    """
-    Generates a colored pixmap of the array from the inputted view.
-    Args:
-        orig_image(ndarray): N dimension array containing signed int8 values
-        fused_image(ndarray): N dimension array containing signed int8 values
-        aspect(Any): currently not used
-        slice_num(int): slice number of the array
-        view(String): specified flag that can be sagittal, coronal or axial
-        windowing: upper and lower bound for windowing
-    windowing: target level and window of the fused image
-    Returns:
-        pixmap (QtGui.QPixmap): returns the pixmap of co-registered fixed and 
-        moving images.
-    """
-    # Get dimension /could also input dimensions as parameters
-    image_array = sitk.GetArrayFromImage(orig_image)
-    if view == "sagittal":
-        image_slice = return_slice("x", slice_num)
-
-        pixel_array_color = \
-            np.array(generate_comparison_colormix(
-                [orig_image, fused_image],
-                arr_slice=image_slice, window=windowing))
-
-        # resize dimensions to stop image stretch
-        pixel_array_color = np.resize(pixel_array_color, (512, 345, 3))
-
-        # first adjusts rgb (0,1) scale to greyscale (0,255)
-        # then converts type and formats it to color.
-        qimage2 = \
-            QtGui.QImage(((255 * pixel_array_color).astype(np.uint8)),
-                         image_array.shape[1], image_array.shape[0],
-                         QtGui.QImage.Format_RGB888)
-
-        # Then continues to convert to pixmap just like in onko
-        pixmap = QtGui.QPixmap(qimage2)
-
-        pixmap = pixmap.scaled(512,
-                               512,
-                               QtCore.Qt.IgnoreAspectRatio,
-                               QtCore.Qt.SmoothTransformation)
-    elif view == "coronal":
-        image_slice = return_slice("y", slice_num)
-
-        pixel_array_color = np.array(generate_comparison_colormix(
-            [orig_image, fused_image],
-            arr_slice=image_slice, window=windowing))
-
-        # resize dimensions to stop image stretch
-        pixel_array_color = np.resize(pixel_array_color, (512, 345, 3))
-
-        # first adjusts rgb (0,1) scale to greyscale (0,255)
-        # then converts type and formats it to color.
-        qimage2 = QtGui.QImage(((255 * pixel_array_color).astype(np.uint8)),
-                               image_array.shape[1],
-                               image_array.shape[0],
-                               QtGui.QImage.Format_RGB888)
-
-        # Then continues to convert to pixmap just like in onko
-        pixmap = QtGui.QPixmap(qimage2)
-        pixmap = pixmap.scaled(512,
-                               512,
-                               QtCore.Qt.IgnoreAspectRatio,
-                               QtCore.Qt.SmoothTransformation)
-    else:
-        image_slice = return_slice("z", slice_num)
-
-        pixel_array_color = np.array(generate_comparison_colormix(
-            [orig_image, fused_image],
-            arr_slice=image_slice, window=windowing))
-
-        # first adjusts rgb (0,1) scale to greyscale (0,255)
-        # then converts type and formats it to color.
-        qimage = QtGui.QImage(((255 * pixel_array_color).astype(np.uint8)),
-                              image_array.shape[1],
-                              image_array.shape[1],
-                              QtGui.QImage.Format_RGB888)
-
-        # Then continues to convert to pixmap just like in onko
-        pixmap = QtGui.QPixmap(qimage)
-        pixmap = pixmap.scaled(512,
-                               512,
-                               QtCore.Qt.IgnoreAspectRatio,
-                               QtCore.Qt.SmoothTransformation)
-
-    # Generates an rgb color overlaid image,
-    # convert to contiguous array,
-    # and also flip the array if it is a coronal (y) or sagittal (x)
-    return pixmap
-
-
-def scaled_size(width, height):
-    if width > height:
-        height = 512 / width * height
-        width = 512
-    else:
-        width = 512 / height * width
-        height = 512
-    return width, height
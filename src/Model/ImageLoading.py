@@ -19,8 +19,10 @@ not the case, however this alternative function promotes scalability and
 durability of the process).
 """
 import collections
+import logging
 import math
 import re
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Queue, Process
 
 import numpy as np
@@ -28,6 +30,11 @@ from dicompylercore import dvhcalc
 from pydicom import dcmread
 from pydicom.errors import InvalidDicomError
 
+from src.Model.DatasetRegistry import DatasetRegistry
+from src.Model.PerformanceOptions import get_performance_option
+from src.Model.Pixluts import calculate_matrix, get_pixluts
+from src.Model.SliceGeometry import get_slice_geometry
+
 allowed_classes = {
     # CT Image
     "1.2.840.10008.5.1.4.1.1.2": {
@@ -72,6 +79,10 @@ allowed_classes = {
 }
 
 
+# Elements larger than this are not read by read_dataset_header.
+HEADER_DEFER_SIZE = "64 KB"
+
+
 class NotRTSetError(Exception):
     pass
 
@@ -80,7 +91,8 @@ class NotAllowedClassError(Exception):
     pass
 
 
-def get_datasets(filepath_list, file_type=None):
+def get_datasets(filepath_list, file_type=None, max_workers=None,
+                 read_pixel_data=True, return_geometry=False):
     """
     This function generates two dictionaries: the dictionary of PyDicom
     datasets, and the dictionary of filepaths. These two dictionaries
@@ -91,98 +103,187 @@ def get_datasets(filepath_list, file_type=None):
     are filepaths pointing to the location of the .dcm file on the
     user's computer.
     :param filepath_list: List of all files to be searched.
-    :return: Tuple (read_data_dict, file_names_dict)
+    :param file_type: Modality of the datasets to keep. All modalities
+        are kept if None.
+    :param max_workers: Number of threads used to read the files. Read
+        from the "loader_workers" performance option if None. Files are
+        read one at a time if this is 1 or less.
+    :param read_pixel_data: If False, the pixel data (and other large
+        values) are not read until they are first accessed.
+    :param return_geometry: If True, the SliceGeometry of the sorted
+        image slices built by image_stack_sort is returned as well.
+    :return: Tuple (read_data_dict, file_names_dict), or (read_data_dict,
+        file_names_dict, slice_geometry) if return_geometry is True
     """
-    read_data_dict = {}
-    file_names_dict = {}
+    if max_workers is None:
+        max_workers = get_performance_option("loader_workers")
 
-    slice_count = 0
-    sr_count = 0
-    for file in natural_sort(filepath_list):
-        try:
-            read_file = dcmread(file)
-        except InvalidDicomError:
-            pass
-        else:
-            if read_file.SOPClassUID in allowed_classes:
-                allowed_class = allowed_classes[read_file.SOPClassUID]
-                if allowed_class["sliceable"]:
-                    slice_name = slice_count
-                    slice_count += 1
-                else:
-                    # Read from Series Description to determine what is
-                    # stored in the SR file.
-                    if allowed_class["name"] == "sr":
-                        if read_file.SeriesDescription == "CLINICAL-DATA":
-                            slice_name = "sr-cd"
-                        elif read_file.SeriesDescription == "PYRADIOMICS":
-                            slice_name = "sr-rad"
-                        else:
-                            slice_name = "sr-other-" + str(sr_count)
-                            sr_count += 1
-                    else:
-                        slice_name = allowed_class["name"]
+    if max_workers > 1 or not read_pixel_data:
+        return get_datasets_parallel(filepath_list, file_type,
+                                     max(max_workers, 1), read_pixel_data,
+                                     return_geometry)
 
-                if file_type is None or read_file.Modality == file_type:
-                    read_data_dict[slice_name] = read_file
-                    file_names_dict[slice_name] = file
-            else:
-                raise NotAllowedClassError
+    datasets = ((file, read_dataset(file))
+                for file in natural_sort(filepath_list))
+    read_data_dict, file_names_dict = classify_datasets(datasets, file_type)
+
+    return image_stack_sort(read_data_dict, file_names_dict, return_geometry)
+
+
+def get_datasets_parallel(filepath_list, file_type, max_workers,
+                          read_pixel_data=True, return_geometry=False):
+    """
+    Header-first variant of get_datasets. The headers of all files are
+    read in a thread pool and used to classify and sort the datasets.
+    Large values such as the pixel data are deferred in the first pass
+    and are only read, again in the thread pool, for the datasets that
+    are kept. The result is identical to that of get_datasets.
+    :param filepath_list: List of all files to be searched.
+    :param file_type: Modality of the datasets to keep. All modalities
+        are kept if None.
+    :param max_workers: Maximum number of threads reading files.
+    :param read_pixel_data: If False, the deferred values are left to be
+        read when they are first accessed.
+    :param return_geometry: If True, the SliceGeometry of the sorted
+        image slices is returned as well.
+    :return: Tuple (read_data_dict, file_names_dict), or (read_data_dict,
+        file_names_dict, slice_geometry) if return_geometry is True
+    """
+    sorted_files = natural_sort(filepath_list)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        headers = executor.map(read_dataset_header, sorted_files)
+        header_dict, file_names_dict = \
+            classify_datasets(zip(sorted_files, headers), file_type)
+
+        sorted_datasets = image_stack_sort(header_dict, file_names_dict,
+                                           return_geometry)
 
-    sorted_read_data_dict, sorted_file_names_dict = \
-        image_stack_sort(read_data_dict, file_names_dict)
+        # Consume the iterator so every read has finished (and any
+        # error has been raised) before the datasets are returned.
+        if read_pixel_data:
+            list(executor.map(read_deferred_pixel_data,
+                              sorted_datasets[0].values()))
 
-    return sorted_read_data_dict, sorted_file_names_dict
+    return sorted_datasets
 
 
-def img_stack_displacement(orientation, position):
+def read_dataset(file):
     """
-    Calculate the projection of the image position patient along the
-    axis perpendicular to the images themselves, i.e. along the stack
-    axis. Intended use is for the sorting key to sort a stack of image
-    datasets so that they are in order, regardless of whether the images
-    are axial, coronal, or sagittal, and independent from the order in
-    which the images were read in.
+    :param file: Path of the file to read.
+    :return: PyDicom dataset, or None if the file is not a DICOM file.
+    """
+    try:
+        return dcmread(file)
+    except InvalidDicomError:
+        return None
+
 
-    :param orientation: List of strings with six elements, the image
-        orientation patient value from the dataset.
-    :param position: List of strings with three elements, the image
-    position value from the dataset.
-    :return: Float of the image position patient along the image stack
-        axis.
+def read_dataset_header(file):
+    """
+    Read a file without reading the values of its large elements (such
+    as the pixel data). These values are read from the file the first
+    time they are accessed.
+    :param file: Path of the file to read.
+    :return: PyDicom dataset, or None if the file is not a DICOM file.
     """
-    ds_orient_x = orientation[0:3]
-    ds_orient_y = orientation[3:6]
-    orient_x = np.array(list(map(float, ds_orient_x)))
-    orient_y = np.array(list(map(float, ds_orient_y)))
-    orient_z = np.cross(orient_x, orient_y)
-    img_pos_patient = np.array(list(map(float, position)))
-    displacement = orient_z.dot(img_pos_patient)
+    try:
+        return dcmread(file, defer_size=HEADER_DEFER_SIZE)
+    except InvalidDicomError:
+        return None
 
-    return displacement
+
+def read_deferred_pixel_data(dataset):
+    """
+    Read the pixel data of a dataset read by read_dataset_header.
+    :param dataset: PyDicom dataset.
+    """
+    if "PixelData" in dataset:
+        dataset.PixelData
 
 
-def get_dict_sort_on_displacement(item):
+def register_datasets(read_data_dict, file_names_dict):
     """
-    :param item: dictionary key, value item with value of a PyDicom
-        dataset
-    :return: Float of the projection of the image position patient on
-        the axis through the image stack
+    Add the datasets that have been read to the DatasetRegistry, so that
+    they are not read from disk again when they are next needed. The
+    image slices are registered series by series. Only the datasets of
+    the patient in the PatientDictContainer are registered.
+    :param read_data_dict: Dictionary of PyDicom datasets.
+    :param file_names_dict: Dictionary of the datasets' filepaths, with
+        the same keys as read_data_dict.
     """
-    img_dataset = item[1]
-    orientation = img_dataset.ImageOrientationPatient
-    position = img_dataset.ImagePositionPatient
-    sort_key = img_stack_displacement(orientation, position)
+    registry = DatasetRegistry()
+    series = {}
+    for key, dataset in read_data_dict.items():
+        if str(key).isnumeric():
+            paths, datasets = series.setdefault(
+                dataset.get("SeriesInstanceUID"), ([], []))
+            paths.append(file_names_dict[key])
+            datasets.append(dataset)
+        else:
+            registry.register(file_names_dict[key], dataset)
+    for series_uid, (paths, datasets) in series.items():
+        registry.register_series(series_uid, paths, datasets)
 
-    return sort_key
 
+def classify_datasets(datasets, file_type=None):
+    """
+    Assign every dataset its key in the read_data_dict, being the slice
+    number for sliceable classes and the RT modality otherwise.
+    :param datasets: Iterable of (filepath, dataset) tuples, where the
+        dataset is None if the file is not a DICOM file.
+    :param file_type: Modality of the datasets to keep. All modalities
+        are kept if None.
+    :return: Tuple (read_data_dict, file_names_dict) in reading order.
+    """
+    read_data_dict = {}
+    file_names_dict = {}
 
-def image_stack_sort(read_data_dict, file_names_dict):
+    slice_count = 0
+    sr_count = 0
+    for file, read_file in datasets:
+        if read_file is None:
+            continue
+
+        if read_file.SOPClassUID in allowed_classes:
+            allowed_class = allowed_classes[read_file.SOPClassUID]
+            if allowed_class["sliceable"]:
+                slice_name = slice_count
+                slice_count += 1
+            else:
+                # Read from Series Description to determine what is
+                # stored in the SR file.
+                if allowed_class["name"] == "sr":
+                    if read_file.SeriesDescription == "CLINICAL-DATA":
+                        slice_name = "sr-cd"
+                    elif read_file.SeriesDescription == "PYRADIOMICS":
+                        slice_name = "sr-rad"
+                    else:
+                        slice_name = "sr-other-" + str(sr_count)
+                        sr_count += 1
+                else:
+                    slice_name = allowed_class["name"]
+
+            if file_type is None or read_file.Modality == file_type:
+                read_data_dict[slice_name] = read_file
+                file_names_dict[slice_name] = file
+        else:
+            raise NotAllowedClassError
+
+    return read_data_dict, file_names_dict
+
+
+def image_stack_sort(read_data_dict, file_names_dict, return_geometry=False):
     """
     Sort the read_data_dict and file_names_dict by order of displacement
     along the image stack axis. For axial images this is by the Z
-    coordinate.
-    :return: Tuple of sorted dictionaries
+    coordinate. Irregularities in the stack, such as gantry tilt or
+    irregular slice spacing, are logged as warnings.
+    :param return_geometry: If True, the SliceGeometry of the image
+        slices, in their sorted order, is returned as well so that it
+        does not have to be read from the slices again.
+    :return: Tuple of sorted dictionaries, followed by the SliceGeometry
+        if return_geometry is True
     """
     new_image_dict = {key: value for (key, value)
                       in read_data_dict.items()
@@ -197,23 +298,26 @@ def image_stack_sort(read_data_dict, file_names_dict):
                                      in file_names_dict.items()
                                      if not str(key).isnumeric()}
 
-    new_items = new_image_dict.items()
-    sorted_dict_on_displacement = sorted(
-        new_items, key=get_dict_sort_on_displacement, reverse=True)
+    original_indices = list(new_image_dict.keys())
+    geometry = get_slice_geometry(list(new_image_dict.values()))
+    order = geometry.stack_order()
+    geometry = geometry.take(order)
+    for anomaly in geometry.get_anomalies():
+        logging.warning("Image stack: %s", anomaly)
 
     new_read_data_dict = {}
     new_file_names_dict = {}
 
-    i = 0
-    for sorted_dataset in sorted_dict_on_displacement:
-        new_read_data_dict[i] = sorted_dataset[1]
-        original_index = sorted_dataset[0]
+    for i, position in enumerate(order):
+        original_index = original_indices[position]
+        new_read_data_dict[i] = new_image_dict[original_index]
         new_file_names_dict[i] = new_image_file_names_dict[original_index]
-        i += 1
 
     new_read_data_dict.update(new_non_image_dict)
     new_file_names_dict.update(new_non_image_file_names_dict)
 
+    if return_geometry:
+        return new_read_data_dict, new_file_names_dict, geometry
     return new_read_data_dict, new_file_names_dict
 
 
@@ -487,64 +591,6 @@ def get_raw_contour_data(dataset_rtss):
     return dict_roi, dict_numpoints
 
 
-def calculate_matrix(img_ds):
-    # Physical distance (in mm) between the center of each image pixel,
-    # specified by a numeric pair
-    # - adjacent row spacing (delimiter) adjacent column spacing.
-    dist_row = img_ds.PixelSpacing[0]
-    dist_col = img_ds.PixelSpacing[1]
-    # The direction cosines of the first row and the first column
-    # with respect to the patient.
-    # 6 values inside: [Xx, Xy, Xz, Yx, Yy, Yz]
-    orientation = img_ds.ImageOrientationPatient
-    # The x, y, and z coordinates of the upper left hand corner
-    # (center of the first voxel transmitted) of the image, in mm.
-    # 3 values: [Sx, Sy, Sz]
-    position = img_ds.ImagePositionPatient
-
-    # Equation C.7.6.2.1-1.
-    # https://dicom.innolitics.com/ciods/rt-structure-set/roi-contour/30060039/30060040/30060050
-    matrix_m = np.matrix(
-        [[orientation[0] * dist_row, orientation[3] * dist_col, 0,
-          position[0]],
-         [orientation[1] * dist_row, orientation[4] * dist_col, 0,
-          position[1]],
-         [orientation[2] * dist_row, orientation[5] * dist_col, 0,
-          position[2]],
-         [0, 0, 0, 1]]
-    )
-    x = []
-    y = []
-    for i in range(0, img_ds.Columns):
-        i_mat = matrix_m * np.matrix([[i], [0], [0], [1]])
-        x.append(float(i_mat[0]))
-
-    for j in range(0, img_ds.Rows):
-        j_mat = matrix_m * np.matrix([[0], [j], [0], [1]])
-        y.append(float(j_mat[1]))
-
-    return np.array(x), np.array(y)
-
-
-def get_pixluts(read_data_dict):
-    """
-    :param read_data_dict: Dictionary of all DICOM dataset objects.
-    :return: Dictionary of pixluts for the transformation from 3D to 2D.
-    """
-    dict_pixluts = {}
-    non_img_type = ['rtdose', 'rtplan', 'rtss', 'rtimage']
-    for ds in read_data_dict:
-        if ds not in non_img_type:
-            if isinstance(ds, str) and ds[0:3] == 'sr-':
-                continue
-            else:
-                img_ds = read_data_dict[ds]
-                pixlut = calculate_matrix(img_ds)
-                dict_pixluts[img_ds.SOPInstanceUID] = pixlut
-
-    return dict_pixluts
-
-
 def get_image_uid_list(dataset):
     """
     Extract the SOPInstanceUIDs from every image dataset
@@ -0,0 +1,143 @@
+"""
+A contiguous 3D store of the pixel values of an image series.
+
+The voxels are held in one C-ordered array of shape (slices, rows,
+columns), optionally backed by a temporary file through np.memmap, so a
+volume larger than the available memory can be paged in by the OS.
+Axial, coronal and sagittal slices are views into that array, and
+np.asarray(volume) returns the array itself, so neither slicing nor
+passing the volume to NumPy copies the voxels.
+"""
+import tempfile
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class ImageVolume(Sequence):
+    """
+    The voxels of an image series along with their spacing and
+    orientation. Indexing the volume returns axial slices, so it can be
+    used wherever a list of slice pixel arrays is expected.
+    """
+
+    def __init__(self, voxels, spacing=(1.0, 1.0, 1.0), orientation=None,
+                 origin=None):
+        """
+        :param voxels: 3D array of shape (slices, rows, columns).
+        :param spacing: Tuple (slice spacing, row spacing, column
+            spacing) in mm.
+        :param orientation: ImageOrientationPatient of the series, as a
+            tuple of six direction cosines.
+        :param origin: ImagePositionPatient of the first slice.
+        """
+        self.voxels = voxels
+        self.spacing = tuple(spacing)
+        self.orientation = orientation
+        self.origin = origin
+
+    @property
+    def shape(self):
+        return self.voxels.shape
+
+    @property
+    def dtype(self):
+        return self.voxels.dtype
+
+    def __len__(self):
+        return self.voxels.shape[0]
+
+    def __getitem__(self, index):
+        return self.voxels[index]
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None or np.dtype(dtype) == self.voxels.dtype:
+            return self.voxels
+        return self.voxels.astype(dtype)
+
+    def axial(self, index):
+        """
+        :param index: Index of the slice.
+        :return: View of the axial slice, shape (rows, columns).
+        """
+        return self.voxels[index, :, :]
+
+    def coronal(self, index):
+        """
+        :param index: Index of the row.
+        :return: View of the coronal slice, shape (slices, columns).
+        """
+        return self.voxels[:, index, :]
+
+    def sagittal(self, index):
+        """
+        :param index: Index of the column.
+        :return: View of the sagittal slice, shape (slices, rows).
+        """
+        return self.voxels[:, :, index]
+
+
+def allocate_voxels(shape, dtype, use_memmap=False):
+    """
+    :param shape: Shape of the volume.
+    :param dtype: Data type of the voxels.
+    :param use_memmap: Whether to back the voxels with a temporary file.
+        The file is removed when the array is no longer used.
+    :return: An uninitialised C-ordered array.
+    """
+    if use_memmap:
+        return np.memmap(tempfile.TemporaryFile(), dtype=dtype, mode="w+",
+                         shape=shape)
+    return np.empty(shape, dtype=dtype)
+
+
+def get_volume_geometry(dataset, slice_geometry=None):
+    """
+    :param dataset: Dataset of the first slice of the series.
+    :param slice_geometry: SliceGeometry of the slices of the series, in
+        slice order. The spacing between slices is taken from their
+        positions, so overlapping or gapped series get their real
+        spacing. The SliceThickness (or 1.0) is only used when it is not
+        given or the series has a single slice.
+    :return: Tuple (spacing, orientation, origin), as used by
+        ImageVolume.
+    """
+    pixel_spacing = dataset.get("PixelSpacing", [1.0, 1.0])
+    slice_spacing = None
+    if slice_geometry is not None:
+        slice_spacing = slice_geometry.slice_spacing()
+    if not slice_spacing:
+        slice_spacing = dataset.get("SliceThickness") or 1.0
+    spacing = (float(slice_spacing), float(pixel_spacing[0]),
+               float(pixel_spacing[1]))
+    orientation = None
+    if "ImageOrientationPatient" in dataset:
+        orientation = tuple(float(value)
+                            for value in dataset.ImageOrientationPatient)
+    origin = None
+    if "ImagePositionPatient" in dataset:
+        origin = tuple(float(value)
+                       for value in dataset.ImagePositionPatient)
+    return spacing, orientation, origin
+
+
+def find_voxels(pixel_arrays):
+    """
+    Finds the voxel array that the given pixel arrays are axial views of,
+    which is the case for datasets already stored in an ImageVolume.
+    :param pixel_arrays: List of slice pixel arrays.
+    :return: The voxel array, or None.
+    """
+    if not pixel_arrays or not isinstance(pixel_arrays[0], np.ndarray):
+        return None
+    voxels = pixel_arrays[0].base
+    if not isinstance(voxels, np.ndarray) or voxels.ndim != 3 \
+            or len(voxels) != len(pixel_arrays):
+        return None
+    for i, pixel_array in enumerate(pixel_arrays):
+        if not isinstance(pixel_array, np.ndarray) \
+                or pixel_array.base is not voxels \
+                or pixel_array.__array_interface__["data"][0] \
+                != voxels[i].__array_interface__["data"][0]:
+            return None
+    return voxels
@@ -4,11 +4,11 @@ import pydicom
 
 from src.Model import ImageLoading
 from src.Model.CalculateImages import convert_raw_data, get_pixmaps
-from src.Model.GetPatientInfo import get_basic_info, DicomTree, \
-    dict_instance_uid
+from src.Model.GetPatientInfo import get_basic_info, dict_instance_uid
 from src.Model.Isodose import get_dose_pixluts, calculate_rx_dose_in_cgray
 from src.Model.PatientDictContainer import PatientDictContainer
 from src.Model.ROI import ordered_list_rois
+from src.Model.SliceGeometry import get_slice_geometry
 from src.Model import ImageLoading
 from src.Controller.PathHandler import data_path
 from src.constants import CT_RESCALE_INTERCEPT
@@ -79,11 +79,21 @@ def create_initial_model():
 
     patient_dict_container.set("dict_windowing", dict_windowing)
 
-    if not patient_dict_container.has_attribute("scaled"):
+    # When the patient is opened progressively, the loader has already
+    # decoded and rescaled the first slices into its volume
+    loader = patient_dict_container.get("progressive_loader")
+    cache = patient_dict_container.get_pixel_cache()
+    slice_geometry = get_stored_slice_geometry(patient_dict_container)
+    if loader is not None:
         patient_dict_container.set("scaled", True)
-        pixel_values = convert_raw_data(dataset, False, is_ct)
+        pixel_values = loader.volume
+    elif not patient_dict_container.has_attribute("scaled"):
+        patient_dict_container.set("scaled", True)
+        pixel_values = convert_raw_data(dataset, False, is_ct, cache,
+                                        slice_geometry)
     else:
-        pixel_values = convert_raw_data(dataset, True)
+        pixel_values = convert_raw_data(dataset, True, cache=cache,
+                                        slice_geometry=slice_geometry)
 
     # Calculate the ratio between x axis and y axis of 3 views
     pixmap_aspect = {}
@@ -92,8 +102,14 @@ def create_initial_model():
     pixmap_aspect["axial"] = pixel_spacing[1] / pixel_spacing[0]
     pixmap_aspect["sagittal"] = pixel_spacing[1] / slice_thickness
     pixmap_aspect["coronal"] = slice_thickness / pixel_spacing[0]
-    pixmaps_axial, pixmaps_coronal, pixmaps_sagittal = \
-        get_pixmaps(pixel_values, window, level, pixmap_aspect)
+    if loader is not None:
+        # The pixmaps of the other slices are rendered as they are decoded
+        pixmaps_axial = loader.get_axial_pixmaps(window, level, pixmap_aspect)
+        pixmaps_coronal, pixmaps_sagittal = \
+            loader.get_placeholder_pixmaps(pixmap_aspect)
+    else:
+        pixmaps_axial, pixmaps_coronal, pixmaps_sagittal = \
+            get_pixmaps(pixel_values, window, level, pixmap_aspect)
 
     patient_dict_container.set("pixmaps_axial", pixmaps_axial)
     patient_dict_container.set("pixmaps_coronal", pixmaps_coronal)
@@ -113,14 +129,6 @@ def create_initial_model():
         ImageLoading.get_raw_contour_data(dataset['rtss'])
     patient_dict_container.set("raw_contour", dict_raw_contour_data)
 
-    # dict_dicom_tree_rtss will be set in advance if the program
-    # generates a new rtss through the execution of
-    # ROI.create_initial_rtss_from_ct(...)
-    if patient_dict_container.get("dict_dicom_tree_rtss") is None:
-        dicom_tree_rtss = DicomTree(filepaths['rtss'])
-        patient_dict_container.set("dict_dicom_tree_rtss",
-                                   dicom_tree_rtss.dict)
-
     patient_dict_container.set(
         "list_roi_numbers",
         ordered_list_rois(patient_dict_container.get("rois")))
@@ -132,11 +140,8 @@ def create_initial_model():
 
     # Set RTDOSE attributes
     if patient_dict_container.has_modality("rtdose"):
-        dicom_tree_rtdose = DicomTree(filepaths['rtdose'])
-        patient_dict_container.set("dict_dicom_tree_rtdose",
-                                   dicom_tree_rtdose.dict)
-
-        patient_dict_container.set("dose_pixluts", get_dose_pixluts(dataset))
+        patient_dict_container.set("dose_pixluts", get_dose_pixluts(
+            dataset, patient_dict_container.get("pixluts")))
 
         patient_dict_container.set("selected_doses", [])
 
@@ -155,21 +160,6 @@ def create_initial_model():
         rx_dose_in_cgray = calculate_rx_dose_in_cgray(dataset["rtplan"])
         patient_dict_container.set("rx_dose_in_cgray", rx_dose_in_cgray)
 
-        dicom_tree_rtplan = DicomTree(filepaths['rtplan'])
-        patient_dict_container.set("dict_dicom_tree_rtplan",
-                                   dicom_tree_rtplan.dict)
-
-    # Set SR attributes
-    if patient_dict_container.has_modality("sr-cd"):
-        dicom_tree_sr_clinical_data = DicomTree(filepaths['sr-cd'])
-        patient_dict_container.set("dict_dicom_tree_sr_cd",
-                                   dicom_tree_sr_clinical_data.dict)
-
-    if patient_dict_container.has_modality("sr-rad"):
-        dicom_tree_sr_pyrad = DicomTree(filepaths['sr-rad'])
-        patient_dict_container.set("dict_dicom_tree_sr_pyrad",
-                                   dicom_tree_sr_pyrad.dict)
-
 
 def create_initial_model_batch():
     """
@@ -232,7 +222,9 @@ def create_initial_model_batch():
 
     patient_dict_container.set("dict_windowing", dict_windowing)
 
-    pixel_values = convert_raw_data(dataset)
+    pixel_values = convert_raw_data(
+        dataset, cache=patient_dict_container.get_pixel_cache(),
+        slice_geometry=get_stored_slice_geometry(patient_dict_container))
     # Calculate the ratio between x axis and y axis of 3 views
     pixmap_aspect = {}
     pixel_spacing = dataset[0].PixelSpacing
@@ -261,9 +253,6 @@ def create_initial_model_batch():
         dict_raw_contour_data, dict_numpoints = \
             ImageLoading.get_raw_contour_data(dataset['rtss'])
         patient_dict_container.set("raw_contour", dict_raw_contour_data)
-        dicom_tree_rtss = DicomTree(filepaths['rtss'])
-        patient_dict_container.set("dict_dicom_tree_rtss",
-                                   dicom_tree_rtss.dict)
 
         patient_dict_container.set(
             "list_roi_numbers",
@@ -276,11 +265,8 @@ def create_initial_model_batch():
 
     # Set RTDOSE attributes
     if patient_dict_container.has_modality("rtdose"):
-        dicom_tree_rtdose = DicomTree(filepaths['rtdose'])
-        patient_dict_container.set("dict_dicom_tree_rtdose",
-                                   dicom_tree_rtdose.dict)
-
-        patient_dict_container.set("dose_pixluts", get_dose_pixluts(dataset))
+        patient_dict_container.set("dose_pixluts", get_dose_pixluts(
+            dataset, patient_dict_container.get("pixluts")))
 
         patient_dict_container.set("selected_doses", [])
 
@@ -299,6 +285,20 @@ def create_initial_model_batch():
         rx_dose_in_cgray = calculate_rx_dose_in_cgray(dataset["rtplan"])
         patient_dict_container.set("rx_dose_in_cgray", rx_dose_in_cgray)
 
-        dicom_tree_rtplan = DicomTree(filepaths['rtplan'])
-        patient_dict_container.set("dict_dicom_tree_rtplan",
-                                   dicom_tree_rtplan.dict)
+
+def get_stored_slice_geometry(patient_dict_container):
+    """
+    Gets the SliceGeometry of the image slices, as stored in the
+    PatientDictContainer when the slices were sorted by
+    ImageLoading.image_stack_sort. The geometry is only read from the
+    slices (and stored) if the patient was set up without it.
+    :param patient_dict_container: The PatientDictContainer.
+    :return: SliceGeometry of the image slices, in slice order.
+    """
+    slice_geometry = patient_dict_container.get("slice_geometry")
+    if slice_geometry is None:
+        dataset = patient_dict_container.dataset
+        slice_geometry = get_slice_geometry(
+            [dataset[key] for key in dataset if str(key).isnumeric()])
+        patient_dict_container.set("slice_geometry", slice_geometry)
+    return slice_geometry
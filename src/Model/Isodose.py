@@ -2,7 +2,7 @@
 
 import numpy as np
 
-from src.Model.ROI import calculate_matrix
+from src.Model.Pixluts import Pixluts, calculate_matrix, get_geometry
 
 
 def get_dose_pixels(pixlut, doselut, img_ds):
@@ -36,29 +36,40 @@ def get_dose_pixels(pixlut, doselut, img_ds):
     return x, y
 
 
-def get_dose_pixluts(dict_ds):
+class DosePixluts(Pixluts):
+    """
+    Read-only dictionary of the dose grid pixel values of the image
+    slices by SOPInstanceUID, calculated when they are first looked up
+    and shared by the slices of the same geometry and patient position.
+    """
+
+    def __init__(self, dict_ds, pixluts=None):
+        """
+        :param dict_ds: dictionary containing patient data
+        :param pixluts: Pixluts of the image slices, looked up to
+            calculate the dose pixel values. Created if None.
+        """
+        super().__init__(dict_ds)
+        self.pixluts = pixluts if pixluts is not None else Pixluts(dict_ds)
+        self.dose_data = calculate_matrix(dict_ds['rtdose'])
+
+    def get_key(self, img_ds):
+        return get_geometry(img_ds) + (img_ds.PatientPosition,)
+
+    def calculate(self, img_ds):
+        pixlut = self.pixluts[img_ds.SOPInstanceUID]
+        return get_dose_pixels(pixlut, self.dose_data, img_ds)
+
+
+def get_dose_pixluts(dict_ds, pixluts=None):
     """Convert dosegrid data for each slice into pixel values
 
     :param dict_ds:     dictionary containing patient data
+    :param pixluts:     Pixluts of the image slices, or None
     :return:            dictionary with dose pixel values as values and
                         SOPInstanceUID as key
     """
-
-    dict_dose_pixluts = {}
-    dict_dose_pixluts = {}
-    non_img_type = ['rtdose', 'rtplan', 'rtss', 'rtimage']
-    dose_data = calculate_matrix(dict_ds['rtdose'])
-    for ds in dict_ds:
-        if ds not in non_img_type:
-            if isinstance(ds, str) and ds[0:3] == 'sr-':
-                continue
-            else:
-                img_ds = dict_ds[ds]
-                pixlut = calculate_matrix(img_ds)
-                dose_pixlut = get_dose_pixels(pixlut, dose_data, img_ds)
-                dict_dose_pixluts[img_ds.SOPInstanceUID] = dose_pixlut
-
-    return dict_dose_pixluts
+    return DosePixluts(dict_ds, pixluts)
 
 
 def get_dose_grid(rtd, z=0):
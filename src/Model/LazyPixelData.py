@@ -0,0 +1,195 @@
+"""
+Lazy decoding of the pixel data of image slices.
+
+In lazy mode a slice's pixel array is only decoded (and rescaled) the
+first time it is asked for. The decoded arrays are held in a
+PixelArrayCache, keyed by dataset, which evicts the least recently used
+arrays once a memory budget is exceeded. An evicted array is decoded
+again the next time it is asked for. The datasets themselves are left
+untouched: the pixel arrays are only reached through the cache, e.g.
+through PatientDictContainer.get_pixel_array.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class PixelArrayCache:
+    """
+    A least recently used store of decoded pixel arrays with a memory
+    budget.
+    """
+
+    def __init__(self, budget_bytes):
+        """
+        :param budget_bytes: Number of bytes the decoded arrays may use
+            before the least recently used arrays are evicted.
+        """
+        self.budget_bytes = budget_bytes
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Tuples (dataset, rescale) of the datasets decoded lazily, and
+        # their decoded pixel arrays, by id of the dataset
+        self._datasets = {}
+        self._arrays = OrderedDict()
+        self._lock = threading.RLock()
+
+    def add(self, dataset, rescale=(1, 0)):
+        """
+        Adds a dataset whose pixel array is decoded by the cache when it
+        is first asked for.
+        :param dataset: A FileDataset of an image slice.
+        :param rescale: Tuple (slope, intercept) applied every time the
+            pixel array is decoded.
+        """
+        with self._lock:
+            self._datasets[id(dataset)] = (dataset, rescale)
+
+    def __contains__(self, dataset):
+        with self._lock:
+            return id(dataset) in self._datasets
+
+    def is_resident(self, dataset):
+        """
+        :return: True if the pixel array of the dataset is decoded and
+            held in the cache.
+        """
+        with self._lock:
+            return id(dataset) in self._arrays
+
+    def get(self, dataset):
+        """
+        Gets the pixel array of a dataset added to the cache, decoding
+        and rescaling it if it is not held, and marks it as the most
+        recently used.
+        :param dataset: A dataset added to the cache.
+        :return: The decoded pixel array.
+        """
+        key = id(dataset)
+        with self._lock:
+            pixel_array = self._arrays.get(key)
+            if pixel_array is not None:
+                self.hits += 1
+                self._arrays.move_to_end(key)
+                return pixel_array
+            self.misses += 1
+            pixel_array = decode_pixel_array(*self._datasets[key])
+            self._arrays[key] = pixel_array
+            self.resident_bytes += pixel_array.nbytes
+            self.evict()
+            return pixel_array
+
+    def evict(self):
+        """
+        Evicts the least recently used pixel arrays until the cache is
+        within its budget. The most recently used array is never evicted.
+        """
+        with self._lock:
+            while self.resident_bytes > self.budget_bytes \
+                    and len(self._arrays) > 1:
+                _, pixel_array = self._arrays.popitem(last=False)
+                self.resident_bytes -= pixel_array.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Evicts every pixel array and forgets the datasets.
+        """
+        with self._lock:
+            self._arrays.clear()
+            self._datasets.clear()
+            self.resident_bytes = 0
+
+    def get_statistics(self):
+        """
+        :return: Dictionary of the number of hits, misses and evictions,
+            and the number of bytes used by the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "resident_bytes": self.resident_bytes,
+                "budget_bytes": self.budget_bytes,
+            }
+
+
+def decode_pixel_array(dataset, rescale=(1, 0)):
+    """
+    Decodes and rescales the pixel array of a dataset without keeping it
+    in the dataset.
+    :param dataset: A FileDataset of an image slice.
+    :param rescale: Tuple (slope, intercept) applied to the pixel array.
+    :return: The decoded pixel array.
+    """
+    # pydicom keeps the decoded array in the dataset it is read from, so
+    # it is read from a shallow copy sharing the data elements
+    pixel_array = copy.copy(dataset).pixel_array
+    slope, intercept = rescale
+    if slope != 1 or intercept != 0:
+        pixel_array = pixel_array * slope + intercept
+    return pixel_array
+
+
+class LazyPixelValues(Sequence):
+    """
+    A list of the pixel arrays of image slices, decoded on access. Used
+    in place of the list returned by convert_raw_data in lazy mode.
+    """
+
+    def __init__(self, datasets, cache):
+        """
+        :param datasets: List of the datasets of the slices, in slice
+            order, added to the cache.
+        :param cache: The PixelArrayCache decoding the slices.
+        """
+        self.datasets = datasets
+        self.cache = cache
+
+    def __len__(self):
+        return len(self.datasets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyPixelValues(self.datasets[index], self.cache)
+        return self.cache.get(self.datasets[index])
+
+    @property
+    def shape(self):
+        """
+        :return: Tuple (slices, rows, columns), read without decoding any
+            slice.
+        """
+        if not self.datasets:
+            return 0, 0, 0
+        return (len(self.datasets), int(self.datasets[0].Rows),
+                int(self.datasets[0].Columns))
+
+    def get_view_slice(self, view, index):
+        """
+        :param view: "axial", "coronal" or "sagittal".
+        :param index: Index of the slice in the view.
+        :return: 2D array of the slice. A coronal or sagittal slice takes
+            a row or a column of every axial slice, which are decoded one
+            at a time, so the cache stays within its budget.
+        """
+        if view == "axial":
+            return self[index]
+        first = self[0]
+        if view == "coronal":
+            result = np.empty((len(self), first.shape[1]), first.dtype)
+        else:
+            result = np.empty((len(self), first.shape[0]), first.dtype)
+        del first
+        for i in range(len(self)):
+            if view == "coronal":
+                result[i] = self[i][index, :]
+            else:
+                result[i] = self[i][:, index]
+        return result
@@ -5,8 +5,7 @@ import pydicom
 from src.constants import CT_RESCALE_INTERCEPT
 
 from src.Model.CalculateImages import convert_raw_data, get_pixmaps
-from src.Model.GetPatientInfo import get_basic_info, DicomTree, \
-    dict_instance_uid
+from src.Model.GetPatientInfo import get_basic_info, dict_instance_uid
 from src.Model.Isodose import get_dose_pixluts, calculate_rx_dose_in_cgray
 
 from src.Model.PatientDictContainer import PatientDictContainer
@@ -117,9 +116,6 @@ def create_moving_model():
         moving_dict_container.set("file_rtss", filepaths['rtss'])
         moving_dict_container.set("dataset_rtss", dataset['rtss'])
 
-        dicom_tree_rtss = DicomTree(filepaths['rtss'])
-        moving_dict_container.set("dict_dicom_tree_rtss", dicom_tree_rtss.dict)
-
         moving_dict_container.set("list_roi_numbers", ordered_list_rois(
             moving_dict_container.get("rois")))
         moving_dict_container.set("selected_rois", [])
@@ -128,11 +124,8 @@ def create_moving_model():
 
     # Set RTDOSE attributes
     if moving_dict_container.has_modality("rtdose"):
-        dicom_tree_rtdose = DicomTree(filepaths['rtdose'])
-        moving_dict_container.set(
-            "dict_dicom_tree_rtdose", dicom_tree_rtdose.dict)
-
-        moving_dict_container.set("dose_pixluts", get_dose_pixluts(dataset))
+        moving_dict_container.set("dose_pixluts", get_dose_pixluts(
+            dataset, moving_dict_container.get("pixluts")))
 
         moving_dict_container.set("selected_doses", [])
         # This will be overwritten if an RTPLAN is present.
@@ -143,10 +136,6 @@ def create_moving_model():
         rx_dose_in_cgray = calculate_rx_dose_in_cgray(dataset["rtplan"])
         moving_dict_container.set("rx_dose_in_cgray", rx_dose_in_cgray)
 
-        dicom_tree_rtplan = DicomTree(filepaths['rtplan'])
-        moving_dict_container.set("dict_dicom_tree_rtplan",
-                                  dicom_tree_rtplan.dict)
-
 
 def read_images_for_fusion(level=0, window=0):
     """
@@ -12,6 +12,10 @@ Keyword arguments for DICOM-RT:
     num_points
     pixluts
 """
+from src.Model.DatasetRegistry import DatasetRegistry
+from src.Model.LazyPixelData import PixelArrayCache
+from src.Model.PerformanceOptions import get_performance_option
+from src.Model.PolygonCache import IsodoseCache, PolygonCache
 from src.Model.Singleton import Singleton
 
 
@@ -41,6 +45,9 @@ class PatientDictContainer(metaclass=Singleton):
 
         self.additional_data = None  # Any additional values that are required
         # (e.g. rois, raw_dvh, raw_contour, etc)
+        self.pixel_cache = None  # PixelArrayCache of lazily decoded slices.
+        self.polygon_cache = None  # PolygonCache of the ROIs displayed.
+        self.isodose_cache = None  # IsodoseCache of the isodoses displayed.
 
     def set_initial_values(self, path, dataset, filepaths, **kwargs):
         """
@@ -64,10 +71,21 @@ class PatientDictContainer(metaclass=Singleton):
         Clears the data in order to prepare for a new patient to be
         opened.
         """
+        if self.additional_data is not None \
+                and self.get("progressive_loader") is not None:
+            # Stop decoding the slices of the previous patient
+            self.get("progressive_loader").cancel()
         self.path = None
         self.dataset = None
         self.filepaths = None
         self.additional_data = None
+        if self.pixel_cache is not None:
+            self.pixel_cache.clear()
+            self.pixel_cache = None
+        self.polygon_cache = None
+        self.isodose_cache = None
+        # The datasets read for the patient are no longer needed
+        DatasetRegistry().clear()
 
     def is_empty(self):
         """
@@ -99,6 +117,55 @@ class PatientDictContainer(metaclass=Singleton):
         """
         return self.additional_data.get(keyword)
 
+    def get_pixel_cache(self):
+        """
+        Gets the cache holding the pixel arrays of the image slices when
+        the "lazy_pixel_data" performance option is set. The cache is
+        created on first use, with a budget of "pixel_cache_mb".
+        :return: A PixelArrayCache, or None if slices are not decoded
+            lazily.
+        """
+        if self.pixel_cache is None \
+                and get_performance_option("lazy_pixel_data"):
+            self.pixel_cache = PixelArrayCache(
+                get_performance_option("pixel_cache_mb") * 1024 * 1024)
+        return self.pixel_cache
+
+    def get_pixel_array(self, key):
+        """
+        Gets the rescaled pixel array of an image slice, from the pixel
+        cache if the slice is decoded lazily.
+        :param key: Key of the slice in the dataset dictionary.
+        :return: The pixel array of the slice.
+        """
+        dataset = self.dataset[key]
+        if self.pixel_cache is not None and dataset in self.pixel_cache:
+            return self.pixel_cache.get(dataset)
+        dataset.convert_pixel_data()
+        return dataset._pixel_array
+
+    def get_polygon_cache(self):
+        """
+        Gets the cache keeping the polygons of the ROIs that have been
+        displayed, created on first use with a budget of
+        "polygon_cache_mb".
+        :return: A PolygonCache.
+        """
+        if self.polygon_cache is None:
+            self.polygon_cache = PolygonCache()
+        return self.polygon_cache
+
+    def get_isodose_cache(self):
+        """
+        Gets the cache keeping the isodose polygons of the axial slices
+        that have been displayed, created on first use with a budget of
+        "polygon_cache_mb".
+        :return: An IsodoseCache.
+        """
+        if self.isodose_cache is None:
+            self.isodose_cache = IsodoseCache()
+        return self.isodose_cache
+
     def has_modality(self, dicom_type):
         """
         Example usage: dicom_data.has_modality("rtdose")
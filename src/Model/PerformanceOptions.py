@@ -0,0 +1,125 @@
+"""
+Options that control how OnkoDICOM trades memory and threads for speed
+when loading and displaying DICOM data.
+
+The options a user may want to change (the optional features and the
+memory budgets) are stored in performanceOptions.json in the data
+folder, which is read once, and again when reload_performance_options
+is called. Any option missing from that file (for example, when the
+file was copied to the hidden directory by an older version of
+OnkoDICOM) falls back to the defaults defined below.
+
+Example usage:
+workers = get_performance_option("loader_workers")
+"""
+import json
+import logging
+import os
+
+from src.Controller.PathHandler import data_path
+
+DEFAULT_PERFORMANCE_OPTIONS = {
+    # Number of threads used to read DICOM files when a patient is
+    # opened. A value of 1 or less reads the files one at a time.
+    "loader_workers": 4,
+    # Store the attributes of the files found when searching a directory
+    # in an index in the hidden directory, so that searching the same
+    # directory again only reads the files that have changed.
+    "use_dicom_index": True,
+    # Number of threads reading the files found when searching a
+    # directory, while the rest of the directory is walked.
+    "search_workers": 4,
+    # Decode the pixel data of each image slice the first time it is
+    # needed rather than when the patient is opened, and keep at most
+    # pixel_cache_mb megabytes of decoded slices in memory.
+    "lazy_pixel_data": False,
+    "pixel_cache_mb": 2048,
+    # Back the pixel values of an opened image series with a temporary
+    # file instead of memory, so the OS can page them out.
+    "volume_memmap": False,
+    # Number of threads decoding and rescaling the pixel data of the
+    # image slices when a patient is opened. A value of 1 or less
+    # decodes the slices one at a time.
+    "decode_workers": 4,
+    # Show the main window once the central image slice and its
+    # neighbours (progressive_first_slices slices in all) are decoded,
+    # and decode the other slices in the background.
+    "progressive_open": False,
+    "progressive_first_slices": 5,
+    # Megabytes of rendered image pixmaps kept in memory. Pixmaps are
+    # rendered when a slice is first shown, and the least recently
+    # shown are dropped once this is exceeded.
+    "pixmap_cache_mb": 256,
+    # Threads rendering pixmaps in the background (0 for one per CPU
+    # core), and the most slices they render ahead of the GUI thread.
+    "render_workers": 0,
+    "render_queue_size": 16,
+    # While the slider of a view is dragged, or it has moved within the
+    # last preview_delay_ms milliseconds, show previews of the slices at
+    # a half or a quarter of their resolution, no smaller than
+    # preview_size pixels (0 to always show the full resolution).
+    "preview_size": 256,
+    "preview_delay_ms": 150,
+    # Most slices rendered in the background ahead of a view's slider,
+    # in the direction it moves (0 to only render the slices shown).
+    "prefetch_slices": 8,
+    # Most times per second the views are redrawn while a slider moves
+    # (0 for no limit).
+    "max_frame_rate": 60,
+    # Megabytes of ROI polygons kept once an ROI is deselected, so
+    # selecting it again does not calculate them again.
+    "polygon_cache_mb": 64,
+}
+
+
+# The options read from performanceOptions.json, loaded on first use
+_performance_options = None
+
+
+def load_performance_options():
+    """
+    Read the performance options from performanceOptions.json.
+    :return: Dictionary of all performance options, with defaults filled
+        in for any option that is not in the file.
+    """
+    options = dict(DEFAULT_PERFORMANCE_OPTIONS)
+    path = data_path("performanceOptions.json")
+    if path is not None and os.path.exists(path):
+        try:
+            with open(path, "r") as file_input:
+                options.update(json.load(file_input))
+        except (OSError, ValueError) as error:
+            # A damaged file should not stop a patient from opening.
+            logging.warning("Could not read performance options from %s, "
+                            "using the defaults: %s", path, error)
+    return options
+
+
+def reload_performance_options():
+    """
+    Read the performance options again, e.g. after performanceOptions.json
+    has been saved. Objects already created keep the values they read.
+    """
+    global _performance_options
+    _performance_options = load_performance_options()
+
+
+def get_performance_options():
+    """
+    :return: Dictionary of all performance options, read from
+        performanceOptions.json the first time this is called.
+    """
+    if _performance_options is None:
+        reload_performance_options()
+    return dict(_performance_options)
+
+
+def get_performance_option(option):
+    """
+    :param option: Name of the option, as defined in
+        DEFAULT_PERFORMANCE_OPTIONS.
+    :return: The value of the option.
+    """
+    if _performance_options is None:
+        reload_performance_options()
+    return _performance_options[option]
@@ -0,0 +1,201 @@
+"""
+Pixel lookup tables (pixluts) of the image slices.
+
+The pixlut of a slice is the pair of its x axis and y axis, the patient
+coordinates in mm of the centres of its columns and of its rows, used to
+transform contours from 3D coordinates to pixels and back. They only
+depend on the in-plane geometry of a slice, which is the same for almost
+every slice of a series, so a Pixluts mapping calculates the pixlut of a
+slice the first time it is looked up, by SOPInstanceUID, and shares it
+with every slice of the same geometry.
+
+Example usage:
+pixluts = get_pixluts(patient_dict_container.dataset)
+x_axis, y_axis = pixluts[img_ds.SOPInstanceUID]
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+# Keys of the datasets that are not image slices
+NON_IMAGE_TYPES = ['rtdose', 'rtplan', 'rtss', 'rtimage']
+
+
+def calculate_matrix(img_ds):
+    """
+    Calculate the pixlut of a DICOM(image) dataset.
+    :param img_ds: DICOM(image) dataset
+    :return: pair of numpy arrays, the x coordinates of the columns and
+        the y coordinates of the rows of the image
+    """
+    return calculate_geometry_matrix(get_geometry(img_ds))
+
+
+def calculate_geometry_matrix(geometry):
+    """
+    Calculate the pixlut of a slice from its geometry.
+    :param geometry: tuple of the attributes of a slice, as returned by
+        get_geometry
+    :return: pair of numpy arrays, the x coordinates of the columns and
+        the y coordinates of the rows of the image
+    """
+    # The direction cosines Xx and Yy of the first row and the first
+    # column with respect to the patient, the physical distance (in mm)
+    # between the center of each image pixel - adjacent row spacing and
+    # adjacent column spacing - and the x and y coordinates of the upper
+    # left hand corner (center of the first voxel transmitted) of the
+    # image, in mm.
+    orientation_x, orientation_y, dist_row, dist_col, position_x, \
+        position_y, columns, rows = geometry
+
+    # Equation C.7.6.2.1-1, for the pixels (i, 0) and (0, j).
+    # https://dicom.innolitics.com/ciods/rt-structure-set/roi-contour/30060039/30060040/30060050
+    x = orientation_x * dist_row * np.arange(columns, dtype=float) \
+        + position_x
+    y = orientation_y * dist_col * np.arange(rows, dtype=float) \
+        + position_y
+
+    return x, y
+
+
+def get_geometry(img_ds):
+    """
+    :param img_ds: DICOM(image) dataset
+    :return: tuple of the attributes of the dataset its pixlut is
+        calculated from. Slices of the same geometry have the same pixlut.
+    """
+    return (float(img_ds.ImageOrientationPatient[0]),
+            float(img_ds.ImageOrientationPatient[4]),
+            float(img_ds.PixelSpacing[0]), float(img_ds.PixelSpacing[1]),
+            float(img_ds.ImagePositionPatient[0]),
+            float(img_ds.ImagePositionPatient[1]),
+            int(img_ds.Columns), int(img_ds.Rows))
+
+
+def get_slice_geometries(slice_geometry):
+    """
+    :param slice_geometry: SliceGeometry of the image slices.
+    :return: dictionary of the tuple returned by get_geometry of each
+        slice, by SOPInstanceUID, taken from the table without parsing
+        the datasets again.
+    """
+    columns = np.column_stack([
+        slice_geometry.orientations[:, 0], slice_geometry.orientations[:, 4],
+        slice_geometry.pixel_spacings, slice_geometry.positions[:, 0:2]])
+    return {uid: tuple(values) + (int(slice_columns), int(slice_rows))
+            for uid, values, slice_columns, slice_rows
+            in zip(slice_geometry.uids, columns.tolist(),
+                   slice_geometry.columns, slice_geometry.rows)}
+
+
+def get_image_datasets(dict_ds):
+    """
+    :param dict_ds: a dictionary of all the datasets
+    :return: a dictionary of the image datasets by SOPInstanceUID
+    """
+    image_datasets = {}
+    for key in dict_ds:
+        if key in NON_IMAGE_TYPES:
+            continue
+        if isinstance(key, str) and key[0:3] == 'sr-':
+            continue
+        img_ds = dict_ds[key]
+        image_datasets[img_ds.SOPInstanceUID] = img_ds
+    return image_datasets
+
+
+class Pixluts(Mapping):
+    """
+    Read-only dictionary of the pixluts of image slices by SOPInstanceUID,
+    calculated when they are first looked up. Slices of the same geometry
+    share the same pixlut, the arrays of which must not be modified.
+    """
+
+    def __init__(self, dict_ds, slice_geometry=None):
+        """
+        :param dict_ds: a dictionary of all the datasets
+        :param slice_geometry: SliceGeometry of the image slices, from
+            which the geometry of the slices is taken instead of their
+            datasets, or None.
+        """
+        self.datasets = get_image_datasets(dict_ds)
+        self.geometries = {} if slice_geometry is None \
+            else get_slice_geometries(slice_geometry)
+        self.by_uid = {}
+        self.by_geometry = {}
+
+    def get_key(self, img_ds):
+        """
+        :param img_ds: DICOM(image) dataset
+        :return: key of the slices sharing the value of this slice
+        """
+        geometry = self.geometries.get(img_ds.SOPInstanceUID)
+        return geometry if geometry is not None else get_geometry(img_ds)
+
+    def calculate(self, img_ds):
+        """
+        :param img_ds: DICOM(image) dataset
+        :return: the value of the slice
+        """
+        x, y = calculate_geometry_matrix(self.get_key(img_ds))
+        x.flags.writeable = False
+        y.flags.writeable = False
+        return x, y
+
+    def __getitem__(self, uid):
+        value = self.by_uid.get(uid)
+        if value is None:
+            # Raises a KeyError for a slice that is not an image
+            img_ds = self.datasets[uid]
+            key = self.get_key(img_ds)
+            value = self.by_geometry.get(key)
+            if value is None:
+                # Slices looked up in several threads at once may be
+                # calculated more than once, but are the same
+                value = self.calculate(img_ds)
+                self.by_geometry[key] = value
+            self.by_uid[uid] = value
+        return value
+
+    def __iter__(self):
+        return iter(self.datasets)
+
+    def __len__(self):
+        return len(self.datasets)
+
+    def get_statistics(self):
+        """
+        :return: Dictionary of the number of slices, of the slices looked
+            up and of the different values calculated for them.
+        """
+        return {
+            "slices": len(self.datasets),
+            "looked_up": len(self.by_uid),
+            "calculated": len(self.by_geometry),
+        }
+
+
+def get_pixluts(dict_ds, slice_geometry=None):
+    """
+    :param dict_ds: a dictionary of all the datasets
+    :param slice_geometry: SliceGeometry of the image slices, or None
+    :return: Pixluts of the image slices, a dictionary of pixluts for the
+        transformation from 3D to 2D by SOPInstanceUID.
+    """
+    return Pixluts(dict_ds, slice_geometry)
+
+
+def get_container_pixluts(dict_container):
+    """
+    :param dict_container: PatientDictContainer, MovingDictContainer or
+        PTCTDictContainer of the patient.
+    :return: The pixluts of the container, created from its datasets and
+        the slice geometry stored by InitialModel, and set in it if it has
+        none yet, e.g. as no RTSS was loaded.
+    """
+    pixluts = dict_container.get("pixluts")
+    if pixluts is None:
+        pixluts = get_pixluts(dict_container.dataset,
+                              dict_container.get("slice_geometry"))
+        dict_container.set("pixluts", pixluts)
+    return pixluts
@@ -0,0 +1,369 @@
+"""
+On-demand rendering of the pixmaps of an image volume.
+
+A PixmapRenderer stands in for the dictionary of the pixmaps of one view
+(axial, coronal or sagittal) of a volume. A slice's pixmap is only
+rendered when it is first requested, e.g. by DicomView.image_display,
+and is kept in a PixmapCache shared by the views of the volume. The
+cache evicts the least recently viewed pixmaps once a memory budget is
+exceeded, and an evicted pixmap is rendered again the next time it is
+requested.
+
+While the slices are scrolled through quickly, a view can show previews
+instead: pixmaps of every second or fourth row and column of a slice,
+which are windowed and scaled in a fraction of the time and stretched
+to the size of the image when drawn. Each preview is rendered the first
+time it is requested and kept in the same cache.
+
+Example usage:
+renderer = PixmapRenderer(volume, "axial", window, level, 512, 512)
+pixmap = renderer[slider_id]
+preview = renderer.preview(slider_id)
+statistics = renderer.get_statistics()
+"""
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+from PySide6 import QtCore, QtGui
+
+from src.Model.CalculateImages import scaled_qimage
+from src.Model.LazyPixelData import LazyPixelValues
+from src.Model.PerformanceOptions import get_performance_option
+from src.constants import DEFAULT_WINDOW_SIZE
+
+VIEWS = ("axial", "coronal", "sagittal")
+
+# Levels of the preview pyramid: previews are at most 2 ** PREVIEW_LEVELS
+# times smaller than the pixmaps
+PREVIEW_LEVELS = 2
+
+
+class PixmapCache:
+    """
+    A least recently used store of rendered pixmaps with a memory budget.
+    """
+
+    def __init__(self, budget_bytes=None):
+        """
+        :param budget_bytes: Number of bytes the pixmaps may use before
+            the least recently used pixmaps are evicted. Read from the
+            "pixmap_cache_mb" performance option if None.
+        """
+        if budget_bytes is None:
+            budget_bytes = get_performance_option("pixmap_cache_mb") \
+                * 1024 * 1024
+        self.budget_bytes = budget_bytes
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._pixmaps = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        """
+        :param key: Tuple (renderer, slice index), or (renderer, slice
+            index, preview level) for a preview.
+        :return: The pixmap stored under the key, marked as the most
+            recently used, or None if it is not in the cache.
+        """
+        with self._lock:
+            pixmap = self._pixmaps.get(key)
+            if pixmap is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._pixmaps.move_to_end(key)
+            return pixmap
+
+    def __contains__(self, key):
+        """
+        :return: True if a pixmap is stored under the key. Unlike get,
+            this neither counts as a hit or a miss nor marks it as used.
+        """
+        with self._lock:
+            return key in self._pixmaps
+
+    def put(self, key, pixmap):
+        """
+        Adds a pixmap to the cache, and evicts the least recently used
+        pixmaps if the cache is over its budget.
+        :param key: Tuple (renderer, slice index), or (renderer, slice
+            index, preview level) for a preview.
+        :param pixmap: A QPixmap.
+        """
+        with self._lock:
+            self.discard(key)
+            self._pixmaps[key] = pixmap
+            self.resident_bytes += pixmap_bytes(pixmap)
+            self.evict()
+
+    def discard(self, key):
+        """
+        Removes a pixmap from the cache, if it is there.
+        """
+        with self._lock:
+            pixmap = self._pixmaps.pop(key, None)
+            if pixmap is not None:
+                self.resident_bytes -= pixmap_bytes(pixmap)
+
+    def discard_renderer(self, renderer):
+        """
+        Removes every pixmap of a renderer from the cache.
+        """
+        with self._lock:
+            for key in [key for key in self._pixmaps
+                        if key[0] is renderer]:
+                self.discard(key)
+
+    def evict(self):
+        """
+        Evicts the least recently used pixmaps until the cache is within
+        its budget. The most recently used pixmap is never evicted.
+        """
+        with self._lock:
+            while self.resident_bytes > self.budget_bytes \
+                    and len(self._pixmaps) > 1:
+                _, pixmap = self._pixmaps.popitem(last=False)
+                self.resident_bytes -= pixmap_bytes(pixmap)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Evicts every pixmap.
+        """
+        with self._lock:
+            self._pixmaps.clear()
+            self.resident_bytes = 0
+
+    def get_statistics(self):
+        """
+        :return: Dictionary of the number of hits, misses and evictions,
+            the hit rate, and the number of bytes used by the cache.
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "pixmaps": len(self._pixmaps),
+                "resident_bytes": self.resident_bytes,
+                "budget_bytes": self.budget_bytes,
+            }
+
+
+class PixmapRenderer(Mapping):
+    """
+    The pixmaps of one view of an image volume, indexed by slice like
+    the dictionaries of pixmaps returned by get_pixmaps used to be.
+    """
+
+    def __init__(self, volume, view, window, level, width, height,
+                 fusion=False, color=None, cache=None):
+        """
+        :param volume: 3D numpy array (slices, rows, columns), or the
+            LazyPixelValues of the slices, which are decoded as they are
+            rendered. Slices changed in place are shown once they are
+            invalidated.
+        :param view: "axial", "coronal" or "sagittal".
+        :param window: Window width of windowing function
+        :param level: Level value of windowing function
+        :param width: Pixel width of the pixmaps
+        :param height: Pixel height of the pixmaps
+        :param fusion: Boolean to set scaling for overlayed images
+        :param color: String for conversion of pixels to specified color
+            map
+        :param cache: The PixmapCache holding the rendered pixmaps. A new
+            cache is created if None.
+        """
+        if view not in VIEWS:
+            raise ValueError("Unknown view: %s" % view)
+        self.volume = volume
+        self.view = view
+        self.window = window
+        self.level = level
+        self.width = width
+        self.height = height
+        self.fusion = fusion
+        self.color = color
+        self.cache = cache if cache is not None else PixmapCache()
+        self.preview_size = get_performance_option("preview_size")
+        # Set when every rendered pixmap is dropped, to cancel the
+        # pixmaps being rendered in the background
+        self.interrupt_flag = threading.Event()
+
+    def __getitem__(self, index):
+        index = self._check_index(index)
+        pixmap = self.cache.get((self, index))
+        if pixmap is None:
+            pixmap = self.render(index)
+            self.cache.put((self, index), pixmap)
+        return pixmap
+
+    def __setitem__(self, index, pixmap):
+        """
+        Stores a pixmap rendered elsewhere, e.g. a placeholder for a
+        slice that has not been decoded yet.
+        """
+        self.cache.put((self, self._check_index(index)), pixmap)
+
+    def __len__(self):
+        return self.volume.shape[VIEWS.index(self.view)]
+
+    def __iter__(self):
+        return iter(range(len(self)))
+
+    def __hash__(self):
+        return id(self)
+
+    def __eq__(self, other):
+        return self is other
+
+    def _check_index(self, index):
+        if isinstance(index, (int, np.integer)) and 0 <= index < len(self):
+            return int(index)
+        raise KeyError(index)
+
+    def get_slice(self, index):
+        """
+        :return: The 2D pixel array of a slice of the view.
+        """
+        return get_view_slice(self.volume, self.view, index)
+
+    def render(self, index):
+        """
+        Renders the pixmap of a slice, without caching it.
+        """
+        return QtGui.QPixmap.fromImage(self.render_image(index))
+
+    def render_image(self, index, step=1):
+        """
+        Renders the image of a slice as a QImage, which, unlike a
+        QPixmap, can be done outside the GUI thread.
+        :param index: Index of the slice.
+        :param step: Only every step-th row and column of the slice is
+            rendered, into an image step times smaller, for a preview.
+        """
+        width, height = self.get_size()
+        if step == 1:
+            return scaled_qimage(self.get_slice(index), self.window,
+                                 self.level, width, height, color=self.color)
+        return scaled_qimage(self.get_slice(index)[::step, ::step],
+                             self.window, self.level,
+                             max(1, round(width / step)),
+                             max(1, round(height / step)),
+                             color=self.color,
+                             transformation=QtCore.Qt.FastTransformation)
+
+    def get_size(self):
+        """
+        :return: Tuple of the width and height of the pixmaps.
+        """
+        if self.fusion:
+            return DEFAULT_WINDOW_SIZE, DEFAULT_WINDOW_SIZE
+        return self.width, self.height
+
+    def get_preview_level(self):
+        """
+        :return: The level of the previews: the number of times the
+            pixmaps can be halved, up to PREVIEW_LEVELS, and still be at
+            least preview_size pixels wide or high. 0 if the pixmaps are
+            not larger than that, or previews are turned off.
+        """
+        if self.preview_size <= 0:
+            return 0
+        size = max(self.get_size())
+        level = 0
+        while level < PREVIEW_LEVELS and size // 2 >= self.preview_size:
+            size //= 2
+            level += 1
+        return level
+
+    def preview(self, index):
+        """
+        :param index: Index of the slice.
+        :return: The pixmap of the slice if it is in the cache, else a
+            preview, which is 2 ** get_preview_level() times smaller and
+            is rendered if it is not in the cache either.
+        """
+        index = self._check_index(index)
+        pixmap = self.cache.get((self, index))
+        if pixmap is not None:
+            return pixmap
+        level = self.get_preview_level()
+        if level == 0:
+            return self[index]
+        key = (self, index, level)
+        pixmap = self.cache.get(key)
+        if pixmap is None:
+            pixmap = QtGui.QPixmap.fromImage(
+                self.render_image(index, 2 ** level))
+            self.cache.put(key, pixmap)
+        return pixmap
+
+    def set_window(self, window, level):
+        """
+        Changes the window and level of the pixmaps. The pixmaps rendered
+        with the previous window and level are dropped, so each slice is
+        rendered again when it is next requested, e.g. the slices on
+        screen when the views are updated, the others as they are
+        scrolled to.
+        :param window: Window width of windowing function
+        :param level: Level value of windowing function
+        """
+        if window == self.window and level == self.level:
+            return
+        self.window = window
+        self.level = level
+        self.invalidate()
+
+    def invalidate(self, indices=None):
+        """
+        Removes rendered pixmaps from the cache, so they are rendered
+        again the next time they are requested.
+        :param indices: Indices of the slices. All slices if None.
+        """
+        if indices is None:
+            self.interrupt_flag.set()
+            self.interrupt_flag = threading.Event()
+            self.cache.discard_renderer(self)
+        else:
+            for index in indices:
+                self.cache.discard((self, index))
+                for level in range(1, PREVIEW_LEVELS + 1):
+                    self.cache.discard((self, index, level))
+
+    def get_statistics(self):
+        """
+        :return: The statistics of the cache, see
+            PixmapCache.get_statistics.
+        """
+        return self.cache.get_statistics()
+
+
+def get_view_slice(volume, view, index):
+    """
+    :param volume: 3D array (slices, rows, columns), or LazyPixelValues.
+    :param view: "axial", "coronal" or "sagittal".
+    :param index: Index of the slice in the view.
+    :return: View of the 2D array of the slice, or a copy of it for a
+        coronal or sagittal slice of LazyPixelValues.
+    """
+    if isinstance(volume, LazyPixelValues):
+        return volume.get_view_slice(view, index)
+    if view == "axial":
+        return volume[index, :, :]
+    if view == "coronal":
+        return volume[:, index, :]
+    return volume[:, :, index]
+
+
+def pixmap_bytes(pixmap):
+    """
+    :return: Approximate number of bytes used by a QPixmap.
+    """
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
@@ -0,0 +1,236 @@
+"""
+Cache of the polygons displaying the ROIs of a patient.
+
+The first time an ROI is selected, the pixels of its contours, and the
+QPolygonF lists of each slice of the axial, coronal and sagittal views
+are calculated from the contours in the RTSS. A PolygonCache keeps them
+once the ROI is deselected, so selecting it again reuses them. They are
+stored under the key (ROI name, RTSS revision, view, aspect), and are
+discarded when the contours of that ROI are edited. A new RTSS (one that
+the cache was not told the changes of) starts a new revision. The least
+recently selected ROIs are evicted once a memory budget is exceeded.
+
+An IsodoseCache keeps the isodose polygons of the axial slices in the
+same way, for the RT Dose and prescription dose displayed.
+
+Example usage:
+polygon_cache = patient_dict_container.get_polygon_cache()
+polygon_cache.use_rtss(patient_dict_container.get("dataset_rtss"))
+polygons = polygon_cache.get(roi_name, "coronal", aspect["coronal"])
+"""
+from collections import OrderedDict
+
+from src.Model.PerformanceOptions import get_performance_option
+
+# Estimated bytes of a QPolygonF, excluding its points, and of a point
+POLYGON_BYTES = 64
+POINT_BYTES = 16
+
+
+class PolygonCache:
+    """
+    A least recently used store of the polygons of ROIs with a memory
+    budget. Must be used in the GUI thread.
+    """
+
+    def __init__(self, budget_bytes=None):
+        """
+        :param budget_bytes: Number of bytes the polygons may use before
+            the least recently used are evicted. Read from the
+            "polygon_cache_mb" performance option if None.
+        """
+        if budget_bytes is None:
+            budget_bytes = get_performance_option("polygon_cache_mb") \
+                * 1024 * 1024
+        self.budget_bytes = budget_bytes
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rtss = None
+        self.rtss_revision = 0
+        # Dictionaries of polygons by key, and their size in bytes
+        self._polygons = OrderedDict()
+        self._bytes = {}
+
+    def get_key(self, roi_name, view, aspect):
+        """
+        :return: Tuple (ROI name, RTSS revision, view, aspect) storing the
+            polygons of an ROI in a view.
+        """
+        return roi_name, self.rtss_revision, view, aspect
+
+    def use_rtss(self, rtss):
+        """
+        Starts a new revision, discarding every polygon, if the RTSS is
+        not the one the polygons were calculated from.
+        :param rtss: The RTSS dataset the ROIs are displayed from.
+        """
+        if rtss is not self.rtss:
+            self.rtss = rtss
+            self.rtss_revision += 1
+            self.clear()
+
+    def get(self, roi_name, view, aspect=None):
+        """
+        :param roi_name: Name of the ROI.
+        :param view: "axial", "coronal" or "sagittal".
+        :param aspect: Scaling ratio of the view's pixmaps.
+        :return: Dictionary of the list of QPolygonF of each slice, marked
+            as the most recently used, or None if it is not in the cache.
+        """
+        key = self.get_key(roi_name, view, aspect)
+        polygons = self._polygons.get(key)
+        if polygons is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._polygons.move_to_end(key)
+        return polygons
+
+    def put(self, roi_name, view, aspect, polygons):
+        """
+        Adds the polygons of an ROI in a view to the cache, and evicts the
+        least recently used if the cache is over its budget.
+        :param polygons: Dictionary of the list of QPolygonF of each
+            slice.
+        """
+        key = self.get_key(roi_name, view, aspect)
+        self.discard(key)
+        self._polygons[key] = polygons
+        self._bytes[key] = polygons_bytes(polygons)
+        self.resident_bytes += self._bytes[key]
+        self.evict()
+
+    def discard(self, key):
+        """
+        Removes the polygons stored under a key, if they are there.
+        """
+        if self._polygons.pop(key, None) is not None:
+            self.resident_bytes -= self._bytes.pop(key)
+
+    def invalidate(self, rtss, roi_names=None):
+        """
+        Discards the polygons of the ROIs whose contours were edited, and
+        keeps the others for the RTSS with the edits.
+        :param rtss: The RTSS dataset with the edits.
+        :param roi_names: Names of the ROIs edited, or None if any ROI may
+            have been.
+        """
+        if roi_names is None:
+            self.rtss = None
+            self.use_rtss(rtss)
+            return
+        self.rtss = rtss
+        for key in [key for key in self._polygons
+                    if key[0] in roi_names]:
+            self.discard(key)
+
+    def evict(self):
+        """
+        Evicts the least recently used polygons until the cache is within
+        its budget. The most recently used polygons are never evicted.
+        """
+        while self.resident_bytes > self.budget_bytes \
+                and len(self._polygons) > 1:
+            key = next(iter(self._polygons))
+            self.discard(key)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Evicts every polygon.
+        """
+        self._polygons.clear()
+        self._bytes.clear()
+        self.resident_bytes = 0
+
+    def get_statistics(self):
+        """
+        :return: Dictionary of the number of hits, misses and evictions,
+            of the polygon dictionaries in the cache and of the bytes they
+            are estimated to use.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._polygons),
+            "resident_bytes": self.resident_bytes,
+        }
+
+
+class IsodoseCache(PolygonCache):
+    """
+    A PolygonCache of the isodose polygons of the axial slices. The
+    polygons of a slice are stored as a dictionary of the list of
+    QPolygonF of each dose, for the RT Dose and prescription dose in
+    use. Must be used in the GUI thread.
+    """
+
+    def __init__(self, budget_bytes=None):
+        """
+        :param budget_bytes: Number of bytes the polygons may use before
+            the least recently used are evicted. Read from the
+            "polygon_cache_mb" performance option if None.
+        """
+        super().__init__(budget_bytes)
+        self.rx_dose = None
+
+    def use_dose(self, rtdose, rx_dose):
+        """
+        Starts a new revision, discarding every polygon, if the RT Dose
+        or the prescription dose is not the one the polygons were
+        calculated for.
+        :param rtdose: The RT Dose dataset.
+        :param rx_dose: The prescription dose in cGy.
+        """
+        if rx_dose != self.rx_dose:
+            self.rx_dose = rx_dose
+            self.rtss = None
+        self.use_rtss(rtdose)
+
+    def get_slice(self, slider_id):
+        """
+        :param slider_id: Index of the axial slice.
+        :return: Dictionary of the list of QPolygonF of each dose of the
+            slice, or None if it is not in the cache.
+        """
+        return self.get("isodose", "axial", slider_id)
+
+    def put_slice(self, slider_id, polygons):
+        """
+        Adds the isodose polygons of a slice to the cache.
+        :param slider_id: Index of the axial slice.
+        :param polygons: Dictionary of the list of QPolygonF of each dose.
+        """
+        self.put("isodose", "axial", slider_id, polygons)
+
+
+def polygons_bytes(polygons):
+    """
+    :param polygons: Dictionary of the list of QPolygonF of each slice.
+    :return: Estimated number of bytes used by the polygons.
+    """
+    return sum(POLYGON_BYTES + POINT_BYTES * polygon.size()
+               for slice_polygons in polygons.values()
+               for polygon in slice_polygons)
+
+
+def get_modified_roi_names(change_description):
+    """
+    :param change_description: Dictionary of the changes made to the
+        RTSS, as passed to
+        StructureTab.fixed_container_structure_modified.
+    :return: List of the names of the ROIs whose contours may have
+        changed, or None if any ROI may have.
+    """
+    roi_names = []
+    for change, value in change_description.items():
+        if change in ("rename", "delete"):
+            roi_names.extend(value)
+        elif change == "draw" and value is not None:
+            roi_names.append(value)
+        else:
+            return None
+    return roi_names
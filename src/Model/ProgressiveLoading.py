@@ -0,0 +1,262 @@
+"""
+Progressive opening of a patient's image series.
+
+Only the central axial slice and its neighbours are decoded before the
+main window is shown. The other slices are decoded on a worker thread,
+outwards from the centre, into the same ImageVolume, and their pixmaps
+are rendered by the RenderPipeline as they arrive. Once all slices have
+been decoded, the pixmaps of the 3 views are rendered on demand, as when
+a patient is opened all at once.
+"""
+import functools
+import logging
+import threading
+import time
+
+import numpy as np
+from PySide6 import QtGui
+
+from src.Model.CalculateImages import convert_slice, get_pixmap_sizes, \
+    get_pixmaps, scaled_pixmap, scaled_qimage
+from src.Model.ImageVolume import ImageVolume, allocate_voxels, \
+    get_volume_geometry
+from src.Model.PerformanceOptions import get_performance_option
+from src.Model.SliceGeometry import get_slice_geometry, \
+    has_slice_geometry
+
+# Number of slices decoded between two progress updates
+PROGRESS_SLICES = 8
+
+
+class ProgressiveImageLoader:
+    """
+    Decodes the slices of an image series in the order in which they are
+    likely to be viewed, starting from the central slice.
+    """
+
+    def __init__(self, dataset, is_ct=False, first_slices=None,
+                 slice_geometry=None):
+        """
+        :param dataset: Dictionary of the patient's datasets, with the
+            image slices under integer keys.
+        :param is_ct: Whether the images are CT, for rescaling.
+        :param first_slices: Number of slices decoded before the main
+            window is shown. Read from the "progressive_first_slices"
+            performance option if None.
+        :param slice_geometry: SliceGeometry of the image slices, in slice
+            order, as built by ImageLoading.image_stack_sort. Read from
+            the slices if None.
+        """
+        if first_slices is None:
+            first_slices = get_performance_option("progressive_first_slices")
+        self.datasets = [dataset[key] for key in dataset
+                         if isinstance(key, int)]
+        self.is_ct = is_ct
+        if slice_geometry is None and has_slice_geometry(self.datasets):
+            slice_geometry = get_slice_geometry(self.datasets)
+        self.slice_geometry = slice_geometry
+        self.order = get_loading_order(len(self.datasets))
+        self.first_slices = max(1, min(first_slices, len(self.datasets)))
+        self.loaded = np.zeros(len(self.datasets), dtype=bool)
+        self.volume = None
+        self.interrupt_flag = threading.Event()
+
+    def load_first_slices(self):
+        """
+        Decode the central slice and its neighbours, and create the
+        volume the other slices are decoded into.
+        :return: The ImageVolume of the series. The slices that are not
+            yet decoded are zero.
+        """
+        first = self.order[:self.first_slices]
+        pixel_arrays = [convert_slice(self.datasets[i], False, self.is_ct)
+                        for i in first]
+        dtype = np.result_type(*pixel_arrays)
+        voxels = allocate_voxels(
+            (len(self.datasets),) + pixel_arrays[0].shape, dtype,
+            get_performance_option("volume_memmap"))
+        voxels[:] = 0
+        for i, pixel_array in zip(first, pixel_arrays):
+            self.store_slice(voxels, i, pixel_array)
+
+        spacing, orientation, origin = get_volume_geometry(
+            self.datasets[0], self.slice_geometry)
+        self.volume = ImageVolume(voxels, spacing, orientation, origin)
+        return self.volume
+
+    def load_remaining(self, interrupt_flag=None, progress_callback=None):
+        """
+        Decode the slices not decoded by load_first_slices. Meant to be
+        run by a Worker.
+        :param interrupt_flag: A threading.Event() object that stops the
+            loading when set, in addition to cancel().
+        :param progress_callback: A signal that receives tuples (text,
+            percentage, list of the indices of the slices decoded since
+            the last update).
+        :return: True if every slice was decoded, False if the loading
+            was interrupted.
+        """
+        decoded = []
+        for count, i in enumerate(self.order[self.first_slices:],
+                                  self.first_slices + 1):
+            if self.interrupt_flag.is_set() or \
+                    (interrupt_flag is not None and interrupt_flag.is_set()):
+                return False
+            self.store_slice(self.volume.voxels, i, convert_slice(
+                self.datasets[i], False, self.is_ct))
+            decoded.append(i)
+            if progress_callback is not None and \
+                    (len(decoded) == PROGRESS_SLICES
+                     or count == len(self.order)):
+                progress_callback.emit(
+                    ("Loading slices...",
+                     int(count / len(self.order) * 100), decoded))
+                decoded = []
+        return True
+
+    def store_slice(self, voxels, index, pixel_array):
+        """
+        Store a decoded slice in the volume, and make the slice's pixel
+        array a view of it.
+        """
+        voxels[index] = pixel_array
+        self.datasets[index]._pixel_array = voxels[index]
+        self.loaded[index] = True
+
+    def is_complete(self):
+        """
+        :return: True if every slice has been decoded.
+        """
+        return bool(self.loaded.all())
+
+    def cancel(self):
+        """
+        Stop load_remaining, e.g. when another patient is opened.
+        """
+        self.interrupt_flag.set()
+
+    def get_axial_pixmaps(self, window, level, pixmap_aspect,
+                          pixmaps=None, indices=None):
+        """
+        Render the axial pixmaps of the decoded slices. The slices that
+        are not decoded get a black placeholder.
+        :param window: Window width of windowing function
+        :param level: Level value of windowing function
+        :param pixmap_aspect: Scaling ratio for axial, coronal, and
+            sagittal pixmaps
+        :param pixmaps: Dictionary of pixmaps to update. A new dictionary
+            is created if None.
+        :param indices: Indices of the slices to render. All slices if
+            None.
+        :return: Dictionary of the axial pixmaps.
+        """
+        width, height = get_pixmap_sizes(self.volume.shape,
+                                         pixmap_aspect)[0]
+        if pixmaps is None:
+            pixmaps = {}
+        if indices is None:
+            indices = range(len(self.volume))
+        placeholder = None
+        for i in indices:
+            if self.loaded[i]:
+                pixmaps[i] = scaled_pixmap(self.volume.axial(i), window,
+                                           level, width, height)
+            else:
+                if placeholder is None:
+                    placeholder = get_placeholder(width, height)
+                pixmaps[i] = placeholder
+        return pixmaps
+
+    def submit_axial_pixmaps(self, pipeline, window, level, pixmap_aspect,
+                             pixmaps, indices):
+        """
+        Render the axial pixmaps of decoded slices in the background,
+        like get_axial_pixmaps. The requests are cancelled with the
+        loading.
+        :param pipeline: The RenderPipeline rendering the pixmaps.
+        :param window: Window width of windowing function
+        :param level: Level value of windowing function
+        :param pixmap_aspect: Scaling ratio for axial, coronal, and
+            sagittal pixmaps
+        :param pixmaps: Dictionary the pixmaps are stored in.
+        :param indices: Indices of the decoded slices.
+        """
+        width, height = get_pixmap_sizes(self.volume.shape,
+                                         pixmap_aspect)[0]
+        for i in indices:
+            pipeline.submit(pixmaps, i, functools.partial(
+                scaled_qimage, self.volume.axial(i), window, level, width,
+                height), self.interrupt_flag)
+
+    def get_placeholder_pixmaps(self, pixmap_aspect):
+        """
+        :param pixmap_aspect: Scaling ratio for axial, coronal, and
+            sagittal pixmaps
+        :return: Tuple of dictionaries of the black coronal and sagittal
+            pixmaps shown until every slice has been decoded.
+        """
+        _, coronal_size, sagittal_size = \
+            get_pixmap_sizes(self.volume.shape, pixmap_aspect)
+        coronal = get_placeholder(*coronal_size)
+        sagittal = get_placeholder(*sagittal_size)
+        return dict.fromkeys(range(self.volume.shape[1]), coronal), \
+            dict.fromkeys(range(self.volume.shape[2]), sagittal)
+
+    def get_pixmaps(self, window, level, pixmap_aspect):
+        """
+        Get the pixmaps of the 3 views, once every slice has been
+        decoded. They replace the pixmaps of get_axial_pixmaps and
+        get_placeholder_pixmaps.
+        :param window: Window width of windowing function
+        :param level: Level value of windowing function
+        :param pixmap_aspect: Scaling ratio for axial, coronal, and
+            sagittal pixmaps
+        :return: Tuple of the PixmapRenderers of the axial, coronal and
+            sagittal views.
+        """
+        return get_pixmaps(self.volume, window, level, pixmap_aspect)
+
+
+def get_loading_order(slice_count, centre=None):
+    """
+    :param slice_count: Number of slices.
+    :param centre: Index of the slice loaded first. The central slice
+        if None.
+    :return: List of the indices of all slices, starting at the centre
+        and alternating outwards (centre, centre + 1, centre - 1, ...).
+    """
+    if centre is None:
+        centre = slice_count // 2
+    order = [centre]
+    for offset in range(1, slice_count):
+        for index in (centre + offset, centre - offset):
+            if 0 <= index < slice_count:
+                order.append(index)
+    return order
+
+
+def get_placeholder(width, height):
+    """
+    :return: A black pixmap of the given size.
+    """
+    pixmap = QtGui.QPixmap(int(width), int(height))
+    pixmap.fill(QtGui.QColor(0, 0, 0))
+    return pixmap
+
+
+def record_load_time(dict_container, name):
+    """
+    Record the time since the patient started opening, as set by the
+    ImageLoader in "open_start_time".
+    :param dict_container: The PatientDictContainer.
+    :param name: Name of the measurement, e.g. "time_to_first_image". It
+        is stored in the container under this name.
+    :return: The time in seconds, or None if no start time is set.
+    """
+    start_time = dict_container.get("open_start_time")
+    if start_time is None:
+        return None
+    elapsed = time.perf_counter() - start_time
+    dict_container.set(name, elapsed)
+    logging.info("%s: %.3f s", name.replace("_", " ").capitalize(), elapsed)
+    return elapsed
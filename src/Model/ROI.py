@@ -19,6 +19,8 @@ from src.Model.MovingDictContainer import MovingDictContainer
 from src.View.util.PatientDictContainerHelper import get_dict_slice_to_uid
 from src.constants import DEFAULT_WINDOW_SIZE
 from src.Model.CalculateImages import *
+from src.Model.Pixluts import calculate_matrix, get_container_pixluts, \
+    get_pixluts
 from src.Model.PatientDictContainer import PatientDictContainer
 from src.Model.Transform import inv_linear_transform
 
@@ -368,90 +370,6 @@ def get_raw_contour_data(rtss):
     return dict_roi, dict_num_points
 
 
-def calculate_matrix(img_ds):
-    """
-    Calculate the transformation matrix of a DICOM(image) dataset.
-    :param img_ds: DICOM(image) dataset
-    :return: pair of numpy arrays that represents the transformation
-        matrix
-    """
-    # Physical distance (in mm) between the center of each image pixel,
-    # specified by a numeric pair
-    # - adjacent row spacing (delimiter) adjacent column spacing.
-    dist_row = img_ds.PixelSpacing[0]
-    dist_col = img_ds.PixelSpacing[1]
-    # The direction cosines of the first row and the first column with
-    # respect to the patient.
-    # 6 values inside: [Xx, Xy, Xz, Yx, Yy, Yz]
-    orientation = img_ds.ImageOrientationPatient
-    # The x, y, and z coordinates of the upper left hand corner
-    # (center of the first voxel transmitted) of the image, in mm.
-    # 3 values: [Sx, Sy, Sz]
-    position = img_ds.ImagePositionPatient
-
-    # Equation C.7.6.2.1-1.
-    # https://dicom.innolitics.com/ciods/rt-structure-set/roi-contour/30060039/30060040/30060050
-    matrix_m = np.ndarray(
-        shape=(4, 4),
-        buffer=np.array(
-            [
-                [orientation[0] * dist_row, orientation[3] * dist_col, 0,
-                 position[0]],
-                [orientation[1] * dist_row, orientation[4] * dist_col, 0,
-                 position[1]],
-                [orientation[2] * dist_row, orientation[5] * dist_col, 0,
-                 position[2]],
-                [0, 0, 0, 1],
-            ],
-            dtype=float,
-        ),
-    )
-
-    x = []
-    y = []
-    for i in range(0, img_ds.Columns):
-        i_mat = np.matmul(
-            matrix_m,
-            np.ndarray(
-                shape=(4, 1),
-                buffer=np.array([[i], [0], [0], [1]], dtype=float)
-            ),
-        )
-        x.append(float(i_mat[0]))
-
-    for j in range(0, img_ds.Rows):
-        j_mat = np.matmul(
-            matrix_m,
-            np.ndarray(
-                shape=(4, 1),
-                buffer=np.array([[0], [j], [0], [1]], dtype=float)
-            ),
-        )
-        y.append(float(j_mat[1]))
-
-    return np.array(x), np.array(y)
-
-
-def get_pixluts(dict_ds):
-    """
-    Calculate transformation matrices for all the slices.
-    :param dict_ds: a dictionary of all the datasets
-    :return: a dictionary of transformation matrices
-    """
-    dict_pixluts = {}
-    non_img_type = ["rtdose", "rtplan", "rtss"]
-    for ds in dict_ds:
-        if ds not in non_img_type:
-            if isinstance(ds, str) and ds[0:3] == 'sr-':
-                continue
-            else:
-                img_ds = dict_ds[ds]
-                pixlut = calculate_matrix(img_ds)
-                dict_pixluts[img_ds.SOPInstanceUID] = pixlut
-
-    return dict_pixluts
-
-
 def calculate_pixels(pixlut, contour, prone=False, feetfirst=False):
     """
     Calculate (Convert) contour points.
@@ -461,33 +379,15 @@ def calculate_pixels(pixlut, contour, prone=False, feetfirst=False):
     :param feetfirst: label of feetfirst or head first
     :return: contour pixels
     """
-    pixels = []
-
-    np_x = np.array(pixlut[0])
-    np_y = np.array(pixlut[1])
-    if not feetfirst and not prone:
-        for i in range(0, len(contour), 3):
-            con_x = contour[i]
-            con_y = contour[i + 1]
-            x = np.argmax(np_x > con_x)
-            y = np.argmax(np_y > con_y)
-            pixels.append([x, y])
-    if feetfirst and not prone:
-        for i in range(0, len(contour), 3):
-            con_x = contour[i]
-            con_y = contour[i + 1]
-            x = np.argmin(np_x < con_x)
-            y = np.argmax(np_y > con_y)
-            pixels.append([x, y])
-    if prone:
-        for i in range(0, len(contour), 3):
-            con_x = contour[i]
-            con_y = contour[i + 1]
-            x = np.argmin(np_x < con_x)
-            y = np.argmin(np_y < con_y)
-            pixels.append([x, y])
-
-    return pixels
+    # All the points of the contour are looked up at once. The pixel of
+    # a coordinate is the first one past it on the pixlut axis, which is
+    # the first one at or past it when the patient is prone or, for x,
+    # feet first.
+    points = np.asarray(contour, dtype=float).reshape(-1, 3)
+    x = find_first_pixels(pixlut[0], points[:, 0],
+                          inclusive=prone or feetfirst)
+    y = find_first_pixels(pixlut[1], points[:, 1], inclusive=prone)
+    return np.column_stack((x, y)).tolist()
 
 
 def calculate_pixels_sagittal(pixlut, contour, prone=False, feetfirst=False):
@@ -502,30 +402,38 @@ def calculate_pixels_sagittal(pixlut, contour, prone=False, feetfirst=False):
     ----------
     contour : object
     """
-    pixels = []
-    np_x = np.array(pixlut[0])
-    np_y = np.array(pixlut[1])
-    if not feetfirst and not prone:
-        for i in range(0, len(contour), 3):
-            con_x = contour[i]
-            con_y = contour[i + 1]
-            x = np.argmax(np_x > con_x)
-            y = np.argmax(np_y > con_y)
-            pixels.append([x, y])
-    if feetfirst and not prone:
-        for i in range(0, len(contour), 3):
-            con_x = contour[i]
-            con_y = contour[i + 1]
-            x = np.argmin(np_x < con_x)
-            y = np.argmax(np_y > con_y)
-            pixels.append([x, y])
-    if prone:
-        for i in range(0, len(contour), 3):
-            con_x = contour[i]
-            con_y = contour[i + 1]
-            x = np.argmin(np_x < con_x)
-            y = np.argmin(np_y < con_y)
-            pixels.append([x, y])
+    return calculate_pixels(pixlut, contour, prone, feetfirst)
+
+
+def find_first_pixels(axis, coordinates, inclusive=False):
+    """
+    Find the first pixel past each of a list of coordinates on an axis of
+    a pixlut, the same as np.argmax(axis > coordinate) for each
+    coordinate (np.argmin(axis < coordinate) if inclusive), including
+    giving 0 when no pixel is past the coordinate.
+    :param axis: list of the coordinates of the pixels along the axis
+    :param coordinates: 1D array of coordinates
+    :param inclusive: also count a pixel at the coordinate as past it
+    :return: 1D array of pixel indices
+    """
+    axis = np.asarray(axis, dtype=float)
+    coordinates = np.asarray(coordinates, dtype=float)
+    steps = np.diff(axis)
+    if np.all(steps >= 0):
+        # Binary search of the sorted axis
+        pixels = np.searchsorted(axis, coordinates,
+                                 side="left" if inclusive else "right")
+        pixels[pixels == len(axis)] = 0
+        return pixels
+    if np.all(steps <= 0):
+        # Only the first pixel can be the first past a coordinate
+        return np.zeros(len(coordinates), dtype=np.intp)
+    # Compare with every pixel, a block of coordinates at a time
+    pixels = np.empty(len(coordinates), dtype=np.intp)
+    for start in range(0, len(coordinates), 1024):
+        block = coordinates[start:start + 1024, None]
+        past = axis >= block if inclusive else axis > block
+        pixels[start:start + 1024] = np.argmax(past, axis=1)
     return pixels
 
 
@@ -590,7 +498,7 @@ def convert_hull_to_rcs(patient_dict_container, hull_pts, slider_id):
 
     """
     dataset = patient_dict_container.dataset[slider_id]
-    pixlut = patient_dict_container.get("pixluts")[
+    pixlut = get_container_pixluts(patient_dict_container)[
         dataset.SOPInstanceUID]
     z_coord = dataset.SliceLocation
     points = []
@@ -0,0 +1,232 @@
+"""
+Rendering of slice images in a pool of threads.
+
+The windowing and the creation and scaling of the QImage of a slice are
+done by worker threads. A QPixmap can only be created in the GUI thread,
+so the finished QImages are handed to the GUI thread, woken by a queued
+signal, converted to QPixmaps there and stored where they were asked
+for, e.g. in a PixmapRenderer.
+
+At most max_pending slices are rendered or waiting for the GUI thread at
+any time. The other requests wait in a queue, so the workers never run
+further ahead of the GUI thread than that. A request is cancelled by
+setting its interrupt flag (a threading.Event), the same as a Worker's.
+
+Example usage:
+pipeline = get_render_pipeline()
+interrupt_flag = pipeline.submit_renderer(renderer, range(len(renderer)))
+interrupt_flag.set()
+"""
+import functools
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6 import QtCore, QtGui
+
+from src.Model.PerformanceOptions import get_performance_option
+
+
+class RenderPipeline(QtCore.QObject):
+    """
+    Renders slice images in worker threads and turns them into pixmaps
+    in the GUI thread. Must be created, and used, in the GUI thread.
+    """
+
+    # Internal: emitted by a worker thread when it adds an image to
+    # self.images while it is empty, so the GUI thread is woken once for
+    # all the images rendered in the meantime.
+    image_rendered = QtCore.Signal()
+
+    # (pixmaps, index) once a pixmap has been stored in pixmaps[index]
+    pixmap_ready = QtCore.Signal(object, object)
+
+    def __init__(self, max_workers=None, max_pending=None):
+        """
+        :param max_workers: Number of worker threads, one per CPU core
+            if 0. Read from the "render_workers" performance option if
+            None.
+        :param max_pending: Maximum number of slices rendered or waiting
+            for the GUI thread at a time. Read from the
+            "render_queue_size" performance option if None.
+        """
+        super().__init__()
+        if max_workers is None:
+            max_workers = get_performance_option("render_workers")
+        if max_pending is None:
+            max_pending = get_performance_option("render_queue_size")
+        if max_workers <= 0:
+            max_workers = os.cpu_count() or 1
+        self.max_workers = max_workers
+        self.max_pending = max(1, max_pending)
+        self.executor = ThreadPoolExecutor(self.max_workers)
+        self.queue = deque()
+        # (request, QImage or None) rendered and waiting for the GUI thread
+        self.images = deque()
+        self.images_lock = threading.Lock()
+        self.pending = 0
+        self.submitted = 0
+        self.rendered = 0
+        self.cancelled = 0
+        self.peak_pending = 0
+        self.image_rendered.connect(self.on_images_rendered,
+                                    QtCore.Qt.QueuedConnection)
+
+    def submit(self, pixmaps, index, render_image, interrupt_flag=None):
+        """
+        Asks for the pixmap of a slice to be rendered.
+        :param pixmaps: Object the pixmap is stored in, as
+            pixmaps[index], e.g. a PixmapRenderer or a dictionary.
+        :param index: Index of the slice.
+        :param render_image: Function without arguments returning the
+            QImage of the slice. Called in a worker thread.
+        :param interrupt_flag: A threading.Event() object that cancels
+            the request when set. A new one is created if None.
+        :return: The interrupt flag.
+        """
+        if interrupt_flag is None:
+            interrupt_flag = threading.Event()
+        self.queue.append((pixmaps, index, render_image, (interrupt_flag,)))
+        self.submitted += 1
+        self.start_requests()
+        return interrupt_flag
+
+    def submit_renderer(self, renderer, indices, interrupt_flag=None):
+        """
+        Asks for the pixmaps of slices of a PixmapRenderer to be rendered
+        and stored in its cache. The requests are also cancelled when the
+        renderer drops its pixmaps, e.g. when its window changes.
+        :param renderer: A PixmapRenderer.
+        :param indices: Indices of the slices, in the order they are
+            rendered.
+        :param interrupt_flag: A threading.Event() object that cancels
+            the requests when set. A new one is created if None.
+        :return: The interrupt flag.
+        """
+        if interrupt_flag is None:
+            interrupt_flag = threading.Event()
+        flags = (interrupt_flag, renderer.interrupt_flag)
+        for index in indices:
+            self.queue.append((renderer, index, functools.partial(
+                renderer.render_image, index), flags))
+            self.submitted += 1
+        self.start_requests()
+        return interrupt_flag
+
+    def submit_task(self, function, *args, interrupt_flag=None):
+        """
+        Runs a function in a worker thread, e.g. to prepare the overlays
+        of a slice before it is shown. Its result is not handed to the
+        GUI thread, so it must store what it computes itself.
+        :param function: The function, called with args.
+        :param interrupt_flag: A threading.Event() object that cancels
+            the task if it is set before the task starts.
+        """
+        self.executor.submit(run_task, function, args, interrupt_flag)
+
+    def start_requests(self):
+        """
+        Hands queued requests to the workers while fewer than max_pending
+        slices are being rendered or waiting for the GUI thread.
+        """
+        while self.queue and self.pending < self.max_pending:
+            request = self.queue.popleft()
+            if is_cancelled(request):
+                self.cancelled += 1
+                continue
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+            self.executor.submit(self.render, request)
+
+    def render(self, request):
+        """
+        Renders the image of a request. Runs in a worker thread.
+        """
+        image = None
+        if not is_cancelled(request):
+            try:
+                image = request[2]()
+            except Exception:
+                # A failed slice is rendered again when it is shown
+                image = None
+        with self.images_lock:
+            wake = not self.images
+            self.images.append((request, image))
+        if wake:
+            self.image_rendered.emit()
+
+    def on_images_rendered(self):
+        """
+        Turns the rendered images into pixmaps and stores them. Runs in
+        the GUI thread.
+        """
+        with self.images_lock:
+            images = list(self.images)
+            self.images.clear()
+        for request, image in images:
+            self.pending -= 1
+            pixmaps, index, _, _ = request
+            if image is None or is_cancelled(request):
+                self.cancelled += 1
+            else:
+                pixmaps[index] = QtGui.QPixmap.fromImage(image)
+                self.rendered += 1
+                self.pixmap_ready.emit(pixmaps, index)
+        self.start_requests()
+
+    def is_idle(self):
+        """
+        :return: True if no request is queued or being rendered.
+        """
+        return not self.queue and self.pending == 0
+
+    def get_statistics(self):
+        """
+        :return: Dictionary of the number of requests submitted, rendered
+            and cancelled, of the requests queued and pending, and of the
+            most requests pending at a time.
+        """
+        return {
+            "submitted": self.submitted,
+            "rendered": self.rendered,
+            "cancelled": self.cancelled,
+            "queued": len(self.queue),
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+        }
+
+
+def run_task(function, args, interrupt_flag):
+    """
+    Runs a task submitted with RenderPipeline.submit_task, unless it has
+    been cancelled.
+    """
+    if interrupt_flag is not None and interrupt_flag.is_set():
+        return
+    try:
+        function(*args)
+    except Exception:
+        # The work is done again in the GUI thread when it is needed
+        pass
+
+
+def is_cancelled(request):
+    """
+    :return: True if one of the interrupt flags of a request is set.
+    """
+    return any(flag.is_set() for flag in request[3])
+
+
+_pipeline = None
+
+
+def get_render_pipeline():
+    """
+    :return: The RenderPipeline shared by the views, created the first
+        time this is called, which must be in the GUI thread.
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = RenderPipeline()
+    return _pipeline
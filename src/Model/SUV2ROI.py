@@ -3,6 +3,7 @@ from skimage import measure
 from src.Model import ImageLoading
 from src.Model import ROI
 from src.Model.PatientDictContainer import PatientDictContainer
+from src.Model.Pixluts import get_container_pixluts
 from src.View.InputDialogs import PatientWeightDialog
 
 
@@ -213,6 +214,7 @@ class SUV2ROI:
         # Initialise variables needed for function
         patient_dict_container = PatientDictContainer()
         dataset_rtss = patient_dict_container.get("dataset_rtss")
+        pixluts = get_container_pixluts(patient_dict_container)
 
         # Get existing ROIs
         existing_rois = []
@@ -247,8 +249,7 @@ class SUV2ROI:
             for i in range(len(contours[item])):
                 slider_id = contours[item][i][0]
                 dataset = patient_dict_container.dataset[slider_id]
-                pixlut = patient_dict_container.get("pixluts")
-                pixlut = pixlut[dataset.SOPInstanceUID]
+                pixlut = pixluts[dataset.SOPInstanceUID]
                 z_coord = dataset.SliceLocation
 
                 # List storing lists that contain all points for a
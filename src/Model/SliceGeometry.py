@@ -0,0 +1,165 @@
+"""
+The geometry of a stack of image slices.
+
+The orientation, position and pixel spacing of every slice are read
+into NumPy arrays in a single pass, from which the position of each
+slice along the stack axis, the spacing between slices and any
+irregularities in the stack are calculated without further parsing of
+DICOM values.
+"""
+import numpy as np
+
+# Largest difference (in mm) between slice spacings, and smallest
+# spacing, before a stack is reported as irregular.
+SPACING_TOLERANCE = 0.01
+
+# Largest angle (in degrees) between the stack axis and the slice
+# normal before a stack is reported as tilted.
+TILT_TOLERANCE = 0.1
+
+# Largest difference between the direction cosines of two slices before
+# they are reported as having different orientations.
+ORIENTATION_TOLERANCE = 1e-4
+
+
+class SliceGeometry:
+    """
+    A table of the geometry of a stack of image slices, one row per
+    slice.
+    """
+
+    def __init__(self, orientations, positions, pixel_spacings, rows,
+                 columns, uids):
+        """
+        :param orientations: Array of shape (slices, 6) of the
+            ImageOrientationPatient of each slice.
+        :param positions: Array of shape (slices, 3) of the
+            ImagePositionPatient of each slice.
+        :param pixel_spacings: Array of shape (slices, 2) of the
+            PixelSpacing (row spacing, column spacing) of each slice.
+        :param rows: Array of the number of rows of each slice.
+        :param columns: Array of the number of columns of each slice.
+        :param uids: List of the SOPInstanceUID of each slice.
+        """
+        self.orientations = orientations
+        self.positions = positions
+        self.pixel_spacings = pixel_spacings
+        self.rows = rows
+        self.columns = columns
+        self.uids = uids
+
+        # Projection of each slice's position on the axis perpendicular
+        # to the slices, i.e. the stack axis
+        self.normals = np.cross(orientations[:, 0:3], orientations[:, 3:6])
+        self.displacements = np.einsum("ij,ij->i", self.normals, positions)
+
+    def __len__(self):
+        return len(self.uids)
+
+    def stack_order(self):
+        """
+        :return: Array of the indices that sort the slices by descending
+            displacement along the stack axis. For axial images this is
+            by descending Z coordinate. Slices at the same position keep
+            their order.
+        """
+        return np.argsort(-self.displacements, kind="stable")
+
+    def take(self, order):
+        """
+        :param order: Array of slice indices.
+        :return: A new SliceGeometry with the slices in the given order.
+        """
+        return SliceGeometry(self.orientations[order],
+                             self.positions[order],
+                             self.pixel_spacings[order],
+                             self.rows[order],
+                             self.columns[order],
+                             [self.uids[i] for i in order])
+
+    def slice_spacings(self):
+        """
+        :return: Array of the distances (in mm) between each slice and
+            the next along the stack axis.
+        """
+        return np.abs(np.diff(self.displacements))
+
+    def slice_spacing(self):
+        """
+        :return: The median distance (in mm) between slices, or None if
+            there are fewer than two slices.
+        """
+        if len(self) < 2:
+            return None
+        return float(np.median(self.slice_spacings()))
+
+    def get_anomalies(self):
+        """
+        :return: List of strings describing irregularities in the stack:
+            slices with different orientations, slices sharing a
+            position, irregular slice spacing, and gantry tilt.
+        """
+        anomalies = []
+        if len(self) < 2:
+            return anomalies
+
+        if np.any(np.abs(self.orientations - self.orientations[0])
+                  > ORIENTATION_TOLERANCE):
+            anomalies.append("Slices have different orientations")
+
+        spacings = self.slice_spacings()
+        if np.any(spacings < SPACING_TOLERANCE):
+            anomalies.append("%s slices share a position with another slice"
+                             % int(np.sum(spacings < SPACING_TOLERANCE)))
+        elif spacings.max() - spacings.min() > SPACING_TOLERANCE:
+            anomalies.append("Irregular slice spacing (%.3f mm to %.3f mm)"
+                             % (spacings.min(), spacings.max()))
+
+        # Angle between the line through the slice positions and the
+        # slice normal
+        offsets = np.diff(self.positions, axis=0)
+        along = np.einsum("ij,ij->i", offsets, self.normals[:-1])
+        across = np.linalg.norm(
+            offsets - along[:, np.newaxis] * self.normals[:-1], axis=1)
+        moved = np.abs(along) >= SPACING_TOLERANCE
+        if np.any(moved):
+            tilt = np.degrees(np.arctan2(across[moved],
+                                         np.abs(along[moved]))).max()
+            if tilt > TILT_TOLERANCE:
+                anomalies.append("Gantry tilt of %.2f degrees" % tilt)
+
+        return anomalies
+
+
+def has_slice_geometry(datasets):
+    """
+    :param datasets: List of image slice datasets.
+    :return: True if every slice has an orientation and position, so its
+        SliceGeometry can be read.
+    """
+    return all("ImageOrientationPatient" in dataset
+               and "ImagePositionPatient" in dataset
+               for dataset in datasets)
+
+
+def get_slice_geometry(datasets):
+    """
+    :param datasets: List of image slice datasets.
+    :return: SliceGeometry of the slices, in the order given.
+    """
+    orientations = np.array(
+        [dataset.ImageOrientationPatient for dataset in datasets],
+        dtype=float).reshape((-1, 6))
+    positions = np.array(
+        [dataset.ImagePositionPatient for dataset in datasets],
+        dtype=float).reshape((-1, 3))
+    pixel_spacings = np.array(
+        [dataset.get("PixelSpacing", (1.0, 1.0)) for dataset in datasets],
+        dtype=float).reshape((-1, 2))
+    rows = np.array([dataset.get("Rows", 0) for dataset in datasets],
+                    dtype=int)
+    columns = np.array([dataset.get("Columns", 0) for dataset in datasets],
+                       dtype=int)
+    uids = [dataset.get("SOPInstanceUID") for dataset in datasets]
+    return SliceGeometry(orientations, positions, pixel_spacings, rows,
+                         columns, uids)
@@ -0,0 +1,138 @@
+"""
+Rendering of the slices a view is about to show.
+
+A SlicePrefetcher follows the slider of a view. From the direction and
+speed the slider moves in, it predicts the next slices to be shown and
+has their pixmaps rendered in the background by the RenderPipeline,
+along with anything else a slice needs before it is drawn, e.g. its
+isodose contours. The faster the slider moves, the further ahead it
+renders, up to the "prefetch_slices" performance option, and never more
+than half of the pixmap cache, so the prefetched pixmaps do not evict
+one another. The slices prefetched for a position are cancelled as soon
+as the slider moves again.
+
+Example usage:
+prefetcher = SlicePrefetcher()
+prefetcher.slice_changed(renderer, slider_id)
+"""
+import math
+import threading
+import time
+
+from src.Model.PerformanceOptions import get_performance_option
+from src.Model.RenderPipeline import get_render_pipeline
+
+# Seconds of scrolling, at the current speed, rendered ahead
+PREFETCH_SECONDS = 0.5
+
+
+class SlicePrefetcher:
+    """
+    Predicts the next slices of a view from the movement of its slider
+    and renders them in the background.
+    """
+
+    def __init__(self, pipeline=None, max_slices=None):
+        """
+        :param pipeline: The RenderPipeline rendering the pixmaps. The
+            shared pipeline if None.
+        :param max_slices: Most slices rendered ahead. Read from the
+            "prefetch_slices" performance option if None, and 0 turns
+            prefetching off.
+        """
+        if max_slices is None:
+            max_slices = get_performance_option("prefetch_slices")
+        self.pipeline = pipeline
+        self.max_slices = max_slices
+        self.index = None
+        self.time = None
+        # 1 or -1 once the slider has moved, and slices per second
+        self.direction = 0
+        self.speed = 0.0
+        self.interrupt_flag = threading.Event()
+
+    def slice_changed(self, renderer, index, prefetch_overlays=None,
+                      now=None):
+        """
+        Updates the direction and speed of the slider, and prefetches
+        the slices ahead of the slice now shown.
+        :param renderer: The PixmapRenderer of the view.
+        :param index: Index of the slice shown.
+        :param prefetch_overlays: Function taking the index of a slice,
+            called for each slice prefetched, that returns a function
+            without arguments preparing the overlays of the slice in a
+            worker thread, or None if there is nothing to prepare.
+        :param now: Time of the change in seconds, time.monotonic() if
+            None.
+        :return: List of the indices of the slices prefetched.
+        """
+        if now is None:
+            now = time.monotonic()
+        self.track(index, now)
+        self.cancel()
+        if self.max_slices <= 0:
+            return []
+
+        indices = self.get_indices(index, len(renderer))
+        indices = indices[:get_cache_limit(renderer)]
+        pipeline = self.pipeline or get_render_pipeline()
+        pipeline.submit_renderer(
+            renderer, [i for i in indices if (renderer, i) not in
+                       renderer.cache], self.interrupt_flag)
+        if prefetch_overlays is not None:
+            for i in indices:
+                task = prefetch_overlays(i)
+                if task is not None:
+                    pipeline.submit_task(task,
+                                         interrupt_flag=self.interrupt_flag)
+        return indices
+
+    def track(self, index, now):
+        """
+        Updates the direction and the speed of the slider.
+        """
+        if self.index is not None and index != self.index:
+            direction = 1 if index > self.index else -1
+            elapsed = max(now - self.time, 1e-3)
+            speed = abs(index - self.index) / elapsed
+            if direction == self.direction:
+                # Smoothed, as the slider moves in irregular steps
+                self.speed = (self.speed + speed) / 2
+            else:
+                self.speed = speed
+            self.direction = direction
+        self.index = index
+        self.time = now
+
+    def get_indices(self, index, length):
+        """
+        :param index: Index of the slice shown.
+        :param length: Number of slices.
+        :return: The indices of the slices to prefetch, nearest first.
+            Both neighbours until the slider has moved.
+        """
+        if self.direction == 0:
+            candidates = [index + 1, index - 1]
+        else:
+            count = min(self.max_slices,
+                        max(2, math.ceil(self.speed * PREFETCH_SECONDS)))
+            candidates = [index + self.direction * step
+                          for step in range(1, count + 1)]
+        return [i for i in candidates if 0 <= i < length]
+
+    def cancel(self):
+        """
+        Cancels the slices being prefetched.
+        """
+        self.interrupt_flag.set()
+        self.interrupt_flag = threading.Event()
+
+
+def get_cache_limit(renderer):
+    """
+    :param renderer: A PixmapRenderer.
+    :return: Number of its pixmaps that fit in half of its cache.
+    """
+    width, height = renderer.get_size()
+    return int(renderer.cache.budget_bytes // 2
+               // max(1, width * height * 4))
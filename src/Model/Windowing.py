@@ -2,7 +2,7 @@ from src.Model.PatientDictContainer import PatientDictContainer
 from src.Model.PTCTDictContainer import PTCTDictContainer
 from src.Model.MovingDictContainer import MovingDictContainer
 from src.Model.CalculateImages import get_pixmaps
-from src.Model.ImageFusion import get_fused_window
+from src.Model.PixmapRenderer import PixmapRenderer, VIEWS
 
 
 def windowing_model(text, init):
@@ -12,8 +12,6 @@ def windowing_model(text, init):
     :param init: list of bool to determine which views are chosen
     """
     patient_dict_container = PatientDictContainer()
-    moving_dict_container = MovingDictContainer()
-    pt_ct_dict_container = PTCTDictContainer()
 
     # Get the values for window and level from the dict
     windowing_limits = patient_dict_container.get("dict_windowing")[text]
@@ -22,53 +20,85 @@ def windowing_model(text, init):
     window = windowing_limits[0]
     level = windowing_limits[1]
 
-    # Update the dictionary of pixmaps with the update window and
-    # level values
-    if init[0]:
-        pixel_values = patient_dict_container.get("pixel_values")
-        pixmap_aspect = patient_dict_container.get("pixmap_aspect")
-        pixmaps_axial, pixmaps_coronal, pixmaps_sagittal = \
-            get_pixmaps(pixel_values, window, level, pixmap_aspect)
+    set_window_level(window, level, init)
 
-        patient_dict_container.set("pixmaps_axial", pixmaps_axial)
-        patient_dict_container.set("pixmaps_coronal", pixmaps_coronal)
-        patient_dict_container.set("pixmaps_sagittal", pixmaps_sagittal)
+
+def set_window_level(window, level, init):
+    """
+    Apply a window and level to the chosen views. The pixmaps are not
+    rendered here: each view renders the slice it shows when it is next
+    updated, and the other slices are rendered as they are scrolled to.
+    :param window: Window width of windowing function
+    :param level: Level value of windowing function
+    :param init: list of bool to determine which views are chosen
+    """
+    patient_dict_container = PatientDictContainer()
+    moving_dict_container = MovingDictContainer()
+    pt_ct_dict_container = PTCTDictContainer()
+
+    if init[0]:
+        update_pixmaps(patient_dict_container, "pixmaps_",
+                       patient_dict_container.get("pixel_values"), window,
+                       level, patient_dict_container.get("pixmap_aspect"))
         patient_dict_container.set("window", window)
         patient_dict_container.set("level", level)
 
     # Update CT
     if init[2]:
-        ct_pixel_values = pt_ct_dict_container.get("ct_pixel_values")
-        ct_pixmap_aspect = pt_ct_dict_container.get("ct_pixmap_aspect")
-        ct_pixmaps_axial, ct_pixmaps_coronal, ct_pixmaps_sagittal = \
-            get_pixmaps(ct_pixel_values, window, level, ct_pixmap_aspect,
-                        fusion=True)
-
-        pt_ct_dict_container.set("ct_pixmaps_axial", ct_pixmaps_axial)
-        pt_ct_dict_container.set("ct_pixmaps_coronal", ct_pixmaps_coronal)
-        pt_ct_dict_container.set("ct_pixmaps_sagittal", ct_pixmaps_sagittal)
+        update_pixmaps(pt_ct_dict_container, "ct_pixmaps_",
+                       pt_ct_dict_container.get("ct_pixel_values"), window,
+                       level, pt_ct_dict_container.get("ct_pixmap_aspect"),
+                       fusion=True)
         pt_ct_dict_container.set("ct_window", window)
         pt_ct_dict_container.set("ct_level", level)
 
     # Update PT
     if init[1]:
-        pt_pixel_values = pt_ct_dict_container.get("pt_pixel_values")
-        pt_pixmap_aspect = pt_ct_dict_container.get("pt_pixmap_aspect")
-        pt_pixmaps_axial, pt_pixmaps_coronal, pt_pixmaps_sagittal = \
-            get_pixmaps(pt_pixel_values, window, level, pt_pixmap_aspect,
-                        fusion=True, color="Heat")
-
-        pt_ct_dict_container.set("pt_pixmaps_axial", pt_pixmaps_axial)
-        pt_ct_dict_container.set("pt_pixmaps_coronal", pt_pixmaps_coronal)
-        pt_ct_dict_container.set("pt_pixmaps_sagittal", pt_pixmaps_sagittal)
+        update_pixmaps(pt_ct_dict_container, "pt_pixmaps_",
+                       pt_ct_dict_container.get("pt_pixel_values"), window,
+                       level, pt_ct_dict_container.get("pt_pixmap_aspect"),
+                       fusion=True, color="Heat")
         pt_ct_dict_container.set("pt_window", window)
         pt_ct_dict_container.set("pt_level", level)
 
-    # Update Fusion
+    # Update Fusion. ImageFusion is imported here, as the registration
+    # libraries it needs are only loaded once an image fusion is opened.
     if init[3]:
+        from src.Model.ImageFusion import get_fused_window
         fusion_axial, fusion_coronal, fusion_sagittal, tfm = \
             get_fused_window(level, window)
         patient_dict_container.set("color_axial", fusion_axial)
         patient_dict_container.set("color_coronal", fusion_coronal)
         patient_dict_container.set("color_sagittal", fusion_sagittal)
         moving_dict_container.set("tfm", tfm)
+
+
+def update_pixmaps(dict_container, prefix, pixel_values, window, level,
+                   pixmap_aspect, fusion=False, color=None):
+    """
+    Apply a window and level to the pixmaps of the 3 views stored in a
+    container. The PixmapRenderers already in the container are kept, and
+    only drop their rendered pixmaps; new renderers are created if the
+    container holds dictionaries of pixmaps instead, e.g. while a patient
+    is opened progressively.
+    :param dict_container: The container of the pixmaps.
+    :param prefix: Prefix of the names of the pixmaps in the container,
+        e.g. "pixmaps_" for "pixmaps_axial".
+    :param pixel_values: The pixel values the pixmaps are rendered from.
+    :param window: Window width of windowing function
+    :param level: Level value of windowing function
+    :param pixmap_aspect: Scaling ratio for axial, coronal, and sagittal
+        pixmaps
+    :param fusion: Boolean to determine if pixmaps will be fused
+    :param color: String for conversion of pixels to specified color map
+    """
+    renderers = [dict_container.get(prefix + view) for view in VIEWS]
+    if all(isinstance(renderer, PixmapRenderer) for renderer in renderers):
+        for renderer in renderers:
+            renderer.set_window(window, level)
+        return
+
+    renderers = get_pixmaps(pixel_values, window, level, pixmap_aspect,
+                            fusion=fusion, color=color)
+    for view, renderer in zip(VIEWS, renderers):
+        dict_container.set(prefix + view, renderer)
@@ -4,7 +4,7 @@ from pydicom import dcmread
 from pydicom.errors import InvalidDicomError
 from src.Model import ImageLoading
 from src.Model import ROI
-from src.Model.GetPatientInfo import DicomTree
+from src.Model.DatasetRegistry import DatasetRegistry
 from src.Model.PatientDictContainer import PatientDictContainer
 
 
@@ -88,7 +88,8 @@ class BatchProcess:
             # Convert paths to a common file system representation
             for i, file in enumerate(files):
                 files[i] = Path(file).as_posix()
-            read_data_dict, file_names_dict = cls.get_datasets(files)
+            read_data_dict, file_names_dict, slice_geometry = \
+                cls.get_datasets(files, return_geometry=True)
             path = os.path.dirname(
                 os.path.commonprefix(list(file_names_dict.values())))
         # Otherwise raise an exception (OnkoDICOM does not support the
@@ -96,20 +97,25 @@ class BatchProcess:
         except ImageLoading.NotAllowedClassError:
             raise ImageLoading.NotAllowedClassError
 
-        # Populate the initial values in the PatientDictContainer
+        # Populate the initial values in the PatientDictContainer. The
+        # datasets of the previous patient are cleared from the
+        # DatasetRegistry along with it.
         patient_dict_container = PatientDictContainer()
         patient_dict_container.clear()
-        patient_dict_container.set_initial_values(path, read_data_dict,
-                                                  file_names_dict)
+        ImageLoading.register_datasets(read_data_dict, file_names_dict)
+        patient_dict_container.set_initial_values(
+            path, read_data_dict, file_names_dict,
+            slice_geometry=slice_geometry)
 
         # If an RT Struct is included, set relevant values in the
         # PatientDictContainer
         if 'rtss' in file_names_dict:
-            dataset_rtss = dcmread(file_names_dict['rtss'])
+            dataset_rtss = DatasetRegistry().get(file_names_dict['rtss'])
             rois = ImageLoading.get_roi_info(dataset_rtss)
             dict_raw_contour_data, dict_numpoints = \
                 ImageLoading.get_raw_contour_data(dataset_rtss)
-            dict_pixluts = ImageLoading.get_pixluts(read_data_dict)
+            dict_pixluts = ImageLoading.get_pixluts(read_data_dict,
+                                                    slice_geometry)
 
             # Add RT Struct values to PatientDictContainer
             patient_dict_container.set("rois", rois)
@@ -120,10 +126,12 @@ class BatchProcess:
         return True
 
     @classmethod
-    def get_datasets(cls, file_path_list):
+    def get_datasets(cls, file_path_list, return_geometry=False):
         """
         Gets datasets in the passed-in file path.
         :param file_path_list: list of file paths to load datasets from.
+        :param return_geometry: If True, the SliceGeometry of the sorted
+            image slices is returned as well.
         """
         read_data_dict = {}
         file_names_dict = {}
@@ -250,9 +258,8 @@ class BatchProcess:
                 break
 
         # Get and return read data dict and file names dict
-        sorted_read_data_dict, sorted_file_names_dict = \
-            ImageLoading.image_stack_sort(read_data_dict, file_names_dict)
-        return sorted_read_data_dict, sorted_file_names_dict
+        return ImageLoading.image_stack_sort(read_data_dict, file_names_dict,
+                                             return_geometry)
 
     @classmethod
     def create_new_rtstruct(cls, progress_callback):
@@ -288,12 +295,9 @@ class BatchProcess:
         patient_dict_container.set("file_rtss", filepaths['rtss'])
         patient_dict_container.set("dataset_rtss", dataset['rtss'])
 
-        dicom_tree_rtss = DicomTree(filepaths['rtss'])
-        patient_dict_container.set("dict_dicom_tree_rtss",
-                                   dicom_tree_rtss.dict)
-
         dict_pixluts = ImageLoading.get_pixluts(
-            patient_dict_container.dataset)
+            patient_dict_container.dataset,
+            patient_dict_container.get("slice_geometry"))
         patient_dict_container.set("pixluts", dict_pixluts)
 
         rois = ImageLoading.get_roi_info(ds)
@@ -1,6 +1,6 @@
 from PySide6 import QtWidgets, QtCore
 
-from src.View.mainpage.DicomView import DicomView, GraphicsScene
+from src.View.mainpage.DicomView import DicomView
 
 
 class ImageFusionAxialView(DicomView):
@@ -168,17 +168,11 @@ class ImageFusionAxialView(DicomView):
                 stylesheet = "QLabel { color : white; }"
             self.format_metadata_labels(stylesheet)
 
-    def image_display(self):
+    def get_pixmaps(self):
         """
-        Update the image to be displayed on the DICOM View.
+        :return: The fused pixmaps of the slices shown in the view.
         """
-        pixmaps = self.patient_dict_container.get("color_"+self.slice_view)
-        slider_id = self.slider.value()
-        image = pixmaps[slider_id]
-
-        label = QtWidgets.QGraphicsPixmapItem(image)
-        self.scene = GraphicsScene(
-            label, self.horizontal_view, self.vertical_view)
+        return self.patient_dict_container.get("color_" + self.slice_view)
 
     def update_view(self, zoom_change=False):
         """
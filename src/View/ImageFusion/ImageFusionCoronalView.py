@@ -1,5 +1,4 @@
-from PySide6 import QtWidgets, QtGui
-from src.View.mainpage.DicomView import DicomView, GraphicsScene
+from src.View.mainpage.DicomView import DicomView
 
 
 class ImageFusionCoronalView(DicomView):
@@ -13,17 +12,11 @@ class ImageFusionCoronalView(DicomView):
                                                      cut_line_color)
         self.update_view()
 
-    def image_display(self):
+    def get_pixmaps(self):
         """
-        Update the image to be displayed on the DICOM View.
+        :return: The fused pixmaps of the slices shown in the view.
         """
-        pixmaps = self.patient_dict_container.get("color_"+self.slice_view)
-        slider_id = self.slider.value()
-        image = pixmaps[slider_id]
-
-        label = QtWidgets.QGraphicsPixmapItem(image)
-        self.scene = GraphicsScene(
-            label, self.horizontal_view, self.vertical_view)
+        return self.patient_dict_container.get("color_" + self.slice_view)
 
     def roi_display(self):
         """
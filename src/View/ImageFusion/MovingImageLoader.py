@@ -3,13 +3,11 @@ import platform
 from pathlib import Path
 
 from PySide6 import QtCore
-from pydicom import dcmread
-
 from src.Model import ImageLoading
+from src.Model.DatasetRegistry import DatasetRegistry
 from src.Model.MovingDictContainer import MovingDictContainer
 from src.Model.MovingModel import create_moving_model
 from src.Model.ROI import create_initial_rtss_from_ct
-from src.Model.GetPatientInfo import DicomTree
 
 from src.View.ImageLoader import ImageLoader
 
@@ -49,6 +47,8 @@ class MovingImageLoader(ImageLoader):
         # Populate the initial values in the PatientDictContainer singleton.
         moving_dict_container = MovingDictContainer()
         moving_dict_container.clear()
+        # Do not hand datasets registered for another patient to this one
+        DatasetRegistry().clear()
         moving_dict_container.set_initial_values(
             path,
             read_data_dict,
@@ -69,7 +69,7 @@ class MovingImageLoader(ImageLoader):
                 pass
 
         if 'rtss' in file_names_dict:
-            dataset_rtss = dcmread(file_names_dict['rtss'])
+            dataset_rtss = DatasetRegistry().get(file_names_dict['rtss'])
 
             progress_callback.emit(("Getting ROI info...", 10))
             rois = ImageLoading.get_roi_info(dataset_rtss)
@@ -104,7 +104,8 @@ class MovingImageLoader(ImageLoader):
             moving_dict_container.set("pixluts", dict_pixluts)
 
             if 'rtdose' in file_names_dict and self.calc_dvh:
-                dataset_rtdose = dcmread(file_names_dict['rtdose'])
+                dataset_rtdose = \
+                    DatasetRegistry().get(file_names_dict['rtdose'])
 
                 # Spawn-based platforms (i.e Windows and MacOS) have a large
                 # overhead when creating a new process, which ends up making
@@ -192,6 +193,4 @@ class MovingImageLoader(ImageLoader):
         # Set some moving dict container attributes
         moving_dict_container.set("file_rtss", rtss_path)
         moving_dict_container.set("dataset_rtss", rtss)
-        ordered_dict = DicomTree(None).dataset_to_dict(rtss)
-        moving_dict_container.set("dict_dicom_tree_rtss", ordered_dict)
         moving_dict_container.set("selected_rois", [])
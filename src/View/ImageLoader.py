@@ -1,15 +1,16 @@
 import os
 import platform
+import time
 from pathlib import Path
 
 from PySide6 import QtCore
-from pydicom import dcmread
-
 from src.Model import ImageLoading
 from src.Model.CalculateDVHs import dvh2rtdose, rtdose2dvh
+from src.Model.DatasetRegistry import DatasetRegistry
 from src.Model.PatientDictContainer import PatientDictContainer
+from src.Model.PerformanceOptions import get_performance_option
+from src.Model.ProgressiveLoading import ProgressiveImageLoader
 from src.Model.ROI import create_initial_rtss_from_ct
-from src.Model.GetPatientInfo import DicomTree
 
 
 class ImageLoader(QtCore.QObject):
@@ -38,24 +39,45 @@ class ImageLoader(QtCore.QObject):
         PatientDictContainer object containing all values related to the
         loaded DICOM files.
         """
+        start_time = time.perf_counter()
         progress_callback.emit(("Creating datasets...", 0))
+
+        # When opening progressively, the pixel data is only read here
+        # for the first slices shown
+        progressive = get_performance_option("progressive_open") \
+            and not get_performance_option("lazy_pixel_data")
         try:
             # Gets the common root folder.
             path = os.path.dirname(os.path.commonprefix(self.selected_files))
-            read_data_dict, file_names_dict = ImageLoading.get_datasets(
-                self.selected_files)
+            read_data_dict, file_names_dict, slice_geometry = \
+                ImageLoading.get_datasets(self.selected_files,
+                                          read_pixel_data=not progressive,
+                                          return_geometry=True)
         except ImageLoading.NotAllowedClassError:
             raise ImageLoading.NotAllowedClassError
 
         # Populate the initial values in the PatientDictContainer singleton.
+        # The datasets of the previously opened patient are cleared from
+        # the DatasetRegistry along with it.
         patient_dict_container = PatientDictContainer()
         patient_dict_container.clear()
+        ImageLoading.register_datasets(read_data_dict, file_names_dict)
         patient_dict_container.set_initial_values(
             path,
             read_data_dict,
             file_names_dict,
-            existing_rtss_files=self.existing_rtss
+            existing_rtss_files=self.existing_rtss,
+            slice_geometry=slice_geometry
         )
+        patient_dict_container.set("open_start_time", start_time)
+
+        if progressive and 0 in read_data_dict:
+            progress_callback.emit(("Loading central slices...", 5))
+            loader = ProgressiveImageLoader(
+                read_data_dict, read_data_dict[0].Modality == "CT",
+                slice_geometry=slice_geometry)
+            loader.load_first_slices()
+            patient_dict_container.set("progressive_loader", loader)
 
         # As there is no way to interrupt a QRunnable, this method must
         # check after every step whether or not the interrupt flag has been
@@ -71,7 +93,7 @@ class ImageLoader(QtCore.QObject):
             return False
 
         if 'rtss' in file_names_dict:
-            dataset_rtss = dcmread(file_names_dict['rtss'])
+            dataset_rtss = DatasetRegistry().get(file_names_dict['rtss'])
 
             progress_callback.emit(("Getting ROI info...", 10))
             rois = ImageLoading.get_roi_info(dataset_rtss)
@@ -91,7 +113,8 @@ class ImageLoader(QtCore.QObject):
                 return False
 
             progress_callback.emit(("Getting pixel LUTs...", 50))
-            dict_pixluts = ImageLoading.get_pixluts(read_data_dict)
+            dict_pixluts = ImageLoading.get_pixluts(read_data_dict,
+                                                    slice_geometry)
 
             if interrupt_flag.is_set():  # Stop loading.
                 return False
@@ -122,7 +145,8 @@ class ImageLoader(QtCore.QObject):
 
                 # Calculate DVHs
                 if self.calc_dvh:
-                    dataset_rtdose = dcmread(file_names_dict['rtdose'])
+                    dataset_rtdose = \
+                        DatasetRegistry().get(file_names_dict['rtdose'])
 
                     # Spawn-based platforms (i.e Windows and MacOS) have
                     # a large overhead when creating a new process, which
@@ -198,7 +222,9 @@ class ImageLoader(QtCore.QObject):
         patient_dict_container.set("rois", rois)
 
         # Set pixluts
-        dict_pixluts = ImageLoading.get_pixluts(patient_dict_container.dataset)
+        dict_pixluts = ImageLoading.get_pixluts(
+            patient_dict_container.dataset,
+            patient_dict_container.get("slice_geometry"))
         patient_dict_container.set("pixluts", dict_pixluts)
 
         # Add RT Struct file path and dataset to patient dict container
@@ -208,8 +234,6 @@ class ImageLoader(QtCore.QObject):
         # Set some patient dict container attributes
         patient_dict_container.set("file_rtss", rtss_path)
         patient_dict_container.set("dataset_rtss", rtss)
-        ordered_dict = DicomTree(None).dataset_to_dict(rtss)
-        patient_dict_container.set("dict_dicom_tree_rtss", ordered_dict)
         patient_dict_container.set("selected_rois", [])
 
     def update_calc_dvh(self, advice):
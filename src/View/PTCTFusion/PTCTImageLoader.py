@@ -3,6 +3,7 @@ import os
 from PySide6 import QtCore
 
 from src.Model import ImageLoading
+from src.Model.DatasetRegistry import DatasetRegistry
 from src.Model.PTCTDictContainer import PTCTDictContainer
 from src.Model.PTCTModel import create_pt_ct_model
 
@@ -39,6 +40,8 @@ class PTCTImageLoader(ImageLoader):
         progress_callback.emit(("Initialise Dictionary...", 5))
         pt_ct_dict_container = PTCTDictContainer()
         pt_ct_dict_container.clear()
+        # Do not hand datasets registered for another patient to this one
+        DatasetRegistry().clear()
         pt_ct_dict_container.set_initial_values(
             path, existing_rtss_files=self.existing_rtss
         )
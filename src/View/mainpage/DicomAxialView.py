@@ -1,16 +1,24 @@
+import functools
+
 from PySide6 import QtWidgets, QtCore, QtGui
 from skimage import measure
 
 from src.View.mainpage.DicomView import DicomView
+from src.Model.DisplayStyle import get_display_style
 from src.Model.Isodose import get_dose_grid
 from src.Model.PatientDictContainer import PatientDictContainer
-from src.Controller.PathHandler import data_path, resource_path
+from src.Controller.PathHandler import resource_path
 
 
 class DicomAxialView(DicomView):
 
     suv2roi_signal = QtCore.Signal()
 
+    # ((IsodoseCache, revision), slice index, polygons of each dose),
+    # emitted by a worker thread once the isodoses of a slice are
+    # prefetched
+    isodoses_prefetched = QtCore.Signal(object, object, object)
+
     def __init__(self, roi_color=None, iso_color=None,
                  metadata_formatted=False, cut_line_color=None,
                  is_four_view=False):
@@ -30,6 +38,7 @@ class DicomAxialView(DicomView):
         super(DicomAxialView, self).__init__(
             roi_color=roi_color, iso_color=iso_color,
             cut_line_color=cut_line_color)
+        self.isodoses_prefetched.connect(self.store_isodose_polygons)
 
         # Set parent
         self.is_four_view = is_four_view
@@ -289,43 +298,130 @@ class DicomAxialView(DicomView):
         """
         Display isodoses on the DICOM Image.
         """
-        slider_id = self.slider.value()
-        curr_slice_uid = self.patient_dict_container.get("dict_uid")[slider_id]
-        z = self.patient_dict_container.dataset[slider_id].ImagePositionPatient[2]
-        dataset_rtdose = self.patient_dict_container.dataset['rtdose']
-        grid = get_dose_grid(dataset_rtdose, float(z))
-
-        if not (grid == []):
-            # sort selected_doses in ascending order so that the high dose isodose washes
-            # paint over the lower dose isodose washes
-            for sd in sorted(self.patient_dict_container.get("selected_doses")):
-                dose_level = sd * self.patient_dict_container.get("rx_dose_in_cgray") / \
-                    (dataset_rtdose.DoseGridScaling * 10000)
-                contours = measure.find_contours(grid, dose_level)
-
-                polygons = self.calc_dose_polygon(
-                    self.patient_dict_container.get("dose_pixluts")[curr_slice_uid], contours)
-
-                brush_color = self.iso_color[sd]
-                with open(data_path('line&fill_configuration'), 'r') as stream:
-                    elements = stream.readlines()
-                    if len(elements) > 0:
-                        iso_line = int(elements[2].replace('\n', ''))
-                        iso_opacity = int(elements[3].replace('\n', ''))
-                        line_width = float(elements[4].replace('\n', ''))
-                    else:
-                        iso_line = 2
-                        iso_opacity = 5
-                        line_width = 2.0
-                    stream.close()
-                iso_opacity = int((iso_opacity / 100) * 255)
-                brush_color.setAlpha(iso_opacity)
-                pen_color = QtGui.QColor(
-                    brush_color.red(), brush_color.green(), brush_color.blue())
-                pen = self.get_qpen(pen_color, iso_line, line_width)
-                for i in range(len(polygons)):
-                    self.scene.addPolygon(
-                        polygons[i], pen, QtGui.QBrush(brush_color))
+        for sd, polygons in self.get_isodose_polygons(self.slider.value()):
+            pen, brush = get_display_style().get_isodose_pen_brush(
+                self.iso_color[sd])
+            for i in range(len(polygons)):
+                self.scene.isodose_layer.add_polygon(
+                    polygons[i], pen, brush)
+
+    def prefetch_overlays(self, slider_id):
+        """
+        Calculate the isodoses of a slice ahead of showing it.
+        :param slider_id: Index of the slice.
+        :return: Function calculating the isodoses not in the cache yet
+            in a worker thread, or None.
+        """
+        if not self.iso_color or \
+                not self.patient_dict_container.get("selected_doses"):
+            return None
+        isodose_cache = self.use_isodose_cache()
+        polygons = isodose_cache.get_slice(slider_id) or {}
+        doses = [sd for sd in self.patient_dict_container.get(
+            "selected_doses") if sd not in polygons]
+        if not doses:
+            return None
+        return functools.partial(
+            self.prefetch_isodose_polygons,
+            (isodose_cache, isodose_cache.rtss_revision), slider_id,
+            self.get_isodose_inputs(slider_id), doses)
+
+    def prefetch_isodose_polygons(self, revision, slider_id, inputs,
+                                  doses):
+        """
+        Calculate the isodoses of a slice and hand them to the GUI
+        thread. Runs in a worker thread, so only uses its arguments.
+        :param revision: Tuple of the IsodoseCache and its revision the
+            isodoses are calculated for.
+        :param slider_id: Index of the slice.
+        :param inputs: Tuple returned by get_isodose_inputs.
+        :param doses: List of the doses to calculate.
+        """
+        polygons = self.calculate_isodose_polygons(inputs, doses)
+        self.isodoses_prefetched.emit(revision, slider_id, polygons)
+
+    def store_isodose_polygons(self, revision, slider_id, polygons):
+        """
+        Store prefetched isodoses in the cache, unless the dose or the
+        patient has changed since they were calculated. Runs in the GUI
+        thread.
+        """
+        isodose_cache, rtss_revision = revision
+        if isodose_cache is not self.patient_dict_container.isodose_cache \
+                or rtss_revision != isodose_cache.rtss_revision:
+            return
+        stored = dict(isodose_cache.get_slice(slider_id) or {})
+        stored.update(polygons)
+        isodose_cache.put_slice(slider_id, stored)
+
+    def use_isodose_cache(self):
+        """
+        :return: The IsodoseCache of the patient, for the RT Dose and
+            prescription dose displayed.
+        """
+        isodose_cache = self.patient_dict_container.get_isodose_cache()
+        isodose_cache.use_dose(
+            self.patient_dict_container.dataset['rtdose'],
+            self.patient_dict_container.get("rx_dose_in_cgray"))
+        return isodose_cache
+
+    def get_isodose_inputs(self, slider_id):
+        """
+        :param slider_id: Index of the slice.
+        :return: Tuple of the RT Dose dataset, the prescription dose, the
+            z coordinate of the slice, the dose pixluts and the
+            SOPInstanceUID of the slice, from which its isodoses are
+            calculated.
+        """
+        z = self.patient_dict_container.dataset[slider_id]\
+            .ImagePositionPatient[2]
+        return (self.patient_dict_container.dataset['rtdose'],
+                self.patient_dict_container.get("rx_dose_in_cgray"),
+                float(z), self.patient_dict_container.get("dose_pixluts"),
+                self.patient_dict_container.get("dict_uid")[slider_id])
+
+    def calculate_isodose_polygons(self, inputs, doses):
+        """
+        Calculate the isodoses of a slice.
+        :param inputs: Tuple returned by get_isodose_inputs.
+        :param doses: List of the doses.
+        :return: Dictionary of the list of QPolygonF of each dose.
+        """
+        dataset_rtdose, rx_dose, z, dose_pixluts, curr_slice_uid = inputs
+        grid = get_dose_grid(dataset_rtdose, z)
+        polygons = {}
+        for sd in doses:
+            if len(grid) == 0:
+                polygons[sd] = []
+                continue
+            dose_level = sd * rx_dose / \
+                (dataset_rtdose.DoseGridScaling * 10000)
+            contours = measure.find_contours(grid, dose_level)
+            polygons[sd] = self.calc_dose_polygon(
+                dose_pixluts[curr_slice_uid], contours)
+        return polygons
+
+    def get_isodose_polygons(self, slider_id):
+        """
+        Get the isodoses of the selected doses on a slice. The polygons
+        of each slice and dose are kept in the IsodoseCache of the
+        patient for the dose and prescription shown.
+        :param slider_id: Index of the slice.
+        :return: List of tuples of each selected dose, in ascending order
+            so that the high dose isodose washes paint over the lower
+            dose isodose washes, and the list of its QPolygonF.
+        """
+        isodose_cache = self.use_isodose_cache()
+        selected_doses = sorted(
+            self.patient_dict_container.get("selected_doses"))
+        polygons = isodose_cache.get_slice(slider_id) or {}
+        doses = [sd for sd in selected_doses if sd not in polygons]
+        if doses:
+            polygons = dict(polygons)
+            polygons.update(self.calculate_isodose_polygons(
+                self.get_isodose_inputs(slider_id), doses))
+            isodose_cache.put_slice(slider_id, polygons)
+        return [(sd, polygons[sd]) for sd in selected_doses]
 
     def calc_dose_polygon(self, dose_pixluts, contours):
         """
@@ -4,19 +4,72 @@ from PySide6 import QtWidgets, QtCore, QtGui
 class GraphicsScene(QtWidgets.QGraphicsScene):
     """
     A child class of the QGraphicsScene that contains the pixmaps and the cut lines
+
+    A view keeps one scene. Its items are long-lived layers that are
+    updated in place when the view changes: the image, the ROIs, the
+    isodoses, an overlay, and the cut lines.
     """
 
-    def __init__(self, label: QtWidgets.QGraphicsPixmapItem, horizontal_view, vertical_view):
+    def __init__(self, label: QtWidgets.QGraphicsPixmapItem = None,
+                 horizontal_view=None, vertical_view=None):
         super(GraphicsScene, self).__init__()
+        if label is None:
+            label = QtWidgets.QGraphicsPixmapItem()
+        self.label = label
         self.addItem(label)
+        self.pixmap = None
         self.init_width = self.width()
         self.init_height = self.height()
+        self.roi_layer = SceneLayer(self, 1)
+        self.isodose_layer = SceneLayer(self, 2)
+        # Polygons drawn on top of the view until it is next updated
+        self.overlay_layer = SceneLayer(self, 3)
         self.horizontal_view = horizontal_view
         self.vertical_view = vertical_view
         self.horizontal_line = None
         self.vertical_line = None
         self.init_cut_lines()
 
+    def set_pixmap(self, pixmap, size=None):
+        """
+        Show a pixmap as the image of the scene.
+        :param pixmap: QPixmap of the slice.
+        :param size: QSize the pixmap is stretched to, e.g. for a preview
+            of a lower resolution. The size of the pixmap if None.
+        :return: True if the image changed, False if the pixmap is
+            already shown.
+        """
+        if pixmap is self.pixmap:
+            return False
+        self.pixmap = pixmap
+        self.label.setPixmap(pixmap)
+        if size is None or size == pixmap.size():
+            transform = QtGui.QTransform()
+        else:
+            transform = QtGui.QTransform.fromScale(
+                size.width() / pixmap.width(),
+                size.height() / pixmap.height())
+        if self.label.transform() != transform:
+            self.label.setTransform(transform)
+        # The scene keeps the size of the image, as the polygons and lines
+        # drawn on other slices would otherwise grow it
+        rect = self.label.sceneBoundingRect()
+        if rect != self.sceneRect() or self.init_width != rect.width() \
+                or self.init_height != rect.height():
+            self.setSceneRect(rect)
+            self.init_width = self.width()
+            self.init_height = self.height()
+        return True
+
+    def set_views(self, horizontal_view, vertical_view):
+        """
+        Set the views whose slices the cut lines show.
+        """
+        self.horizontal_view = horizontal_view
+        self.vertical_view = vertical_view
+        self.remove_cut_lines()
+        self.init_cut_lines()
+
     def init_cut_lines(self):
         if self.horizontal_view is not None and self.vertical_view is not None:
             try:
@@ -31,9 +84,9 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
             self.add_cut_lines(vertical_line_x, horizontal_line_y)
 
     def add_cut_lines(self, vertical_line_x, horizontal_line_y):
-        pen = QtGui.QPen(QtCore.Qt.DashLine)
-        pen.setWidthF(2)
-
+        """
+        Move the cut lines, which are created the first time.
+        """
         # Set the boundary for the cut lines
         if vertical_line_x < 0:
             vertical_line_x = 0
@@ -44,21 +97,37 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
         elif horizontal_line_y > self.init_height:
             horizontal_line_y = self.init_height
 
-        pen.setColor(self.horizontal_view.cut_lines_color)
-        self.horizontal_line = QtWidgets.QGraphicsLineItem(
-            0, horizontal_line_y, self.init_width, horizontal_line_y)
-        self.horizontal_line.setPen(pen)
-        self.addItem(self.horizontal_line)
+        if self.horizontal_line is None:
+            pen = QtGui.QPen(QtCore.Qt.DashLine)
+            pen.setWidthF(2)
+
+            pen.setColor(self.horizontal_view.cut_lines_color)
+            self.horizontal_line = QtWidgets.QGraphicsLineItem()
+            self.horizontal_line.setPen(pen)
+            self.horizontal_line.setZValue(4)
+            self.addItem(self.horizontal_line)
+
+            pen.setColor(self.vertical_view.cut_lines_color)
+            self.vertical_line = QtWidgets.QGraphicsLineItem()
+            self.vertical_line.setPen(pen)
+            self.vertical_line.setZValue(4)
+            self.addItem(self.vertical_line)
 
-        pen.setColor(self.vertical_view.cut_lines_color)
-        self.vertical_line = QtWidgets.QGraphicsLineItem(
+        horizontal_line = QtCore.QLineF(
+            0, horizontal_line_y, self.init_width, horizontal_line_y)
+        if self.horizontal_line.line() != horizontal_line:
+            self.horizontal_line.setLine(horizontal_line)
+        vertical_line = QtCore.QLineF(
             vertical_line_x, 0, vertical_line_x, self.init_height)
-        self.vertical_line.setPen(pen)
-        self.addItem(self.vertical_line)
+        if self.vertical_line.line() != vertical_line:
+            self.vertical_line.setLine(vertical_line)
 
     def remove_cut_lines(self):
-        self.removeItem(self.horizontal_line)
-        self.removeItem(self.vertical_line)
+        if self.horizontal_line is not None:
+            self.removeItem(self.horizontal_line)
+            self.removeItem(self.vertical_line)
+            self.horizontal_line = None
+            self.vertical_line = None
 
     def update_slider(self, vertical_line_x, horizontal_line_y):
         self.horizontal_view.set_slider_value(
@@ -67,7 +136,6 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
 
     def mousePressEvent(self, event: QtWidgets.QGraphicsSceneMouseEvent) -> None:
         if self.horizontal_view is not None and self.vertical_view is not None:
-            self.remove_cut_lines()
             current_position = event.scenePos()
             vertical_line_x = current_position.x()
             horizontal_line_y = current_position.y()
@@ -77,10 +145,100 @@ class GraphicsScene(QtWidgets.QGraphicsScene):
 
     def mouseMoveEvent(self, event: QtWidgets.QGraphicsSceneMouseEvent) -> None:
         if self.horizontal_view is not None and self.vertical_view is not None:
-            self.remove_cut_lines()
             current_position = event.scenePos()
             vertical_line_x = current_position.x()
             horizontal_line_y = current_position.y()
 
             self.add_cut_lines(vertical_line_x, horizontal_line_y)
             self.update_slider(vertical_line_x, horizontal_line_y)
+
+
+class SceneLayer:
+    """
+    A layer of polygons of a GraphicsScene, e.g. the ROIs or the
+    isodoses. The polygons of the layer are drawn again between begin()
+    and end() each time the view is updated, and the items of the layer
+    are only replaced if the polygons, their pens or their brushes
+    differ from those drawn the last time.
+    """
+
+    def __init__(self, scene, z_value):
+        """
+        :param scene: The GraphicsScene of the layer.
+        :param z_value: Stacking order of the layer above the image.
+        """
+        self.scene = scene
+        self.z_value = z_value
+        self.items = []
+        # (polygon, pen, brush) of each item
+        self.shapes = []
+        self.drawing = None
+
+    def begin(self):
+        """
+        Start drawing the polygons of the layer.
+        """
+        self.drawing = []
+
+    def add_polygon(self, polygon, pen, brush):
+        """
+        Draw a polygon on the layer.
+        :param polygon: QPolygonF of the polygon.
+        :param pen: QPen of the outline, not changed afterwards.
+        :param brush: QBrush of the fill, not changed afterwards.
+        """
+        shape = (polygon, pen, brush)
+        if self.drawing is not None:
+            self.drawing.append(shape)
+        else:
+            self.add_item(shape)
+            # Replaced by the next polygons drawn between begin and end
+            self.shapes = None
+
+    def end(self):
+        """
+        Finish drawing the polygons of the layer, and update its items
+        if the polygons differ from those drawn the last time.
+        :return: True if the items of the layer were replaced.
+        """
+        shapes = self.drawing
+        self.drawing = None
+        if shapes is None or is_same_shapes(shapes, self.shapes):
+            return False
+        self.clear()
+        for shape in shapes:
+            self.add_item(shape)
+        self.shapes = shapes
+        return True
+
+    def add_item(self, shape):
+        polygon, pen, brush = shape
+        item = self.scene.addPolygon(polygon, pen, brush)
+        item.setZValue(self.z_value)
+        self.items.append(item)
+
+    def clear(self):
+        """
+        Remove the items of the layer from the scene.
+        """
+        for item in self.items:
+            self.scene.removeItem(item)
+        self.items = []
+        self.shapes = []
+
+
+def is_same_shapes(shapes, other_shapes):
+    """
+    :return: True if two lists of (polygon, pen, brush) are equal.
+    """
+    if other_shapes is None or len(shapes) != len(other_shapes):
+        return False
+    for (polygon, pen, brush), (other_polygon, other_pen, other_brush) \
+            in zip(shapes, other_shapes):
+        if pen is not other_pen and pen != other_pen:
+            return False
+        if brush is not other_brush and brush != other_brush:
+            return False
+        if polygon is not other_polygon and polygon != other_polygon:
+            return False
+    return True
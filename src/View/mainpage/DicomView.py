@@ -1,9 +1,13 @@
 from PySide6 import QtWidgets, QtCore, QtGui
 
 from src.View.mainpage.DicomGraphicsScene import GraphicsScene
+from src.Model.DisplayStyle import get_display_style
 from src.Model.PatientDictContainer import PatientDictContainer
+from src.Model.PerformanceOptions import get_performance_option
+from src.Model.PixmapRenderer import PixmapRenderer
+from src.Model.SlicePrefetcher import SlicePrefetcher
+from src.View.mainpage.UpdateScheduler import get_update_scheduler
 from src.constants import INITIAL_ONE_VIEW_ZOOM
-from src.Controller.PathHandler import data_path
 
 
 class DicomView(QtWidgets.QWidget):
@@ -25,7 +29,16 @@ class DicomView(QtWidgets.QWidget):
         self.init_slider()
         self.view = QtWidgets.QGraphicsView()
         self.init_view()
-        self.scene = QtWidgets.QGraphicsScene()
+        self.scene = GraphicsScene()
+        # Previews of the slices are shown while the slider is moving,
+        # and the full resolution once it has stopped for a moment
+        self.scrolling = False
+        self.scroll_timer = QtCore.QTimer(self)
+        self.scroll_timer.setSingleShot(True)
+        self.scroll_timer.setInterval(
+            get_performance_option("preview_delay_ms"))
+        self.scroll_timer.timeout.connect(self.scroll_stopped)
+        self.prefetcher = SlicePrefetcher()
 
         # Set layout
         self.dicom_view_layout.addWidget(self.view)
@@ -55,45 +68,107 @@ class DicomView(QtWidgets.QWidget):
         self.view.setBackgroundBrush(background_brush)
 
     def value_changed(self):
-        self.update_view()
+        self.scrolling = self.scroll_timer.isActive() \
+            or self.slider.isSliderDown()
+        self.scroll_timer.start()
+        # The views are redrawn in the next frame, with the slice current
+        # then
+        scheduler = get_update_scheduler()
+        scheduler.request_update(self)
         if self.horizontal_view is not None and self.vertical_view is not None:
-            self.horizontal_view.update_view()
-            self.vertical_view.update_view()
+            scheduler.request_update(self.horizontal_view)
+            scheduler.request_update(self.vertical_view)
+        self.prefetch()
+
+    def prefetch(self):
+        """
+        Render the slices ahead of the slider in the background.
+        """
+        pixmaps = self.get_pixmaps()
+        if isinstance(pixmaps, PixmapRenderer):
+            self.prefetcher.slice_changed(pixmaps, self.slider.value(),
+                                          self.prefetch_overlays)
+
+    def prefetch_overlays(self, slider_id):
+        """
+        Prepare what is drawn over a slice before it is shown. Called for
+        each slice prefetched. Nothing is prepared by default.
+        :param slider_id: Index of the slice.
+        :return: Function without arguments run in a worker thread, which
+            must hand what it calculates back to the GUI thread, or None.
+        """
+        return None
+
+    def scroll_stopped(self):
+        """
+        Replace the preview shown while scrolling with the full
+        resolution image.
+        """
+        if self.scrolling and not self.slider.isSliderDown():
+            self.scrolling = False
+            self.update_view()
+        elif self.scrolling:
+            # Still dragged without moving
+            self.scroll_timer.start()
 
     def update_view(self, zoom_change=False):
         """
-        Update the view of the DICOM Image.
+        Update the view of the DICOM Image. The items of the scene are
+        updated in place, and the ROI and isodose layers are only
+        rebuilt if their polygons changed.
         :param zoom_change: Boolean indicating whether the user wants to change the zoom. False by default.
         """
+        get_update_scheduler().discard(self)
         self.image_display()
         # Update roi colours if they are not explicitly set to None
         if self.roi_color is not None:
             self.roi_color = self.patient_dict_container.get("roi_color_dict")
 
+        self.scene.overlay_layer.clear()
+
         # If roi colours are set and rois are selected then update the display
+        self.scene.roi_layer.begin()
         if self.roi_color and self.patient_dict_container.get("selected_rois"):
             self.roi_display()
+        self.scene.roi_layer.end()
 
         # If isodose colours are set and doses are selected then update the display
+        self.scene.isodose_layer.begin()
         if self.iso_color and self.patient_dict_container.get("selected_doses"):
             self.isodose_display()
+        self.scene.isodose_layer.end()
+
+        self.scene.init_cut_lines()
 
         if zoom_change:
             self.view.setTransform(
                 QtGui.QTransform().scale(self.zoom, self.zoom))
 
-        self.view.setScene(self.scene)
+        # Other scenes can be shown in the view, e.g. while drawing a ROI
+        if self.view.scene() is not self.scene:
+            self.view.setScene(self.scene)
+
+    def get_pixmaps(self):
+        """
+        :return: The pixmaps of the slices shown in the view.
+        """
+        return self.patient_dict_container.get("pixmaps_" + self.slice_view)
 
     def image_display(self):
         """
-        Update the image to be displayed on the DICOM View.
+        Update the image to be displayed on the DICOM View. Only the
+        pixmap of the current slice is requested, and it is rendered if
+        it is not in the pixmap cache. While scrolling, a preview is
+        shown instead if the pixmap is not in the cache.
         """
-        pixmaps = self.patient_dict_container.get("pixmaps_" + self.slice_view)
+        pixmaps = self.get_pixmaps()
         slider_id = self.slider.value()
-        image = pixmaps[slider_id]
-        label = QtWidgets.QGraphicsPixmapItem(image)
-        self.scene = GraphicsScene(
-            label, self.horizontal_view, self.vertical_view)
+        if self.scrolling and isinstance(pixmaps, PixmapRenderer):
+            width, height = pixmaps.get_size()
+            self.scene.set_pixmap(pixmaps.preview(slider_id),
+                                  QtCore.QSize(width, height))
+        else:
+            self.scene.set_pixmap(pixmaps[slider_id])
 
     def draw_roi_polygons(self, roi_id, polygons, roi_color=None):
         """
@@ -107,39 +182,9 @@ class DicomView(QtWidgets.QWidget):
             color = self.roi_color[roi_id]
         else:
             color = roi_color[roi_id]
-        with open(data_path('line&fill_configuration'), 'r') as stream:
-            elements = stream.readlines()
-            if len(elements) > 0:
-                roi_line = int(elements[0].replace('\n', ''))
-                roi_opacity = int(elements[1].replace('\n', ''))
-                line_width = float(elements[4].replace('\n', ''))
-            else:
-                roi_line = 1
-                roi_opacity = 10
-                line_width = 2.0
-            stream.close()
-        roi_opacity = int((roi_opacity / 100) * 255)
-        color.setAlpha(roi_opacity)
-        pen_color = QtGui.QColor(color.red(), color.green(), color.blue())
-        pen = self.get_qpen(pen_color, roi_line, line_width)
+        pen, brush = get_display_style().get_roi_pen_brush(color)
         for i in range(len(polygons)):
-            self.scene.addPolygon(polygons[i], pen, QtGui.QBrush(color))
-
-    def get_qpen(self, color, style=1, widthF=1.):
-        """
-        The color and style for ROI structure and isodose display.
-        :param color:
-         Color of the region. QColor type.
-        :param style:
-         Style of the contour line. NoPen: 0  SolidLine: 1  DashLine: 2  DotLine: 3  DashDotLine: 4  DashDotDotLine: 5
-        :param widthF:
-         Width of the contour line.
-        :return: QPen object.
-        """
-        pen = QtGui.QPen(color)
-        pen.setStyle(QtCore.Qt.PenStyle(style))
-        pen.setWidthF(widthF)
-        return pen
+            self.scene.roi_layer.add_polygon(polygons[i], pen, brush)
 
     def zoom_in(self):
         self.zoom *= 1.05
@@ -155,6 +200,7 @@ class DicomView(QtWidgets.QWidget):
         """
         self.horizontal_view = horizontal_view
         self.vertical_view = vertical_view
+        self.scene.set_views(horizontal_view, vertical_view)
         self.update_view()
 
     def set_slider_value(self, value):
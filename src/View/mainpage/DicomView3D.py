@@ -3,13 +3,13 @@ import vtk
 from PySide6 import QtWidgets
 from PySide6.QtWidgets import QPushButton
 from vtkmodules.util import numpy_support
-from vtkmodules.util.vtkConstants import VTK_INT
 from vtkmodules.vtkCommonDataModel import vtkImageData, vtkPiecewiseFunction
 from vtkmodules.vtkRenderingCore import vtkColorTransferFunction, \
     vtkRenderer, vtkVolumeProperty, vtkVolume
 from vtkmodules.vtkRenderingVolume import vtkFixedPointVolumeRayCastMapper
 
 from src.Model.PatientDictContainer import PatientDictContainer
+from src.Model.WindowingLUT import lut_indices
 from src.View.util.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
 
 
@@ -55,42 +55,52 @@ class DicomView3D(QtWidgets.QWidget):
 
     def convert_pixel_values_to_vtk_3d_array(self):
         """
-        Scale pixel_values based on W/L and
-        convert it to a vtk 3D array
-        """
-
-        three_dimension_np_array = np.array(self.patient_dict_container.
-                                            additional_data["pixel_values"])
-        three_dimension_np_array = three_dimension_np_array.astype(np.int16)
-        three_dimension_np_array = (three_dimension_np_array -
-                                    (self.patient_dict_container.get("level"))) / \
-            self.patient_dict_container.get("window") * 255
-        three_dimension_np_array[three_dimension_np_array < 0] = 0
-        three_dimension_np_array[three_dimension_np_array > 255] = 255
-        three_dimension_np_array = three_dimension_np_array.astype(np.int8)
-        self.depth_array = numpy_support.numpy_to_vtk(three_dimension_np_array.
-                                                      ravel(order="F"),
-                                                      deep=True,
-                                                      array_type=VTK_INT)
-        self.shape = three_dimension_np_array.shape
+        Convert pixel_values to a vtk 3D array. The raw pixel values are
+        converted once; window and level are applied by the transfer
+        functions of the volume property.
+        """
+
+        # The pixel values as the 16-bit integers the 2D views window.
+        # VTK reads the slices x rows x columns array in Fortran order,
+        # so it is shared with VTK without a copy if it is already in
+        # that order, and copied once otherwise.
+        volume = lut_indices(
+            self.patient_dict_container.get("pixel_values")).view(np.int16)
+        self.voxels = np.asfortranarray(volume)
+        self.depth_array = numpy_support.numpy_to_vtk(
+            self.voxels.ravel(order="F"), deep=False)
+        self.shape = self.voxels.shape
 
     def update_volume_by_window_level(self):
         """
-        Update volume input data when window level is changed
+        Update the transfer functions of the volume to the window and
+        level in patient_dict_container. The volume data is unchanged.
+
+        The volume is shown as it was when the windowed values were
+        stored as signed bytes: the opacity and brightness rise from
+        the bottom of the window to just above its centre, where the
+        windowed values wrapped around, and fall almost to zero at its
+        top.
         """
+        window = max(self.patient_dict_container.get("window"), 1)
+        level = self.patient_dict_container.get("level")
+        centre = level + window * 128 / 255
+        top = level + window
 
-        # Convert pixel_values in patient_dict_container into a 3D numpy array
-        self.convert_pixel_values_to_vtk_3d_array()
+        self.volume_color.RemoveAllPoints()
+        self.volume_color.AddRGBPoint(level, 0, 0, 0)
+        self.volume_color.AddRGBPoint(centre, 1.0, 1.0, 1.0)
+        self.volume_color.AddRGBPoint(top, 1 / 127, 1 / 127, 1 / 127)
 
-        # Convert 3d pixel array into vtkImageData to display as vtkVolume
-        self.imdata.GetPointData().SetScalars(self.depth_array)
-        self.volume_mapper.SetInputData(self.imdata)
-        self.volume.SetMapper(self.volume_mapper)
+        self.volume_scalar_opacity.RemoveAllPoints()
+        self.volume_scalar_opacity.AddPoint(level, 0)
+        self.volume_scalar_opacity.AddPoint(centre, 1)
+        self.volume_scalar_opacity.AddPoint(top, 1 / 127)
 
-        # Add the volume to the renderer
-        self.renderer.ResetCamera()
-        self.renderer.RemoveVolume(self.volume)
-        self.renderer.AddVolume(self.volume)
+        # Gradients of 128 windowed values or more are opaque
+        self.volume_gradient_opacity.RemoveAllPoints()
+        self.volume_gradient_opacity.AddPoint(0, 0)
+        self.volume_gradient_opacity.AddPoint(window * 128 / 255, 1)
 
     def populate_volume_data(self):
         """
@@ -142,17 +152,10 @@ class DicomView3D(QtWidgets.QWidget):
         """
 
         # The colorTransferFunction maps voxel intensities to colors.
-
         self.volume_color = vtkColorTransferFunction()
-        self.volume_color.AddRGBPoint(-127, 1.0, 1.0, 1.0)
-        self.volume_color.AddRGBPoint(0, 0, 0, 0)
-        self.volume_color.AddRGBPoint(128, 1.0, 1.0, 1.0)
         # The opacityTransferFunction is used to control the opacity
         # of different tissue types.
         self.volume_scalar_opacity = vtkPiecewiseFunction()
-        self.volume_scalar_opacity.AddPoint(-127, 1)
-        self.volume_scalar_opacity.AddPoint(0, 0)
-        self.volume_scalar_opacity.AddPoint(128, 1)
 
         # The gradient opacity function is used to decrease the
         # opacity in the "flat" regions of the volume while
@@ -161,9 +164,8 @@ class DicomView3D(QtWidgets.QWidget):
         # the intensity changes over unit distance. For most
         # medical data, the unit distance is 1mm.
         self.volume_gradient_opacity = vtkPiecewiseFunction()
-        self.volume_gradient_opacity.AddPoint(-127, 1)
-        self.volume_gradient_opacity.AddPoint(0, 0)
-        self.volume_gradient_opacity.AddPoint(128, 1)
+        # The points of the functions depend on the window and level
+        self.update_volume_by_window_level()
         # The VolumeProperty attaches the color and opacity
         # functions to the volume, and sets other volume properties.
         # The interpolation should be set to linear
@@ -189,7 +191,7 @@ class DicomView3D(QtWidgets.QWidget):
         """
         if self.is_rendered:
             self.update_volume_by_window_level()
-            self.volume.Update()
+            self.vtk_widget.update()
 
     def start_interaction(self):
         """
@@ -69,7 +69,6 @@ class Drawing(QtWidgets.QGraphicsScene):
         and maximum densities, then displays them on the view.
         """
         if self.min_pixel <= self.max_pixel:
-            data_set = self.dataset
             if hasattr(self.draw_roi_window_instance, 'bounds_box_draw'):
                 bound_box = \
                     self.draw_roi_window_instance.bounds_box_draw.box.rect()
@@ -92,7 +91,7 @@ class Drawing(QtWidgets.QGraphicsScene):
             """pixel_array is a 2-Dimensional array containing all pixel 
             coordinates of the q_image. pixel_array[x][y] will return the 
             density of the pixel """
-            self.pixel_array = data_set._pixel_array
+            self.pixel_array = self.data.transpose()
             self.q_image = self.img.toImage()
             for y_coord in range(self.min_y, self.max_y):
                 for x_coord in range(self.min_x, self.max_x):
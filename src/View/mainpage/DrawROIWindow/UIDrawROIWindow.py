@@ -706,12 +706,12 @@ class UIDrawROIWindow:
         dt = self.patient_dict_container.dataset[id]
         rowS = dt.PixelSpacing[0]
         colS = dt.PixelSpacing[1]
-        dt.convert_pixel_data()
+        pixel_array = self.patient_dict_container.get_pixel_array(id)
         MainPageCallClass().run_transect(
             self.draw_roi_window_instance,
             self.dicom_view.view,
             pixmaps[id],
-            dt._pixel_array.transpose(),
+            pixel_array.transpose(),
             rowS,
             colS,
             is_roi_draw=True,
@@ -768,8 +768,7 @@ class UIDrawROIWindow:
             # Getting most updated selected slice
             id = self.current_slice
 
-            dt = self.patient_dict_container.dataset[id]
-            dt.convert_pixel_data()
+            pixel_array = self.patient_dict_container.get_pixel_array(id)
 
             # Path to the selected .dcm file
             location = self.patient_dict_container.filepaths[id]
@@ -792,7 +791,7 @@ class UIDrawROIWindow:
 
                 self.drawingROI = Drawing(
                     pixmaps[id],
-                    dt._pixel_array.transpose(),
+                    pixel_array.transpose(),
                     min_pixel,
                     max_pixel,
                     self.patient_dict_container.dataset[id],
@@ -506,8 +506,8 @@ class UIManipulateROIWindow:
         # Draw the new ROI
         self.dicom_preview.update_view()
         for i in range(len(polygons)):
-            self.dicom_preview.scene.addPolygon(polygons[i], pen,
-                                                QtGui.QBrush(color))
+            self.dicom_preview.scene.overlay_layer.add_polygon(
+                polygons[i], pen, QtGui.QBrush(color))
 
     def update_selected_rois(self):
         """ Get the names of selected ROIs """
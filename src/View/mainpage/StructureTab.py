@@ -10,9 +10,9 @@ from src.Controller.ROIOptionsController import ROIDelOption, ROIDrawOption, \
 from src.Model.DICOMStructure import Series
 from src.Model import ImageLoading
 from src.Model.CalculateDVHs import dvh2rtdose
-from src.Model.GetPatientInfo import DicomTree
 from src.Model.PatientDictContainer import PatientDictContainer
 from src.Model.MovingDictContainer import MovingDictContainer
+from src.Model.PolygonCache import get_modified_roi_names
 from src.Model.ROI import ordered_list_rois, get_roi_contour_pixel, \
     calc_roi_polygon, transform_rois_contours, merge_rtss
 from src.View.mainpage.StructureWidget import StructureWidget
@@ -105,19 +105,17 @@ class StructureTab(QtWidgets.QWidget):
         """
         roi_color = dict()
         roi_contour_info = dict_container.get(
-            "dict_dicom_tree_rtss")['ROI Contour Sequence']
+            "dataset_rtss").get("ROIContourSequence", [])
 
         if len(roi_contour_info) > 0:
-            for item, roi_dict in roi_contour_info.items():
-                # Note: the keys of roiContourInfo are "item 0", "item 1",
-                # etc. As all the ROI structures are identified by the ROI
+            for id, roi_contour in enumerate(roi_contour_info):
+                # As all the ROI structures are identified by the ROI
                 # numbers in the whole code, we get the ROI number 'roi_id'
                 # by using the member 'list_roi_numbers'
-                id = item.split()[1]
                 roi_id = dict_container.get(
-                    "list_roi_numbers")[int(id)]
-                if 'ROI Display Color' in roi_contour_info[item]:
-                    RGB_list = roi_contour_info[item]['ROI Display Color'][0]
+                    "list_roi_numbers")[id]
+                if 'ROIDisplayColor' in roi_contour:
+                    RGB_list = roi_contour.ROIDisplayColor
                     red = RGB_list[0]
                     green = RGB_list[1]
                     blue = RGB_list[2]
@@ -290,12 +288,6 @@ class StructureTab(QtWidgets.QWidget):
         self.moving_dict_container.set("dict_polygons_coronal", {})
 
         if "draw" in change_description or "transfer" in change_description:
-            dicom_tree_rtss = DicomTree(None)
-            dicom_tree_rtss.dataset = new_dataset
-            dicom_tree_rtss.dict = dicom_tree_rtss.dataset_to_dict(
-                dicom_tree_rtss.dataset)
-            self.moving_dict_container.set(
-                "dict_dicom_tree_rtss", dicom_tree_rtss.dict)
             self.color_dict = self.init_color_roi(self.moving_dict_container)
             self.moving_dict_container.set("roi_color_dict", self.color_dict)
             if self.moving_dict_container.has_attribute("raw_dvh"):
@@ -367,6 +359,8 @@ class StructureTab(QtWidgets.QWidget):
         # dataset rather than the original RTSS file.
         self.patient_dict_container.set("rtss_modified", True)
         self.patient_dict_container.set("dataset_rtss", new_dataset)
+        self.patient_dict_container.get_polygon_cache().invalidate(
+            new_dataset, get_modified_roi_names(change_description))
 
         # Refresh ROIs in main page
         self.patient_dict_container.set(
@@ -375,7 +369,9 @@ class StructureTab(QtWidgets.QWidget):
         contour_data = ImageLoading.get_raw_contour_data(new_dataset)
         self.patient_dict_container.set("raw_contour", contour_data[0])
         self.patient_dict_container.set("num_points", contour_data[1])
-        pixluts = ImageLoading.get_pixluts(self.patient_dict_container.dataset)
+        pixluts = ImageLoading.get_pixluts(
+            self.patient_dict_container.dataset,
+            self.patient_dict_container.get("slice_geometry"))
         self.patient_dict_container.set("pixluts", pixluts)
         self.patient_dict_container.set("list_roi_numbers", ordered_list_rois(
             self.patient_dict_container.get("rois")))
@@ -385,12 +381,6 @@ class StructureTab(QtWidgets.QWidget):
         self.patient_dict_container.set("dict_polygons_coronal", {})
 
         if "draw" in change_description or "transfer" in change_description:
-            dicom_tree_rtss = DicomTree(None)
-            dicom_tree_rtss.dataset = new_dataset
-            dicom_tree_rtss.dict = dicom_tree_rtss.dataset_to_dict(
-                dicom_tree_rtss.dataset)
-            self.patient_dict_container.set(
-                "dict_dicom_tree_rtss", dicom_tree_rtss.dict)
             self.color_dict = self.init_color_roi(self.patient_dict_container)
             self.patient_dict_container.set("roi_color_dict", self.color_dict)
             if self.patient_dict_container.has_attribute("raw_dvh"):
@@ -463,7 +453,8 @@ class StructureTab(QtWidgets.QWidget):
     def update_dict_polygons(self, state, roi_id):
         """
         Update the polygon dictionaries (axial, coronal, sagittal) used to
-        display the ROIs.
+        display the ROIs. The polygons of an ROI are kept in the polygon
+        cache of the patient, and only calculated if they are not there.
         :param state: True if the ROI is selected, False otherwise
         :param roi_id: ROI number
         """
@@ -478,36 +469,23 @@ class StructureTab(QtWidgets.QWidget):
         roi_name = rois[roi_id]['name']
 
         if state:
-            new_dict_polygons_axial[roi_name] = {}
-            new_dict_polygons_coronal[roi_name] = {}
-            new_dict_polygons_sagittal[roi_name] = {}
-            dict_rois_contours_axial = get_roi_contour_pixel(
-                self.patient_dict_container.get("raw_contour"),
-                [roi_name], self.patient_dict_container.get("pixluts"))
-            dict_rois_contours_coronal, dict_rois_contours_sagittal = \
-                transform_rois_contours(
-                    dict_rois_contours_axial)
-
-            for slice_id in self.patient_dict_container.get(
-                    "dict_uid").values():
-                polygons = calc_roi_polygon(roi_name, slice_id,
-                                            dict_rois_contours_axial)
-                new_dict_polygons_axial[roi_name][slice_id] = polygons
-
-            for slice_id in range(0, len(self.patient_dict_container.get(
-                    "pixmaps_coronal"))):
-                polygons_coronal = calc_roi_polygon(
-                    roi_name, slice_id,
-                    dict_rois_contours_coronal,
-                    aspect["coronal"])
-                polygons_sagittal = calc_roi_polygon(
-                    roi_name, slice_id,
-                    dict_rois_contours_sagittal,
-                    1 / aspect["sagittal"])
-                new_dict_polygons_coronal[roi_name][
-                    slice_id] = polygons_coronal
-                new_dict_polygons_sagittal[roi_name][
-                    slice_id] = polygons_sagittal
+            polygon_cache = self.patient_dict_container.get_polygon_cache()
+            polygon_cache.use_rtss(
+                self.patient_dict_container.get("dataset_rtss"))
+            view_aspects = {"axial": None, "coronal": aspect["coronal"],
+                            "sagittal": 1 / aspect["sagittal"]}
+            polygons = {view: polygon_cache.get(roi_name, view, view_aspect)
+                        for view, view_aspect in view_aspects.items()}
+            if None in polygons.values():
+                polygons = self.calculate_dict_polygons(roi_name,
+                                                        view_aspects)
+                for view, view_aspect in view_aspects.items():
+                    polygon_cache.put(roi_name, view, view_aspect,
+                                      polygons[view])
+
+            new_dict_polygons_axial[roi_name] = polygons["axial"]
+            new_dict_polygons_coronal[roi_name] = polygons["coronal"]
+            new_dict_polygons_sagittal[roi_name] = polygons["sagittal"]
 
             self.patient_dict_container.set("dict_polygons_axial",
                                             new_dict_polygons_axial)
@@ -520,6 +498,39 @@ class StructureTab(QtWidgets.QWidget):
             new_dict_polygons_coronal.pop(roi_name, None)
             new_dict_polygons_sagittal.pop(roi_name, None)
 
+    def calculate_dict_polygons(self, roi_name, view_aspects):
+        """
+        Calculate the polygons of an ROI for each slice of each view.
+        :param roi_name: Name of the ROI
+        :param view_aspects: Dictionary of the scaling ratio of the
+            polygons of each view
+        :return: Dictionary of the polygons of each slice by view
+        """
+        polygons = {"axial": {}, "coronal": {}, "sagittal": {}}
+        dict_rois_contours_axial = get_roi_contour_pixel(
+            self.patient_dict_container.get("raw_contour"),
+            [roi_name], self.patient_dict_container.get("pixluts"))
+        dict_rois_contours_coronal, dict_rois_contours_sagittal = \
+            transform_rois_contours(
+                dict_rois_contours_axial)
+
+        for slice_id in self.patient_dict_container.get(
+                "dict_uid").values():
+            polygons["axial"][slice_id] = calc_roi_polygon(
+                roi_name, slice_id, dict_rois_contours_axial)
+
+        for slice_id in range(0, len(self.patient_dict_container.get(
+                "pixmaps_coronal"))):
+            polygons["coronal"][slice_id] = calc_roi_polygon(
+                roi_name, slice_id,
+                dict_rois_contours_coronal,
+                view_aspects["coronal"])
+            polygons["sagittal"][slice_id] = calc_roi_polygon(
+                roi_name, slice_id,
+                dict_rois_contours_sagittal,
+                view_aspects["sagittal"])
+        return polygons
+
     def on_rtss_selected(self, selected_rtss):
         """
         Function to run after a rtss is selected from SelectRTSSPopUp
@@ -0,0 +1,130 @@
+"""
+Coalesced updates of the DICOM views.
+
+Moving a slider changes the slice of its view and the cut lines of the
+views linked to it. Rather than redrawing those views for every value
+the slider passes through, the updates are requested from the
+UpdateScheduler, which redraws each view once per frame. A view asked to
+update several times before the next frame is updated once, with the
+slice current at that time, so the slices passed over in between are
+never drawn. Frames are at most max_frame_rate per second.
+
+Example usage:
+get_update_scheduler().request_update(view)
+"""
+import math
+import time
+
+import shiboken6
+from PySide6 import QtCore
+
+from src.Model.PerformanceOptions import get_performance_option
+
+
+class UpdateScheduler(QtCore.QObject):
+    """
+    Redraws the views whose update was requested, once per frame. Must
+    be created, and used, in the GUI thread.
+    """
+
+    def __init__(self, max_frame_rate=None):
+        """
+        :param max_frame_rate: Most frames drawn per second, unlimited if
+            0. Read from the "max_frame_rate" performance option if None.
+        """
+        super().__init__()
+        if max_frame_rate is None:
+            max_frame_rate = get_performance_option("max_frame_rate")
+        self.frame_interval = 1 / max_frame_rate if max_frame_rate > 0 \
+            else 0.0
+        # Views waiting for the next frame, in the order they were
+        # requested
+        self.pending = {}
+        self.last_frame = None
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+        self.requested = 0
+        self.coalesced = 0
+        self.rendered = 0
+        self.frames = 0
+
+    def request_update(self, view):
+        """
+        Asks for a view to be updated in the next frame.
+        :param view: Object whose update_view() method is called, e.g. a
+            DicomView.
+        """
+        self.requested += 1
+        if view in self.pending:
+            self.coalesced += 1
+            return
+        self.pending[view] = None
+        if not self.timer.isActive():
+            delay = 0.0
+            if self.last_frame is not None:
+                delay = self.frame_interval \
+                    - (time.monotonic() - self.last_frame)
+            self.timer.start(max(0, math.ceil(delay * 1000)))
+
+    def discard(self, view):
+        """
+        Drops the pending update of a view that has been updated
+        directly, which shows the current slice already.
+        """
+        if view in self.pending:
+            del self.pending[view]
+            self.coalesced += 1
+
+    def clear(self):
+        """
+        Drops every pending update, e.g. of the views of a patient being
+        closed.
+        """
+        self.pending.clear()
+        self.timer.stop()
+
+    def flush(self):
+        """
+        Updates the views waiting for the next frame.
+        """
+        views = list(self.pending)
+        self.pending.clear()
+        if not views:
+            return
+        self.last_frame = time.monotonic()
+        self.frames += 1
+        for view in views:
+            if not shiboken6.isValid(view):
+                # The view was deleted, e.g. when the patient was closed
+                continue
+            view.update_view()
+            self.rendered += 1
+
+    def get_statistics(self):
+        """
+        :return: Dictionary of the number of updates requested, coalesced
+            with another update and rendered, of the frames drawn, and of
+            the views waiting for the next frame.
+        """
+        return {
+            "requested": self.requested,
+            "coalesced": self.coalesced,
+            "rendered": self.rendered,
+            "frames": self.frames,
+            "pending": len(self.pending),
+        }
+
+
+_scheduler = None
+
+
+def get_update_scheduler():
+    """
+    :return: The UpdateScheduler shared by the views, created the first
+        time this is called, which must be in the GUI thread.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = UpdateScheduler()
+    return _scheduler
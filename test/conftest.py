@@ -5,6 +5,7 @@ import pytest
 from PySide6.QtWidgets import QApplication
 
 from src.Model.Configuration import Configuration
+from src.Model.DICOMIndex import DICOMIndex
 
 
 @pytest.fixture(scope="module", autouse=True)
@@ -22,3 +23,14 @@ def init_config(request):
 
     request.addfinalizer(tear_down)
     return connection
+
+
+@pytest.fixture(autouse=True)
+def dicom_index_db(tmp_path):
+    """
+    Point the DICOMIndex at a database in the test's temporary directory
+    before it is opened, so the user's index is never touched.
+    """
+    index = DICOMIndex()
+    index.set_db_file_path(tmp_path.joinpath("TestDICOMIndex.db"))
+    yield index
@@ -0,0 +1,37 @@
+import cv2
+import numpy as np
+import pytest
+
+from src.Model.Colormaps import COLORMAPS, apply_colormap, \
+    apply_window_colormap, get_colormap_lut, unpack_rgb
+from src.Model.WindowingLUT import apply_window
+
+
+def test_heat_matches_opencv():
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (40, 30)).astype(np.uint8)
+    expected = cv2.cvtColor(cv2.applyColorMap(pixels, cv2.COLORMAP_HOT),
+                            cv2.COLOR_BGR2RGB)
+    assert np.array_equal(unpack_rgb(apply_colormap(pixels, "Heat")),
+                          expected)
+
+
+def test_colormaps():
+    for name in COLORMAPS:
+        lut = get_colormap_lut(name)
+        assert lut.shape == (256,) and lut.dtype == np.uint32
+        assert not lut.flags.writeable
+        # Every map goes from black to a bright colour
+        rgb = unpack_rgb(lut)
+        assert not rgb[0].any() and rgb[-1].sum() > 255
+    with pytest.raises(ValueError):
+        get_colormap_lut("Unknown")
+
+
+def test_window_colormap_on_slab():
+    rng = np.random.default_rng(0)
+    slab = rng.integers(-1000, 3000, (5, 20, 24)).astype(np.int16)
+    rgb = apply_window_colormap(slab, 400, 800, "Hot Iron")
+    assert rgb.shape == (5, 20, 24)
+    assert np.array_equal(
+        rgb, apply_colormap(apply_window(slab, 400, 800), "Hot Iron"))
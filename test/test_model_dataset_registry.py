@@ -0,0 +1,130 @@
+import gc
+import os
+import threading
+from unittest import mock
+
+import pytest
+from pydicom import dcmread
+from pydicom.uid import generate_uid
+
+from src.Model import ImageLoading
+from src.Model.DatasetRegistry import DatasetRegistry
+from src.Model.PatientDictContainer import PatientDictContainer
+from src.View.ImageLoader import ImageLoader
+from test_model_image_loading import create_ct_file
+
+
+@pytest.fixture
+def registry():
+    """An empty DatasetRegistry with its counters reset."""
+    registry = DatasetRegistry()
+    registry.clear()
+    registry.hits = 0
+    registry.misses = 0
+    yield registry
+    registry.clear()
+
+
+def test_registry_reads_file_once(tmp_path, registry):
+    file = create_ct_file(str(tmp_path), "ct0.dcm", 0, generate_uid())
+
+    dataset = registry.get(file)
+    assert registry.get(str(tmp_path / ".." / tmp_path.name / "ct0.dcm")) \
+        is dataset
+    assert registry.get_statistics() == \
+        {"hits": 1, "misses": 1, "datasets": 1, "series": 0}
+
+    # A changed file is read again
+    dataset.PatientName = "Changed^Name"
+    dataset.save_as(file)
+    stat = os.stat(file)
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    changed = registry.get(file)
+    assert changed is not dataset
+    assert changed.PatientName == "Changed^Name"
+    assert registry.misses == 2
+
+
+def test_register_datasets(tmp_path, registry):
+    series_uid = generate_uid()
+    files = [create_ct_file(str(tmp_path), "ct%s.dcm" % i, i, series_uid)
+             for i in range(3)]
+
+    for max_workers in [1, 2]:
+        registry.clear()
+        read_data_dict, file_names_dict = \
+            ImageLoading.get_datasets(files, max_workers=max_workers)
+        # Only the patient being opened is registered, by its loader
+        assert registry.get_statistics()["series"] == 0
+        ImageLoading.register_datasets(read_data_dict, file_names_dict)
+
+        for key, file in file_names_dict.items():
+            assert registry.get(file) is read_data_dict[key]
+        assert registry.misses == 0
+        # The slices are registered as one series
+        statistics = registry.get_statistics()
+        assert statistics["series"] == 1
+        assert statistics["datasets"] == 0
+
+
+def test_failed_open_keeps_patient(tmp_path, registry):
+    file = create_ct_file(str(tmp_path), "ct0.dcm", 0, generate_uid())
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    read_data_dict, file_names_dict = ImageLoading.get_datasets([file])
+    ImageLoading.register_datasets(read_data_dict, file_names_dict)
+    patient_dict_container.set_initial_values(str(tmp_path), read_data_dict,
+                                              file_names_dict)
+
+    # A file of a class that cannot be opened
+    other_file = create_ct_file(str(tmp_path), "other.dcm", 0,
+                                generate_uid())
+    dataset = dcmread(other_file)
+    dataset.SOPClassUID = "1.2.3.4"
+    dataset.save_as(other_file)
+    image_loader = ImageLoader([other_file], [], None)
+    with pytest.raises(ImageLoading.NotAllowedClassError):
+        image_loader.load(threading.Event(), mock.Mock())
+
+    assert patient_dict_container.dataset is read_data_dict
+    assert registry.get(file) is read_data_dict[0]
+    patient_dict_container.clear()
+
+
+def test_registry_does_not_hold_slices(tmp_path, registry):
+    series_uid = generate_uid()
+    files = [create_ct_file(str(tmp_path), "ct%s.dcm" % i, i, series_uid)
+             for i in range(3)]
+    datasets = [dcmread(file) for file in files]
+    registry.register_series(series_uid, files, datasets)
+    assert registry.get(files[0]) is datasets[0]
+
+    # A slice no longer held elsewhere is read again
+    del datasets[1]
+    gc.collect()
+    assert registry.get(files[1]).ImagePositionPatient[2] == 1
+    assert registry.misses == 1
+    assert registry.get(files[2]) is datasets[1]
+    assert registry.hits == 2
+
+
+def test_patient_clear_clears_registry(tmp_path, registry):
+    files = [create_ct_file(str(tmp_path), "ct0.dcm", 0, generate_uid()),
+             create_ct_file(str(tmp_path), "rtss.dcm", 0, generate_uid())]
+    registry.register_series(generate_uid(), files[:1], [dcmread(files[0])])
+    registry.register(files[1], dcmread(files[1]))
+
+    PatientDictContainer().clear()
+    statistics = registry.get_statistics()
+    assert statistics["datasets"] == 0
+    assert statistics["series"] == 0
+
+
+def test_registry_registers_saved_dataset(tmp_path, registry):
+    file = create_ct_file(str(tmp_path), "ct0.dcm", 0, generate_uid())
+    dataset = dcmread(file)
+    dataset.save_as(file)
+    registry.register(file, dataset)
+
+    assert registry.get(file) is dataset
+    assert registry.hits == 1
@@ -0,0 +1,217 @@
+import os
+import threading
+from unittest import mock
+
+import pytest
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+from src.Model import DICOMDirectorySearch
+
+
+class ProgressCallback:
+    """Stands in for the progress signal of a Worker."""
+
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, progress):
+        self.emitted.append(progress)
+
+
+def create_dicom_file(directory, name, patient_id, study_uid, series_uid,
+                      modality="CT"):
+    """
+    Write a small DICOM file without pixel data to disk.
+    :param directory: Directory to write the file into.
+    :param name: File name of the DICOM file.
+    :param patient_id: PatientID of the file.
+    :param study_uid: StudyInstanceUID of the file.
+    :param series_uid: SeriesInstanceUID of the file.
+    :param modality: Modality of the file.
+    :return: Path of the written file.
+    """
+    file_meta = FileMetaDataset()
+    file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.2"
+    file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    file_path = os.path.join(directory, name)
+    ds = FileDataset(file_path, {}, file_meta=file_meta, preamble=b"\0" * 128)
+    ds.SOPClassUID = file_meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = file_meta.MediaStorageSOPInstanceUID
+    ds.PatientID = patient_id
+    ds.PatientName = "Test^Patient"
+    ds.StudyInstanceUID = study_uid
+    ds.StudyDescription = "Test study"
+    ds.SeriesInstanceUID = series_uid
+    ds.SeriesDescription = "Test series"
+    ds.FrameOfReferenceUID = "1.2.3"
+    ds.Modality = modality
+    ds.save_as(file_path)
+    return file_path
+
+
+@pytest.fixture
+def dicom_index(dicom_index_db):
+    """The DICOMIndex, using the test database set up in conftest."""
+    return dicom_index_db
+
+
+@pytest.fixture
+def dicom_directory(tmp_path):
+    """Write two patients and a non-DICOM file into a directory."""
+    directory = tmp_path.joinpath("patients")
+    os.makedirs(directory.joinpath("subdirectory"))
+    study_uid = generate_uid()
+    series_uid = generate_uid()
+    for i in range(3):
+        create_dicom_file(str(directory), "ct%s.dcm" % i, "patient_a",
+                          study_uid, series_uid)
+    create_dicom_file(str(directory.joinpath("subdirectory")), "ct.dcm",
+                      "patient_b", generate_uid(), generate_uid())
+    directory.joinpath("notes.txt").write_text("not a DICOM file")
+    return str(directory)
+
+
+def search(path):
+    """
+    :param path: Directory to search.
+    :return: Tuple (DICOMStructure, list of files read).
+    """
+    read_files = []
+    dcmread = DICOMDirectorySearch.dcmread
+
+    def counting_dcmread(file_path, *args, **kwargs):
+        read_files.append(file_path)
+        return dcmread(file_path, *args, **kwargs)
+
+    with mock.patch.object(DICOMDirectorySearch, "dcmread",
+                           counting_dcmread):
+        dicom_structure = DICOMDirectorySearch.get_dicom_structure(
+            path, threading.Event(), ProgressCallback())
+    return dicom_structure, read_files
+
+
+def test_search_builds_structure(dicom_index, dicom_directory):
+    dicom_structure, read_files = search(dicom_directory)
+
+    assert sorted(dicom_structure.patients) == ["patient_a", "patient_b"]
+    assert len(dicom_structure.get_files()) == 4
+    assert len(read_files) == 5
+
+    patient = dicom_structure.get_patient("patient_a")
+    study = list(patient.studies.values())[0]
+    series = list(study.image_series.values())[0]
+    assert patient.patient_name == "Test^Patient"
+    assert study.study_description == "Test study"
+    assert series.series_description == "Test series"
+    assert series.frame_of_reference_uid == "1.2.3"
+    assert len(series.images) == 3
+
+
+def test_search_reads_only_changed_files(dicom_index, dicom_directory):
+    first_structure, _ = search(dicom_directory)
+
+    # Nothing has changed, so no file is read again
+    second_structure, read_files = search(dicom_directory)
+    assert read_files == []
+    assert sorted(second_structure.get_files()) == \
+        sorted(first_structure.get_files())
+
+    # A new file is the only file read
+    new_file = create_dicom_file(dicom_directory, "new.dcm", "patient_c",
+                                 generate_uid(), generate_uid())
+    third_structure, read_files = search(dicom_directory)
+    assert read_files == [new_file]
+    assert third_structure.has_patient("patient_c")
+
+
+def test_search_removes_deleted_files(dicom_index, dicom_directory):
+    search(dicom_directory)
+    deleted_file = os.path.join(dicom_directory, "subdirectory", "ct.dcm")
+    os.remove(deleted_file)
+
+    dicom_structure, read_files = search(dicom_directory)
+    assert read_files == []
+    assert not dicom_structure.has_patient("patient_b")
+    assert deleted_file not in dicom_index.get_records(dicom_directory)
+
+
+def test_search_without_index_matches(dicom_index, dicom_directory):
+    indexed_structure, _ = search(dicom_directory)
+    with mock.patch.object(DICOMDirectorySearch, "get_performance_option",
+                           return_value=False):
+        unindexed_structure, read_files = search(dicom_directory)
+
+    assert len(read_files) == 5
+    assert indexed_structure.get_files() == unindexed_structure.get_files()
+
+
+def test_search_workers_match_serial_search(dicom_index, dicom_directory,
+                                            monkeypatch):
+    monkeypatch.setattr(DICOMDirectorySearch, "SEARCH_CHUNK_SIZE", 2)
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    options = {"use_dicom_index": False, "search_workers": 1}
+    monkeypatch.setattr(DICOMDirectorySearch, "get_performance_option",
+                        options.get)
+    serial_structure = DICOMDirectorySearch.get_dicom_structure(
+        dicom_directory, threading.Event(), ProgressCallback())
+
+    options["search_workers"] = 2
+    progress_callback = ProgressCallback()
+    pooled_structure = DICOMDirectorySearch.get_dicom_structure(
+        dicom_directory, threading.Event(), progress_callback)
+
+    assert pooled_structure.get_files() == serial_structure.get_files()
+    assert progress_callback.emitted[-1] == "5"
+
+
+def test_search_progress_is_throttled(dicom_index, dicom_directory):
+    progress_callback = ProgressCallback()
+    DICOMDirectorySearch.get_dicom_structure(
+        dicom_directory, threading.Event(), progress_callback)
+    assert len(progress_callback.emitted) < 5
+    assert progress_callback.emitted[-1] == "5"
+
+
+def test_interrupted_search_returns_nothing(dicom_index, dicom_directory):
+    interrupt_flag = threading.Event()
+    interrupt_flag.set()
+    assert DICOMDirectorySearch.get_dicom_structure(
+        dicom_directory, interrupt_flag, ProgressCallback()) is None
+
+
+def test_index_opened_on_first_use(tmp_path, dicom_index, dicom_directory):
+    # The database set up in conftest is only created by the search
+    assert not os.path.exists(dicom_index.db_file_path)
+    search(dicom_directory)
+    assert os.path.exists(dicom_index.db_file_path)
+    assert dicom_index.db_file_path.parent == tmp_path
+
+
+def test_search_reads_files_while_walking(dicom_index, dicom_directory,
+                                          monkeypatch):
+    monkeypatch.setattr(DICOMDirectorySearch, "SEARCH_CHUNK_SIZE", 2)
+    options = {"use_dicom_index": False, "search_workers": 1}
+    monkeypatch.setattr(DICOMDirectorySearch, "get_performance_option",
+                        options.get)
+    read_file_record = mock.Mock(
+        wraps=DICOMDirectorySearch.read_file_record)
+    monkeypatch.setattr(DICOMDirectorySearch, "read_file_record",
+                        read_file_record)
+    walk_directory = DICOMDirectorySearch.walk_directory
+    files_read = []
+
+    def walk(path):
+        for file_path in walk_directory(path):
+            files_read.append(read_file_record.call_count)
+            yield file_path
+
+    monkeypatch.setattr(DICOMDirectorySearch, "walk_directory", walk)
+    DICOMDirectorySearch.get_dicom_structure(
+        dicom_directory, threading.Event(), ProgressCallback())
+
+    # The first chunks are read before the last file is found
+    assert files_read[-1] == 4
+    assert read_file_record.call_count == 5
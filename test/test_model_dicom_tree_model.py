@@ -0,0 +1,69 @@
+from PySide6.QtCore import QModelIndex
+from pydicom.dataset import Dataset
+from pydicom.sequence import Sequence
+
+from src.Model.DicomTreeModel import DicomTreeModel, MAX_DISPLAYED_VALUES
+
+
+def create_rtss(contours):
+    """
+    :param contours: Number of contours in the ROI Contour Sequence.
+    :return: Dataset with a ROI Contour Sequence and pixel data.
+    """
+    contour_sequence = Sequence()
+    for i in range(contours):
+        contour = Dataset()
+        contour.ContourGeometricType = "CLOSED_PLANAR"
+        contour.NumberOfContourPoints = 100
+        contour.ContourData = [float(value) for value in range(300)]
+        contour_sequence.append(contour)
+    roi_contour = Dataset()
+    roi_contour.ROIDisplayColor = [255, 0, 0]
+    roi_contour.ContourSequence = contour_sequence
+
+    ds = Dataset()
+    ds.PatientName = "Test^Patient"
+    ds.ROIContourSequence = Sequence([roi_contour])
+    ds.add_new(0x7FE00010, "OW", b"\0\0")
+    return ds
+
+
+def test_model_creates_rows_on_expand():
+    model = DicomTreeModel(create_rtss(1000))
+
+    # Only the top level is created, and Pixel Data is not shown
+    assert model.rowCount() == 2
+    assert model.root._children[1]._children is None
+    assert model.data(model.index(0, 0)) == "Patient's Name"
+    assert model.data(model.index(0, 1)) == "Test^Patient"
+
+    sequence = model.index(1, 0)
+    assert model.hasChildren(sequence)
+    assert model.root._children[1]._children is None
+    assert model.rowCount(sequence) == 1
+
+    item = model.index(0, 0, sequence)
+    assert model.data(item) == "item 0"
+    assert model.parent(item) == sequence
+    contours = model.index(1, 0, item)
+    assert model.data(contours) == "Contour Sequence"
+    assert model.rowCount(contours) == 1000
+    assert model.data(model.index(999, 0, contours)) == "item 999"
+
+
+def test_model_shortens_long_values():
+    model = DicomTreeModel(create_rtss(1))
+    contours = model.index(1, 0, model.index(0, 0, model.index(1, 0)))
+    contour = model.index(0, 0, contours)
+
+    value = model.data(model.index(2, 1, contour))
+    assert value.endswith(", ...] (300 values)")
+    assert value.count(",") == MAX_DISPLAYED_VALUES
+    assert model.data(model.index(2, 3, contour)) == "300"
+    assert model.data(model.index(2, 4, contour)) == "DS"
+
+
+def test_empty_model():
+    model = DicomTreeModel()
+    assert model.rowCount() == 0
+    assert not model.hasChildren(QModelIndex())
@@ -0,0 +1,45 @@
+import pytest
+from PySide6 import QtCore, QtGui
+
+from src.Model import DisplayStyle
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path.joinpath("line&fill_configuration")
+    path.write_text("1\n10\n2\n5\n2.0\n")
+    monkeypatch.setattr(DisplayStyle, "data_path", lambda name: str(path))
+    return path
+
+
+def test_pens_are_cached(config_file):
+    style = DisplayStyle.DisplayStyle()
+    color = QtGui.QColor(200, 30, 40)
+    pen, brush = style.get_roi_pen_brush(color)
+    assert style.get_roi_pen_brush(QtGui.QColor(color)) == (pen, brush)
+    assert pen is style.get_roi_pen_brush(color)[0]
+    assert pen.color() == color and pen.widthF() == 2.0
+    assert pen.style() == QtCore.Qt.SolidLine
+    assert brush.color().alpha() == int(0.1 * 255)
+    # The colour the ROI is drawn with is not changed
+    assert color.alpha() == 255
+
+    iso_pen, iso_brush = style.get_isodose_pen_brush(color)
+    assert iso_pen is not pen and iso_pen.style() == QtCore.Qt.DashLine
+    assert iso_brush.color().alpha() == int(0.05 * 255)
+
+
+def test_reload(config_file):
+    style = DisplayStyle.DisplayStyle()
+    changed = []
+    style.style_changed.connect(lambda: changed.append(True))
+    color = QtGui.QColor(0, 255, 0)
+    pen, _ = style.get_roi_pen_brush(color)
+
+    config_file.write_text("3\n50\n2\n5\n1.5\n")
+    style.reload()
+    assert changed == [True]
+    new_pen, new_brush = style.get_roi_pen_brush(color)
+    assert new_pen is not pen
+    assert new_pen.style() == QtCore.Qt.DotLine and new_pen.widthF() == 1.5
+    assert new_brush.color().alpha() == int(0.5 * 255)
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from skimage.color import hsv2rgb
+
+from src.constants import CT_RESCALE_INTERCEPT
+from src.Model.FusionRenderer import get_colormix, get_fused_pixmaps
+from src.Model.PixmapRenderer import get_view_slice
+
+# Axis of platipy's return_slice for each view
+VIEW_AXES = {"axial": "z", "coronal": "y", "sagittal": "x"}
+
+
+def platipy_colormix(fixed, moving, window, color_rotation=0.35):
+    """The colour mix of platipy's generate_comparison_colormix."""
+    fixed = (np.clip(fixed, window[0], window[0] + window[1])
+             - window[0]) / window[1]
+    moving = (np.clip(moving, window[0], window[0] + window[1])
+              - window[0]) / window[1]
+    return hsv2rgb(np.stack(
+        [color_rotation * (fixed > moving)
+         + (0.5 + color_rotation) * (fixed <= moving),
+         np.abs(fixed - moving), (fixed + moving) / 2], axis=-1))
+
+
+def create_volumes():
+    rng = np.random.default_rng(0)
+    fixed = rng.integers(-1000, 1500, (6, 12, 10)).astype(np.int16)
+    moving = rng.integers(-1000, 1500, (6, 12, 10)).astype(np.int16)
+    return fixed, moving
+
+
+@pytest.mark.parametrize("view", ["axial", "coronal", "sagittal"])
+def test_colormix_matches_platipy(view):
+    fixed, moving = create_volumes()
+    rgb = get_colormix(get_view_slice(fixed, view, 2),
+                       get_view_slice(moving, view, 2), (-250, 500))
+    assert rgb.shape == {"axial": (12, 10, 3), "coronal": (6, 10, 3),
+                         "sagittal": (6, 12, 3)}[view]
+    assert np.allclose(rgb, platipy_colormix(
+        get_view_slice(fixed, view, 2), get_view_slice(moving, view, 2),
+        (-250, 500)), atol=1e-6)
+
+
+@pytest.mark.parametrize("view", ["axial", "coronal", "sagittal"])
+def test_colormix_matches_platipy_reference(view):
+    """
+    Every slice of each view is compared with the output of platipy's
+    own generate_comparison_colormix, which the fusion views used to
+    call.
+    """
+    sitk = pytest.importorskip("SimpleITK")
+    utils = pytest.importorskip("platipy.imaging.visualisation.utils")
+    fixed, moving = create_volumes()
+    images = [sitk.GetImageFromArray(fixed), sitk.GetImageFromArray(moving)]
+    renderer = dict(zip(["axial", "coronal", "sagittal"],
+                        get_fused_pixmaps(fixed, moving, 500,
+                                          CT_RESCALE_INTERCEPT - 250)))[view]
+    for index in range(len(renderer)):
+        reference = utils.generate_comparison_colormix(
+            images, arr_slice=utils.return_slice(VIEW_AXES[view], index),
+            window=(-250, 500))
+        rgb = get_colormix(get_view_slice(fixed, view, index),
+                           get_view_slice(moving, view, index), (-250, 500))
+        assert np.allclose(rgb, reference, atol=1e-6)
+
+
+def test_fused_pixmaps_render_on_demand(qtbot):
+    fixed, moving = create_volumes()
+    # The window of the colour mix is (-250, 500)
+    axial, coronal, sagittal = get_fused_pixmaps(
+        fixed, moving, 500, CT_RESCALE_INTERCEPT - 250)
+    assert (len(axial), len(coronal), len(sagittal)) == (6, 12, 10)
+    assert axial.get_statistics()["pixmaps"] == 0
+
+    pixmap = sagittal[9]
+    assert pixmap.width() == pixmap.height() == 512
+    assert sagittal[9] is pixmap
+
+    # A new window reuses the arrays and drops the rendered pixmaps
+    sagittal.set_window(200, 900)
+    assert sagittal.volume is fixed and sagittal.moving is moving
+    assert sagittal.get_statistics()["pixmaps"] == 0
+    assert sagittal[9].toImage() != pixmap.toImage()
@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pytest
+from pydicom.dataset import FileDataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+from src.Model import ImageLoading
+
+
+def create_ct_file(directory, name, z_position, series_uid):
+    """
+    Write a small CT image to disk.
+    :param directory: Directory to write the file into.
+    :param name: File name of the image.
+    :param z_position: Z coordinate of the ImagePositionPatient.
+    :param series_uid: SeriesInstanceUID shared by the image series.
+    :return: Path of the written file.
+    """
+    file_meta = FileMetaDataset()
+    file_meta.MediaStorageSOPClassUID = "1.2.840.10008.5.1.4.1.1.2"
+    file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+
+    file_path = os.path.join(directory, name)
+    ds = FileDataset(file_path, {}, file_meta=file_meta, preamble=b"\0" * 128)
+    ds.SOPClassUID = file_meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = file_meta.MediaStorageSOPInstanceUID
+    ds.SeriesInstanceUID = series_uid
+    ds.Modality = "CT"
+    ds.ImageOrientationPatient = [1, 0, 0, 0, 1, 0]
+    ds.ImagePositionPatient = [0, 0, z_position]
+    ds.PixelSpacing = [1, 1]
+    ds.Rows = 4
+    ds.Columns = 4
+    ds.BitsAllocated = 16
+    ds.BitsStored = 16
+    ds.HighBit = 15
+    ds.PixelRepresentation = 1
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.PixelData = np.full((4, 4), z_position, dtype=np.int16).tobytes()
+    ds.save_as(file_path)
+    return file_path
+
+
+@pytest.fixture
+def ct_files(tmp_path):
+    """Write an unordered series of CT images and a non-DICOM file."""
+    series_uid = generate_uid()
+    z_positions = [3, 9, 0, 6, 12, 15]
+    files = [create_ct_file(str(tmp_path), "ct%s.dcm" % i, z, series_uid)
+             for i, z in enumerate(z_positions)]
+    not_dicom = tmp_path.joinpath("notes.txt")
+    not_dicom.write_text("not a DICOM file")
+    files.append(str(not_dicom))
+    return files
+
+
+def test_parallel_get_datasets_matches_serial(ct_files):
+    serial_data, serial_files = \
+        ImageLoading.get_datasets(ct_files, max_workers=1)
+    parallel_data, parallel_files = \
+        ImageLoading.get_datasets(ct_files, max_workers=4)
+
+    assert list(serial_files.items()) == list(parallel_files.items())
+    assert list(serial_data.keys()) == list(parallel_data.keys())
+    for key in serial_data:
+        assert serial_data[key].SOPInstanceUID == \
+            parallel_data[key].SOPInstanceUID
+        assert np.array_equal(serial_data[key].pixel_array,
+                              parallel_data[key].pixel_array)
+
+
+def test_parallel_get_datasets_sorts_stack(ct_files):
+    read_data_dict, _ = ImageLoading.get_datasets(ct_files, max_workers=4)
+    z_positions = [read_data_dict[key].ImagePositionPatient[2]
+                   for key in read_data_dict]
+    assert z_positions == [15, 12, 9, 6, 3, 0]
+
+
+def test_parallel_get_datasets_filters_file_type(ct_files):
+    read_data_dict, file_names_dict = \
+        ImageLoading.get_datasets(ct_files, file_type="MR", max_workers=4)
+    assert read_data_dict == {}
+    assert file_names_dict == {}
@@ -0,0 +1,95 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+from pydicom import dcmread
+from pydicom.uid import RLELossless, generate_uid
+
+from src.Model import CalculateImages
+from src.Model.CalculateImages import convert_raw_data
+from src.Model.ImageVolume import ImageVolume
+from test_model_image_loading import create_ct_file
+
+
+@pytest.fixture
+def datasets(tmp_path):
+    """Read a series of CT images into a dataset dictionary."""
+    series_uid = generate_uid()
+    dataset = {}
+    for i in range(5):
+        ds = dcmread(create_ct_file(str(tmp_path), "ct%s.dcm" % i, i,
+                                    series_uid))
+        ds.RescaleSlope = 2
+        ds.RescaleIntercept = -10
+        ds.SliceThickness = 3
+        dataset[i] = ds
+    return dataset
+
+
+def test_image_volume_views_share_memory():
+    voxels = np.arange(2 * 3 * 4).reshape((2, 3, 4))
+    volume = ImageVolume(voxels, (3, 1, 1))
+
+    assert len(volume) == 2
+    assert np.asarray(volume) is voxels
+    assert np.shares_memory(volume.axial(1), voxels)
+    assert np.shares_memory(volume.coronal(2), voxels)
+    assert np.shares_memory(volume.sagittal(3), voxels)
+    assert np.array_equal(volume.coronal(2), voxels[:, 2, :])
+    assert np.array_equal(volume.sagittal(3), voxels[:, :, 3])
+
+
+@pytest.mark.parametrize("use_memmap", [False, True])
+def test_convert_raw_data_creates_volume(datasets, use_memmap):
+    with mock.patch.object(CalculateImages, "get_performance_option",
+                           return_value=use_memmap):
+        volume = convert_raw_data(datasets, False, True)
+
+    assert isinstance(volume, ImageVolume)
+    assert isinstance(volume.voxels, np.memmap) == use_memmap
+    assert volume.shape == (5, 4, 4)
+    # The slices are 1mm apart, whatever their SliceThickness
+    assert volume.spacing == (1.0, 1.0, 1.0)
+    assert volume.origin == (0.0, 0.0, 0.0)
+    for i, ds in datasets.items():
+        assert np.all(volume.axial(i) == i * 2 - 10 + 1024)
+        # The datasets' pixel arrays are views of the volume
+        ds.convert_pixel_data()
+        assert np.shares_memory(ds._pixel_array, np.asarray(volume))
+
+
+def test_volume_spacing_from_slice_positions(tmp_path):
+    series_uid = generate_uid()
+    dataset = {}
+    for i, z in enumerate([5.0, 2.5, 0.0]):
+        ds = dcmread(create_ct_file(str(tmp_path), "ct%s.dcm" % i, z,
+                                    series_uid))
+        ds.SliceThickness = 3
+        dataset[i] = ds
+    assert convert_raw_data(dataset, False, True).spacing == (2.5, 1.0, 1.0)
+
+    # A single slice has no spacing, so its thickness is used
+    single = convert_raw_data({0: dataset[0]}, False, True)
+    assert single.spacing == (3.0, 1.0, 1.0)
+
+
+def test_convert_raw_data_reuses_volume(datasets):
+    volume = convert_raw_data(datasets, False, True)
+    rescaled_volume = convert_raw_data(datasets, True)
+    assert np.asarray(rescaled_volume) is np.asarray(volume)
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_decode_slices_in_parallel(datasets, compress):
+    if compress:
+        for ds in datasets.values():
+            ds.compress(RLELossless)
+    slices = list(datasets.values())
+
+    voxels = CalculateImages.decode_slices(slices, False, True, 4)
+
+    assert voxels.shape == (5, 4, 4)
+    for i, ds in enumerate(slices):
+        # Each slice is stored at its own index
+        assert np.all(voxels[i] == i * 2 - 10 + 1024)
+        assert np.shares_memory(ds._pixel_array, voxels)
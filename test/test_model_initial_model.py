@@ -0,0 +1,64 @@
+from unittest import mock
+
+from pydicom import dcmread
+from pydicom.uid import generate_uid
+
+from src.Model import ImageLoading, InitialModel
+from src.Model.PatientDictContainer import PatientDictContainer
+from test_model_image_loading import create_ct_file
+
+
+def test_create_initial_model_batch(tmp_path, qapp):
+    """
+    Batch processing sets up the container of a patient without an RTSS.
+    """
+    series_uid = generate_uid()
+    dataset = {}
+    filepaths = {}
+    for i in range(6):
+        filepaths[i] = create_ct_file(str(tmp_path), "ct%s.dcm" % i, i,
+                                      series_uid)
+        dataset[i] = dcmread(filepaths[i])
+        dataset[i].SliceThickness = 1
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    patient_dict_container.set_initial_values(str(tmp_path), dataset,
+                                              filepaths)
+
+    InitialModel.create_initial_model_batch()
+
+    assert len(patient_dict_container.get("pixmaps_axial")) == 6
+    assert len(patient_dict_container.get("pixmaps_coronal")) == 4
+    assert len(patient_dict_container.get("pixmaps_sagittal")) == 4
+    assert patient_dict_container.get("window") == 400
+    assert patient_dict_container.get("level") == 800
+    assert len(patient_dict_container.get("dict_uid")) == 6
+    assert not patient_dict_container.has_attribute("dataset_rtss")
+    patient_dict_container.clear()
+
+
+def test_initial_model_reuses_sorted_geometry(tmp_path, qapp):
+    """
+    The SliceGeometry built when the slices are sorted is stored in the
+    container and not read from the slices again.
+    """
+    series_uid = generate_uid()
+    files = [create_ct_file(str(tmp_path), "ct%s.dcm" % i, i, series_uid)
+             for i in range(4)]
+    read_data_dict, file_names_dict, slice_geometry = \
+        ImageLoading.get_datasets(files, max_workers=1, return_geometry=True)
+    for i in range(4):
+        read_data_dict[i].SliceThickness = 1
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    patient_dict_container.set_initial_values(
+        str(tmp_path), read_data_dict, file_names_dict,
+        slice_geometry=slice_geometry)
+
+    with mock.patch("src.Model.SliceGeometry.SliceGeometry.__init__",
+                    side_effect=AssertionError("geometry read again")):
+        InitialModel.create_initial_model_batch()
+
+    assert patient_dict_container.get("slice_geometry") is slice_geometry
+    assert patient_dict_container.get("pixel_values").spacing[0] == 1.0
+    patient_dict_container.clear()
@@ -1,17 +1,22 @@
 import os
+from unittest import mock
+
 import pytest
 
 from src.Model import ROI
 from src.Model.ISO2ROI import ISO2ROI
-from src.Model.Isodose import get_dose_grid
+from src.Model.Isodose import get_dose_grid, get_dose_pixluts
 from src.Model.PatientDictContainer import PatientDictContainer
 from src.Model import ImageLoading
 
 from pathlib import Path
 from pydicom import dcmread
 from pydicom.errors import InvalidDicomError
+from pydicom.uid import generate_uid
 from skimage import measure
 
+from test_model_image_loading import create_ct_file
+
 def find_DICOM_files(file_path):
     """Function to find DICOM files in a given folder.
     :param file_path: File path of folder to search.
@@ -245,3 +250,44 @@ def test_create_rtss(test_object):
     assert rtss.StudyInstanceUID == test_ds.StudyInstanceUID
     assert rtss.Modality == 'RTSTRUCT'
     assert rtss.SOPClassUID == '1.2.840.10008.5.1.4.1.1.481.3'
+
+
+def test_generate_roi_converts_contours(tmp_path):
+    """
+    Test that generate_roi turns isodose contours in dose grid pixels
+    into RCS coordinates on the image slices.
+    """
+    series_uid = generate_uid()
+    dataset = {}
+    for i in range(4):
+        dataset[i] = dcmread(create_ct_file(str(tmp_path), "ct%s.dcm" % i,
+                                            i, series_uid))
+        dataset[i].PatientPosition = "HFS"
+        dataset[i].SliceLocation = i
+    # A dose grid of the same spacing, one pixel left of and above the
+    # images
+    rtdose = dcmread(create_ct_file(str(tmp_path), "rtdose.dcm", 0,
+                                    series_uid))
+    rtdose.ImagePositionPatient = [1, 1, 0]
+    dataset['rtdose'] = rtdose
+
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    patient_dict_container.set_initial_values(
+        str(tmp_path), dataset, {}, rois={}, pixmaps_axial=[None] * 4,
+        dict_uid={i: dataset[i].SOPInstanceUID for i in range(4)},
+        dose_pixluts=get_dose_pixluts(dataset))
+
+    # Points (row, column) of the dose grid, every second one is used
+    contours = {"ISO": [[], [[[0, 1], [1, 2], [2, 3], [3, 0]]], [], []]}
+    progress_callback = mock.Mock()
+    with mock.patch.object(ROI, "create_roi") as create_roi, \
+            mock.patch.object(ImageLoading, "get_roi_info"):
+        ISO2ROI().generate_roi(contours, progress_callback)
+
+    create_roi.assert_called_once()
+    roi_list = create_roi.call_args[0][2]
+    assert roi_list[0]['ds'] is dataset[1]
+    assert [float(coord) for coord in roi_list[0]['coords']] == \
+        [1, 0, 1, 3, 2, 1]
+    patient_dict_container.clear()
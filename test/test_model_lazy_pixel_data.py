@@ -0,0 +1,121 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+from pydicom import dcmread
+from pydicom.uid import generate_uid
+
+from src.Model import PatientDictContainer as PatientDictContainerModule
+from src.Model.CalculateImages import convert_raw_data, get_pixmaps
+from src.Model.LazyPixelData import PixelArrayCache
+from src.Model.PatientDictContainer import PatientDictContainer
+from src.Model.PixmapRenderer import get_view_slice
+from test_model_image_loading import create_ct_file
+
+SLICE_BYTES = 4 * 4 * 8
+
+
+@pytest.fixture
+def datasets(tmp_path):
+    """Read a series of CT images into a dataset dictionary."""
+    series_uid = generate_uid()
+    dataset = {}
+    for i in range(6):
+        ds = dcmread(create_ct_file(str(tmp_path), "ct%s.dcm" % i, i,
+                                    series_uid))
+        ds.RescaleSlope = 2
+        ds.RescaleIntercept = -10
+        dataset[i] = ds
+    return dataset
+
+
+def test_lazy_pixel_values_match_eager(datasets):
+    eager = {key: dcmread(ds.filename) for key, ds in datasets.items()}
+    for ds in eager.values():
+        ds.RescaleSlope = 2
+        ds.RescaleIntercept = -10
+    eager_values = convert_raw_data(eager, False, True)
+
+    cache = PixelArrayCache(2 * SLICE_BYTES)
+    lazy_values = convert_raw_data(datasets, False, True, cache)
+
+    assert cache.get_statistics()["misses"] == 0
+    assert len(lazy_values) == len(eager_values)
+    assert np.array_equal(np.array(lazy_values), np.array(eager_values))
+
+
+def test_cache_stays_within_budget(datasets):
+    cache = PixelArrayCache(2 * SLICE_BYTES)
+    convert_raw_data(datasets, False, True, cache)
+
+    for ds in datasets.values():
+        cache.get(ds)
+    statistics = cache.get_statistics()
+    assert statistics["misses"] == 6
+    assert statistics["evictions"] == 4
+    assert statistics["resident_bytes"] <= 2 * SLICE_BYTES
+
+    # An evicted slice is decoded again, rescaled, when asked for
+    assert not cache.is_resident(datasets[0])
+    assert cache.get(datasets[0])[0][0] == 0 * 2 - 10 + 1024
+    # The decoded arrays are not kept in the datasets
+    assert all(ds._pixel_array is None for ds in datasets.values())
+
+
+def test_cache_evicts_least_recently_used(datasets):
+    cache = PixelArrayCache(2 * SLICE_BYTES)
+    convert_raw_data(datasets, False, True, cache)
+
+    cache.get(datasets[0])
+    cache.get(datasets[1])
+    cache.get(datasets[0])
+    cache.get(datasets[2])
+
+    assert cache.is_resident(datasets[0])
+    assert not cache.is_resident(datasets[1])
+
+
+def test_patient_dict_container_pixel_cache(datasets):
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    patient_dict_container.set_initial_values(None, datasets, {})
+    options = {"lazy_pixel_data": True, "pixel_cache_mb": 1}
+    with mock.patch.object(PatientDictContainerModule,
+                           "get_performance_option", options.get):
+        cache = patient_dict_container.get_pixel_cache()
+    assert cache.budget_bytes == 1024 * 1024
+
+    convert_raw_data(datasets, False, True, cache)
+    assert patient_dict_container.get_pixel_array(1)[0][0] == \
+        1 * 2 - 10 + 1024
+    assert cache.is_resident(datasets[1])
+    patient_dict_container.clear()
+    assert patient_dict_container.pixel_cache is None
+    assert cache.get_statistics()["resident_bytes"] == 0
+
+
+def test_get_pixmaps_stays_within_budget(datasets, qapp):
+    eager = {key: dcmread(ds.filename) for key, ds in datasets.items()}
+    for ds in eager.values():
+        ds.RescaleSlope = 2
+        ds.RescaleIntercept = -10
+    eager_values = np.array(convert_raw_data(eager, False, True))
+
+    cache = PixelArrayCache(2 * SLICE_BYTES)
+    lazy_values = convert_raw_data(datasets, False, True, cache)
+    aspect = {"axial": 1, "coronal": 1, "sagittal": 1}
+    renderers = get_pixmaps(lazy_values, 400, 800, aspect)
+    # No slice is decoded, or copied into a volume, until it is rendered
+    assert cache.get_statistics()["misses"] == 0
+    assert [len(renderer) for renderer in renderers] == [6, 4, 4]
+
+    # Rendering every slice of every view decodes the slices one at a
+    # time
+    for renderer in renderers:
+        for i in range(len(renderer)):
+            renderer[i]
+            assert np.array_equal(renderer.get_slice(i), get_view_slice(
+                eager_values, renderer.view, i))
+    statistics = cache.get_statistics()
+    assert statistics["resident_bytes"] <= 2 * SLICE_BYTES
+    assert statistics["evictions"] > 0
@@ -0,0 +1,53 @@
+import json
+import logging
+import os
+
+import pytest
+
+from src.Model import PerformanceOptions
+from src.Model.PerformanceOptions import DEFAULT_PERFORMANCE_OPTIONS, \
+    get_performance_option, reload_performance_options
+
+
+@pytest.fixture
+def options_path(tmp_path, monkeypatch):
+    """Read the performance options from a temporary file."""
+    path = tmp_path.joinpath("performanceOptions.json")
+    monkeypatch.setattr(PerformanceOptions, "data_path",
+                        lambda file_name: str(path))
+    yield path
+    monkeypatch.undo()
+    reload_performance_options()
+
+
+def test_options_read_once(options_path):
+    options_path.write_text(json.dumps({"prefetch_slices": 3}))
+    reload_performance_options()
+    assert get_performance_option("prefetch_slices") == 3
+    assert get_performance_option("max_frame_rate") == \
+        DEFAULT_PERFORMANCE_OPTIONS["max_frame_rate"]
+
+    # The file is not read again until the options are reloaded
+    options_path.write_text(json.dumps({"prefetch_slices": 5}))
+    assert get_performance_option("prefetch_slices") == 3
+    reload_performance_options()
+    assert get_performance_option("prefetch_slices") == 5
+
+
+def test_damaged_options_logged(options_path, caplog):
+    options_path.write_text("{not json")
+    with caplog.at_level(logging.WARNING):
+        reload_performance_options()
+    assert get_performance_option("prefetch_slices") == \
+        DEFAULT_PERFORMANCE_OPTIONS["prefetch_slices"]
+    assert "performance options" in caplog.text
+
+
+def test_shipped_options_are_known():
+    path = os.path.join(os.path.dirname(__file__), os.pardir, "data",
+                        "json", "performanceOptions.json")
+    with open(path, "r") as file_input:
+        options = json.load(file_input)
+    assert set(options) <= set(DEFAULT_PERFORMANCE_OPTIONS)
+    assert all(DEFAULT_PERFORMANCE_OPTIONS[option] == value
+               for option, value in options.items())
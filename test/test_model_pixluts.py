@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from pydicom import dataset
+
+from src.Model.Isodose import get_dose_pixels, get_dose_pixluts
+from src.Model.PatientDictContainer import PatientDictContainer
+from src.Model.Pixluts import calculate_matrix, get_container_pixluts, \
+    get_pixluts
+from src.Model.SliceGeometry import get_slice_geometry
+
+
+def create_slice(uid, position, spacing=0.5, size=4):
+    img_ds = dataset.Dataset()
+    img_ds.SOPInstanceUID = uid
+    img_ds.PatientPosition = "HFS"
+    img_ds.PixelSpacing = [spacing, spacing]
+    img_ds.ImageOrientationPatient = [1, 0, 0, 0, 1, 0]
+    img_ds.ImagePositionPatient = position
+    img_ds.Rows = size
+    img_ds.Columns = size
+    return img_ds
+
+
+def test_calculate_matrix():
+    img_ds = create_slice("1", [-10.0, 20.0, 5.0])
+    img_ds.Rows = 3
+    array_x, array_y = calculate_matrix(img_ds)
+    assert np.all(array_x == np.array([-10, -9.5, -9, -8.5]))
+    assert np.all(array_y == np.array([20, 20.5, 21]))
+
+
+def test_pixluts_shared_by_geometry():
+    dict_ds = {
+        0: create_slice("1", [-10.0, 20.0, 0.0]),
+        1: create_slice("2", [-10.0, 20.0, 2.5]),
+        2: create_slice("3", [-12.0, 20.0, 5.0]),
+        "rtss": dataset.Dataset(),
+    }
+    pixluts = get_pixluts(dict_ds)
+    assert len(pixluts) == 3
+    assert pixluts.get_statistics()["looked_up"] == 0
+
+    # Slices differing only in z share their pixlut
+    assert pixluts["1"] is pixluts["2"]
+    assert pixluts["3"][0][0] == -12
+    assert pixluts.get_statistics() == \
+        {"slices": 3, "looked_up": 3, "calculated": 2}
+    with pytest.raises(ValueError):
+        pixluts["1"][0][0] = 0
+    with pytest.raises(KeyError):
+        pixluts["rtss"]
+
+
+def test_dose_pixluts():
+    dict_ds = {
+        0: create_slice("1", [-10.0, 20.0, 0.0]),
+        1: create_slice("2", [-10.0, 20.0, 2.5]),
+        "rtdose": create_slice("dose", [-8.0, 21.0, 0.0], spacing=2.0),
+    }
+    pixluts = get_pixluts(dict_ds)
+    dose_pixluts = get_dose_pixluts(dict_ds, pixluts)
+    expected = get_dose_pixels(pixluts["1"],
+                               calculate_matrix(dict_ds["rtdose"]),
+                               dict_ds[0])
+    assert np.all(dose_pixluts["1"][0] == expected[0])
+    assert np.all(dose_pixluts["1"][1] == expected[1])
+    assert dose_pixluts["2"] is dose_pixluts["1"]
+
+
+def test_container_pixluts_use_slice_geometry():
+    dict_ds = {
+        0: create_slice("1", [-10.0, 20.0, 0.0]),
+        1: create_slice("2", [-10.0, 20.0, 2.5]),
+        2: create_slice("3", [-12.0, 20.0, 5.0]),
+    }
+    expected = {img_ds.SOPInstanceUID: calculate_matrix(img_ds)
+                for img_ds in dict_ds.values()}
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    patient_dict_container.set_initial_values(
+        None, dict_ds, {},
+        slice_geometry=get_slice_geometry(list(dict_ds.values())))
+
+    # The geometry is taken from the stored table, not the datasets
+    for img_ds in dict_ds.values():
+        del img_ds.PixelSpacing
+    pixluts = get_container_pixluts(patient_dict_container)
+    assert patient_dict_container.get("pixluts") is pixluts
+    for uid, (array_x, array_y) in expected.items():
+        assert np.all(pixluts[uid][0] == array_x)
+        assert np.all(pixluts[uid][1] == array_y)
+    assert pixluts["1"] is pixluts["2"]
+    patient_dict_container.clear()
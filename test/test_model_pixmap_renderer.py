@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from src.Model.CalculateImages import get_pixmaps
+from src.Model.PixmapRenderer import PixmapCache, PixmapRenderer
+
+PIXMAP_ASPECT = {"axial": 1.0, "coronal": 2.0, "sagittal": 2.0}
+
+
+@pytest.fixture
+def volume():
+    """A volume of 10 slices of 16x8 pixels, each slice a gradient."""
+    return np.tile(np.arange(10, dtype=np.int16)[:, None, None] * 100,
+                   (1, 16, 8))
+
+
+def test_get_pixmaps_renders_on_demand(qtbot, volume):
+    axial, coronal, sagittal = get_pixmaps(volume, 400, 200, PIXMAP_ASPECT)
+    assert (len(axial), len(coronal), len(sagittal)) == (10, 16, 8)
+    assert axial.cache is coronal.cache is sagittal.cache
+    assert axial.get_statistics()["pixmaps"] == 0
+
+    pixmap = axial[3]
+    assert axial[3] is pixmap
+    assert not axial[3].isNull()
+    assert coronal[15].height() == 512
+    statistics = axial.get_statistics()
+    assert statistics["misses"] == 2
+    assert statistics["hits"] == 2
+    assert statistics["hit_rate"] == 0.5
+    assert statistics["resident_bytes"] > 0
+
+    with pytest.raises(KeyError):
+        axial[10]
+    assert 10 not in axial
+    assert list(sagittal) == list(range(8))
+
+
+def test_cache_evicts_least_recently_used(qtbot, volume):
+    renderer = PixmapRenderer(volume, "axial", 400, 200, 64, 64)
+    pixmap_bytes = renderer[0].width() * renderer[0].height() \
+        * renderer[0].depth() // 8
+    renderer.cache = PixmapCache(3 * pixmap_bytes)
+
+    for i in [0, 1, 2, 0, 3]:
+        renderer[i]
+    statistics = renderer.get_statistics()
+    assert statistics["evictions"] == 1
+    assert statistics["resident_bytes"] == 3 * pixmap_bytes
+    # Slice 1 was the least recently used
+    assert (renderer, 1) not in renderer.cache._pixmaps
+    assert (renderer, 0) in renderer.cache._pixmaps
+
+
+def test_invalidate_renders_again(qtbot, volume):
+    renderer = PixmapRenderer(volume, "axial", 800, 1, 8, 16)
+    before = renderer[5].toImage()
+    volume[5] = np.arange(8, dtype=np.int16) * 1000
+
+    # The cached pixmap is shown until the slice is invalidated
+    assert renderer[5].toImage() == before
+    renderer.invalidate([5])
+    assert renderer[5].toImage() != before
+    renderer.invalidate()
+    assert renderer.get_statistics()["resident_bytes"] == 0
+
+
+def test_set_window_drops_rendered_pixmaps(qtbot, volume):
+    axial, coronal, _ = get_pixmaps(volume, 400, 200, PIXMAP_ASPECT)
+    before = axial[5].toImage()
+    coronal[0]
+
+    axial.set_window(400, 200)
+    assert axial.get_statistics()["pixmaps"] == 2
+    axial.set_window(100, 450)
+    # Only the pixmaps of the renderer whose window changed are dropped
+    assert axial.get_statistics()["pixmaps"] == 1
+    assert axial[5].toImage() != before
+
+
+def test_preview(qtbot, volume):
+    renderer = PixmapRenderer(volume, "axial", 400, 200, 1024, 512)
+    renderer.preview_size = 256
+    assert renderer.get_preview_level() == 2
+
+    preview = renderer.preview(3)
+    assert (preview.width(), preview.height()) == (256, 128)
+    assert renderer.preview(3) is preview
+    assert renderer.get_statistics()["resident_bytes"] == 256 * 128 * 4
+
+    # The full resolution pixmap is shown once it has been rendered
+    pixmap = renderer[3]
+    assert renderer.preview(3) is pixmap
+    renderer.invalidate([3])
+    assert renderer.get_statistics()["pixmaps"] == 0
+
+    renderer.preview_size = 0
+    assert renderer.get_preview_level() == 0
+    assert renderer.preview(4).width() == 1024
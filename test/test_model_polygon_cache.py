@@ -0,0 +1,97 @@
+from PySide6 import QtCore, QtGui
+
+from src.Model.PolygonCache import IsodoseCache, PolygonCache, \
+    get_modified_roi_names, polygons_bytes
+
+
+def create_polygons(slices, points):
+    polygon = QtGui.QPolygonF([QtCore.QPointF(i, i) for i in range(points)])
+    return {slice_id: [polygon] for slice_id in range(slices)}
+
+
+def test_polygon_cache_get_put():
+    cache = PolygonCache(budget_bytes=1024 * 1024)
+    rtss = object()
+    cache.use_rtss(rtss)
+    polygons = create_polygons(3, 10)
+    assert cache.get("BODY", "coronal", 1.5) is None
+    cache.put("BODY", "coronal", 1.5, polygons)
+    assert cache.get("BODY", "coronal", 1.5) is polygons
+    # Another aspect or view is a miss
+    assert cache.get("BODY", "coronal", 2.0) is None
+    assert cache.get("BODY", "sagittal", 1.5) is None
+
+    # The same RTSS keeps the polygons, a new one discards them
+    cache.use_rtss(rtss)
+    assert cache.get("BODY", "coronal", 1.5) is polygons
+    cache.use_rtss(object())
+    assert cache.get("BODY", "coronal", 1.5) is None
+    assert cache.get_statistics()["entries"] == 0
+
+
+def test_polygon_cache_invalidate():
+    cache = PolygonCache(budget_bytes=1024 * 1024)
+    cache.use_rtss(object())
+    for roi_name in ("BODY", "HEART", "LUNG"):
+        for view in ("axial", "coronal"):
+            cache.put(roi_name, view, None, create_polygons(2, 4))
+
+    # Editing an ROI only discards its polygons, for the edited RTSS
+    edited_rtss = object()
+    cache.invalidate(edited_rtss, ["HEART"])
+    cache.use_rtss(edited_rtss)
+    assert cache.get("HEART", "axial") is None
+    assert cache.get("BODY", "axial") is not None
+    assert cache.get("LUNG", "coronal") is not None
+
+    cache.invalidate(object())
+    assert cache.get_statistics()["entries"] == 0
+
+
+def test_polygon_cache_eviction():
+    polygons = create_polygons(10, 100)
+    size = polygons_bytes(polygons)
+    cache = PolygonCache(budget_bytes=size * 2)
+    cache.use_rtss(object())
+    cache.put("BODY", "axial", None, polygons)
+    cache.put("HEART", "axial", None, create_polygons(10, 100))
+    # BODY becomes the most recently used, so HEART is evicted
+    cache.get("BODY", "axial")
+    cache.put("LUNG", "axial", None, create_polygons(10, 100))
+    assert cache.get("HEART", "axial") is None
+    assert cache.get("BODY", "axial") is polygons
+    statistics = cache.get_statistics()
+    assert statistics["evictions"] == 1
+    assert statistics["resident_bytes"] == size * 2
+
+
+def test_isodose_cache():
+    polygons = create_polygons(4, 100)
+    size = polygons_bytes(polygons)
+    cache = IsodoseCache(budget_bytes=size * 2)
+    rtdose = object()
+    cache.use_dose(rtdose, 7000)
+    for slider_id in range(3):
+        cache.put_slice(slider_id, create_polygons(4, 100))
+    # The isodoses of the least recently shown slice are evicted
+    assert cache.get_slice(0) is None
+    assert cache.get_slice(2) is not None
+    assert cache.get_statistics()["resident_bytes"] == size * 2
+
+    # The same dose keeps the polygons, another prescription discards them
+    revision = cache.rtss_revision
+    cache.use_dose(rtdose, 7000)
+    assert cache.get_slice(2) is not None
+    cache.use_dose(rtdose, 6000)
+    assert cache.rtss_revision != revision
+    assert cache.get_slice(2) is None
+
+
+def test_get_modified_roi_names():
+    assert get_modified_roi_names({"draw": "AORTA"}) == ["AORTA"]
+    assert get_modified_roi_names({"rename": ["TOOTH", "TEETH"]}) \
+        == ["TOOTH", "TEETH"]
+    assert get_modified_roi_names({"delete": ["TEETH", "MAXILLA"]}) \
+        == ["TEETH", "MAXILLA"]
+    assert get_modified_roi_names({"draw": None}) is None
+    assert get_modified_roi_names({"transfer": None}) is None
@@ -0,0 +1,70 @@
+import threading
+
+import numpy as np
+import pytest
+from pydicom.uid import generate_uid
+
+from src.Model import ImageLoading
+from src.Model.CalculateImages import convert_raw_data
+from src.Model.ProgressiveLoading import ProgressiveImageLoader, \
+    get_loading_order
+from test_model_image_loading import create_ct_file
+
+
+class ProgressSignal:
+    """Stands in for a Worker's progress signal."""
+
+    def __init__(self):
+        self.updates = []
+
+    def emit(self, progress):
+        self.updates.append(progress)
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Write a series of 20 CT images."""
+    series_uid = generate_uid()
+    return [create_ct_file(str(tmp_path), "ct%s.dcm" % i, i, series_uid)
+            for i in range(20)]
+
+
+def test_loading_order_starts_at_centre():
+    assert get_loading_order(6) == [3, 4, 2, 5, 1, 0]
+    assert get_loading_order(5, centre=0) == [0, 1, 2, 3, 4]
+    assert sorted(get_loading_order(301)) == list(range(301))
+
+
+def test_progressive_loader_matches_convert_raw_data(files):
+    read_data_dict, _ = ImageLoading.get_datasets(
+        files, max_workers=1, read_pixel_data=False)
+    loader = ProgressiveImageLoader(read_data_dict, True, first_slices=3)
+
+    volume = loader.load_first_slices()
+    assert list(np.flatnonzero(loader.loaded)) == [9, 10, 11]
+    assert not loader.is_complete()
+    assert np.all(volume.axial(0) == 0)
+
+    progress = ProgressSignal()
+    assert loader.load_remaining(threading.Event(), progress)
+    assert loader.is_complete()
+    assert progress.updates[0][2] == [12, 8, 13, 7, 14, 6, 15, 5]
+    assert progress.updates[-1][1] == 100
+    assert sum(len(update[2]) for update in progress.updates) == 17
+
+    expected = convert_raw_data(
+        ImageLoading.get_datasets(files, max_workers=1)[0], False, True)
+    assert np.array_equal(np.asarray(volume), np.asarray(expected))
+    # The datasets' pixel arrays are views of the volume
+    assert np.shares_memory(read_data_dict[0]._pixel_array, volume.voxels)
+
+
+def test_progressive_loader_cancel(files):
+    read_data_dict, _ = ImageLoading.get_datasets(
+        files, read_pixel_data=False)
+    loader = ProgressiveImageLoader(read_data_dict, True, first_slices=1)
+    loader.load_first_slices()
+    loader.cancel()
+
+    assert not loader.load_remaining()
+    assert np.count_nonzero(loader.loaded) == 1
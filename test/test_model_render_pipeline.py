@@ -0,0 +1,61 @@
+import threading
+
+import numpy as np
+
+from src.Model.CalculateImages import get_pixmaps
+from src.Model.RenderPipeline import RenderPipeline
+
+PIXMAP_ASPECT = {"axial": 1.0, "coronal": 1.0, "sagittal": 1.0}
+
+
+def create_renderer():
+    rng = np.random.default_rng(0)
+    volume = rng.integers(0, 2000, (20, 16, 16)).astype(np.int16)
+    return get_pixmaps(volume, 400, 800, PIXMAP_ASPECT)[0]
+
+
+def test_pixmaps_rendered_in_background(qtbot):
+    renderer = create_renderer()
+    pipeline = RenderPipeline(max_workers=2, max_pending=3)
+    ready = []
+    pipeline.pixmap_ready.connect(
+        lambda pixmaps, index: ready.append(index))
+
+    pipeline.submit_renderer(renderer, range(len(renderer)))
+    qtbot.waitUntil(pipeline.is_idle)
+
+    statistics = pipeline.get_statistics()
+    assert statistics["rendered"] == len(renderer)
+    assert statistics["peak_pending"] <= 3
+    assert sorted(ready) == list(range(len(renderer)))
+    # The pixmaps are stored in the cache of the renderer
+    assert renderer.get_statistics()["pixmaps"] == len(renderer)
+    assert renderer[5].toImage() == renderer.render(5).toImage()
+
+
+def test_cancelled_requests_not_stored(qtbot):
+    renderer = create_renderer()
+    pipeline = RenderPipeline(max_workers=1, max_pending=1)
+    interrupt_flag = threading.Event()
+    interrupt_flag.set()
+    pipeline.submit_renderer(renderer, range(len(renderer)),
+                             interrupt_flag)
+    pixmaps = {}
+    pipeline.submit(pixmaps, 0, lambda: None)
+    qtbot.waitUntil(pipeline.is_idle)
+
+    assert pipeline.get_statistics()["cancelled"] == len(renderer) + 1
+    assert renderer.get_statistics()["pixmaps"] == 0
+    assert pixmaps == {}
+
+
+def test_new_window_cancels_requests(qtbot):
+    renderer = create_renderer()
+    pipeline = RenderPipeline(max_workers=1, max_pending=1)
+    pipeline.submit_renderer(renderer, range(len(renderer)))
+    renderer.set_window(200, 900)
+    qtbot.waitUntil(pipeline.is_idle)
+
+    # No pixmap of the previous window is left in the cache
+    assert renderer.get_statistics()["pixmaps"] == 0
+    assert pipeline.get_statistics()["cancelled"] == len(renderer)
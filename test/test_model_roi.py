@@ -14,7 +14,8 @@ from pydicom.tag import Tag
 from src.Model import ImageLoading
 from src.Model.PatientDictContainer import PatientDictContainer
 from src.Model.ROI import add_to_roi, calculate_matrix, create_roi, roi_to_geometry, \
-    get_roi_contour_pixel, manipulate_rois, geometry_to_roi, create_initial_rtss_from_ct
+    get_roi_contour_pixel, manipulate_rois, geometry_to_roi, create_initial_rtss_from_ct, \
+    calculate_pixels
 
 
 def find_DICOM_files(file_path):
@@ -102,6 +103,31 @@ def test_calculate_matrix():
     assert np.all(array_y == np.array([0, 1, 2, 3]))
 
 
+def test_calculate_pixels():
+    rng = np.random.default_rng(0)
+    # Coordinates inside, outside and exactly on the pixels
+    contour = np.stack([
+        np.concatenate([rng.uniform(-60, 60, 200), np.arange(-50, 50, 5)]),
+        np.concatenate([rng.uniform(-60, 60, 200), np.arange(-50, 50, 5)]),
+        np.zeros(220)], axis=1).ravel().tolist()
+    axes = [np.arange(-50, 50, 2.5), np.arange(50, -50, -2.5),
+            rng.uniform(-50, 50, 40)]
+    for pixlut in zip(axes, axes[::-1]):
+        np_x, np_y = pixlut
+        for prone, feetfirst in [(False, False), (False, True), (True, False)]:
+            # The pixels found by comparing with every pixel of the axes
+            expected = []
+            for i in range(0, len(contour), 3):
+                x_past = np_x >= contour[i] if prone or feetfirst \
+                    else np_x > contour[i]
+                y_past = np_y >= contour[i + 1] if prone \
+                    else np_y > contour[i + 1]
+                expected.append([np.argmax(x_past), np.argmax(y_past)])
+            pixels = calculate_pixels(
+                [list(np_x), list(np_y)], contour, prone, feetfirst)
+            assert pixels == expected
+
+
 def test_add_to_roi():
     rt_ss = dataset.Dataset()
 
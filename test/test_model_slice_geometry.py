@@ -0,0 +1,85 @@
+import logging
+
+import numpy as np
+from pydicom.dataset import Dataset
+from pydicom.uid import generate_uid
+
+from src.Model import ImageLoading
+from src.Model.SliceGeometry import get_slice_geometry
+
+
+def create_slice(z_position, x_position=0.0,
+                 orientation=(1, 0, 0, 0, 1, 0)):
+    """
+    :param z_position: Z coordinate of the ImagePositionPatient.
+    :param x_position: X coordinate of the ImagePositionPatient.
+    :param orientation: ImageOrientationPatient of the slice.
+    :return: Dataset with the geometry attributes of an image slice.
+    """
+    ds = Dataset()
+    ds.SOPInstanceUID = generate_uid()
+    ds.ImageOrientationPatient = list(orientation)
+    ds.ImagePositionPatient = [x_position, 0.0, z_position]
+    ds.PixelSpacing = [0.5, 0.5]
+    ds.Rows = 4
+    ds.Columns = 4
+    return ds
+
+
+def test_geometry_sorts_stack_by_descending_displacement():
+    z_positions = [7.5, -2.5, 0.0, 5.0, 2.5]
+    geometry = get_slice_geometry([create_slice(z) for z in z_positions])
+    sorted_geometry = geometry.take(geometry.stack_order())
+
+    assert list(sorted_geometry.positions[:, 2]) == [7.5, 5.0, 2.5, 0.0,
+                                                     -2.5]
+    assert sorted_geometry.slice_spacing() == 2.5
+    assert sorted_geometry.get_anomalies() == []
+    assert np.array_equal(sorted_geometry.pixel_spacings[0], [0.5, 0.5])
+
+
+def test_geometry_reports_anomalies():
+    irregular = get_slice_geometry(
+        [create_slice(z) for z in [10.0, 7.5, 5.0, 0.0]])
+    assert irregular.get_anomalies() == \
+        ["Irregular slice spacing (2.500 mm to 5.000 mm)"]
+
+    duplicated = get_slice_geometry(
+        [create_slice(z) for z in [5.0, 2.5, 2.5, 0.0]])
+    assert duplicated.get_anomalies() == \
+        ["1 slices share a position with another slice"]
+
+    # The slices move along X as well as Z, by tan(45) of the spacing
+    tilted = get_slice_geometry(
+        [create_slice(z, x_position=z) for z in [5.0, 2.5, 0.0]])
+    assert tilted.get_anomalies() == ["Gantry tilt of 45.00 degrees"]
+
+
+def test_image_stack_sort_keeps_order_of_ties(caplog):
+    slices = [create_slice(z) for z in [0.0, 5.0, 0.0, 2.5]]
+    read_data_dict = dict(enumerate(slices))
+    read_data_dict["rtss"] = Dataset()
+    file_names_dict = {key: "file%s" % key for key in read_data_dict}
+
+    with caplog.at_level(logging.WARNING):
+        sorted_data, sorted_files = \
+            ImageLoading.image_stack_sort(read_data_dict, file_names_dict)
+
+    assert list(sorted_files.values()) == \
+        ["file1", "file3", "file0", "file2", "filertss"]
+    assert sorted_data[2] is slices[0]
+    assert sorted_data["rtss"] is read_data_dict["rtss"]
+    assert "share a position" in caplog.text
+
+
+def test_image_stack_sort_returns_sorted_geometry():
+    slices = [create_slice(z) for z in [0.0, 5.0, 2.5]]
+    read_data_dict = dict(enumerate(slices))
+    file_names_dict = {key: "file%s" % key for key in read_data_dict}
+
+    sorted_data, _, geometry = ImageLoading.image_stack_sort(
+        read_data_dict, file_names_dict, return_geometry=True)
+
+    assert list(geometry.positions[:, 2]) == [5.0, 2.5, 0.0]
+    assert geometry.uids == [sorted_data[i].SOPInstanceUID
+                             for i in range(3)]
@@ -0,0 +1,55 @@
+import functools
+
+import numpy as np
+
+from src.Model.CalculateImages import get_pixmaps
+from src.Model.PixmapRenderer import PixmapCache
+from src.Model.RenderPipeline import RenderPipeline
+from src.Model.SlicePrefetcher import SlicePrefetcher
+
+PIXMAP_ASPECT = {"axial": 1.0, "coronal": 1.0, "sagittal": 1.0}
+
+
+def create_renderer():
+    rng = np.random.default_rng(0)
+    volume = rng.integers(0, 2000, (40, 16, 16)).astype(np.int16)
+    return get_pixmaps(volume, 400, 800, PIXMAP_ASPECT)[0]
+
+
+def test_prefetch_follows_slider(qtbot):
+    renderer = create_renderer()
+    pipeline = RenderPipeline(max_workers=2, max_pending=4)
+    prefetcher = SlicePrefetcher(pipeline, max_slices=6)
+    overlays = []
+
+    # Both neighbours until the slider moves
+    assert prefetcher.slice_changed(renderer, 10, now=0.0) == [11, 9]
+    # Scrolling down slowly, then quickly
+    assert prefetcher.slice_changed(renderer, 9, now=1.0) == [8, 7]
+    indices = prefetcher.slice_changed(
+        renderer, 7, lambda i: functools.partial(overlays.append, i),
+        now=1.1)
+    assert indices == [6, 5, 4, 3, 2, 1]
+    qtbot.waitUntil(pipeline.is_idle)
+    assert all((renderer, i) in renderer.cache for i in indices)
+    qtbot.waitUntil(lambda: len(overlays) == len(indices))
+    assert sorted(overlays) == sorted(indices)
+
+    # Reversing the direction starts again from the new speed
+    assert prefetcher.slice_changed(renderer, 8, now=3.0) == [9, 10]
+
+
+def test_prefetch_cancelled_and_bounded(qtbot):
+    renderer = create_renderer()
+    pipeline = RenderPipeline(max_workers=1, max_pending=1)
+    prefetcher = SlicePrefetcher(pipeline, max_slices=8)
+    prefetcher.slice_changed(renderer, 20, now=0.0)
+    prefetcher.slice_changed(renderer, 30, now=0.1)
+    # Moving again cancels the slices not rendered yet
+    prefetcher.slice_changed(renderer, 31, now=0.2)
+    qtbot.waitUntil(pipeline.is_idle)
+    assert pipeline.get_statistics()["cancelled"] > 0
+
+    # Only half of the cache is used for prefetching
+    renderer.cache = PixmapCache(3 * 512 * 512 * 4)
+    assert prefetcher.slice_changed(renderer, 32, now=0.3) == [33]
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from src.Model.WindowingLUT import apply_window, get_window_lut, lut_indices
+
+
+def window_arithmetic(np_pixels, window, level):
+    """The windowing scaled_pixmap did before it used lookup tables."""
+    np_pixels = np_pixels.astype(np.int16)
+    np_pixels = (np_pixels - level) / window * 255
+    np_pixels[np_pixels < 0] = 0
+    np_pixels[np_pixels > 255] = 255
+    return np_pixels.astype(np.int8).view(np.uint8)
+
+
+@pytest.mark.parametrize("dtype", [np.int16, np.int32, np.float64])
+@pytest.mark.parametrize("window,level", [(400, 800), (1500, -1024.5)])
+def test_apply_window_matches_arithmetic(dtype, window, level):
+    rng = np.random.default_rng(0)
+    pixels = rng.normal(0, 1500, (4, 32, 32)).astype(dtype)
+
+    windowed = apply_window(pixels, window, level)
+    assert windowed.dtype == np.uint8
+    assert np.array_equal(windowed, window_arithmetic(pixels, window, level))
+    # A slab gives the same values as the whole volume
+    assert np.array_equal(apply_window(pixels[1:3], window, level),
+                          windowed[1:3])
+
+
+def test_window_lut_is_cached_and_read_only():
+    lut = get_window_lut(400, 800)
+    assert get_window_lut(400, 800) is lut
+    assert not lut.flags.writeable
+    assert lut[lut_indices(np.int16(-1))] == 0
+    assert lut[lut_indices(np.int16(1200))] == 255
+
+
+def test_apply_window_transposed_and_scaled():
+    pixels = np.arange(24, dtype=np.int16).reshape(2, 3, 4) * 10
+    windowed = apply_window(pixels.transpose(), 200, 20, scale=1.0,
+                            dtype=np.float32)
+    assert windowed.shape == (4, 3, 2)
+    assert windowed.flags.c_contiguous
+    assert np.allclose(windowed.transpose(),
+                       np.clip((pixels - 20) / 200, 0, 1))
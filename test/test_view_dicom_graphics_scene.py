@@ -0,0 +1,86 @@
+import numpy as np
+from PySide6 import QtCore, QtGui
+
+from src.Model.CalculateImages import get_pixmaps
+from src.Model.PatientDictContainer import PatientDictContainer
+from src.View.mainpage.DicomCoronalView import DicomCoronalView
+from src.View.mainpage.DicomGraphicsScene import GraphicsScene
+from src.View.mainpage.UpdateScheduler import get_update_scheduler
+from src.View.mainpage.DicomSagittalView import DicomSagittalView
+
+PIXMAP_ASPECT = {"axial": 1.0, "coronal": 1.0, "sagittal": 1.0}
+
+
+def square(offset):
+    return QtGui.QPolygonF([QtCore.QPointF(offset + x, offset + y)
+                            for x, y in ((0, 0), (4, 0), (4, 4), (0, 4))])
+
+
+def test_scene_items_updated_in_place(qtbot):
+    rng = np.random.default_rng(0)
+    volume = rng.integers(0, 2000, (12, 6, 10)).astype(np.int16)
+    pixmaps = get_pixmaps(volume, 400, 800, PIXMAP_ASPECT)
+    # ROI 1 has the same polygon on every coronal slice
+    polygons = {"ROI 1": [[square(1)]] * 6,
+                "ROI 2": [[square(i)] for i in range(6)]}
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    patient_dict_container.set_initial_values(
+        None, {}, {}, pixmaps_axial=pixmaps[0], pixmaps_coronal=pixmaps[1],
+        pixmaps_sagittal=pixmaps[2],
+        rois={1: {"name": "ROI 1"}, 2: {"name": "ROI 2"}},
+        selected_rois=[1],
+        roi_color_dict={1: QtGui.QColor(255, 0, 0),
+                        2: QtGui.QColor(0, 255, 0)},
+        dict_polygons_coronal=polygons)
+
+    sagittal = DicomSagittalView(cut_line_color=QtGui.QColor(255, 0, 0))
+    coronal = DicomCoronalView(roi_color={},
+                               cut_line_color=QtGui.QColor(0, 0, 255))
+    qtbot.addWidget(sagittal)
+    qtbot.addWidget(coronal)
+    coronal.set_views(sagittal, sagittal)
+    scene = coronal.scene
+    assert coronal.view.scene() is scene
+    roi_items = list(scene.roi_layer.items)
+    lines = (scene.horizontal_line, scene.vertical_line)
+    assert len(roi_items) == 1
+
+    # A new slice with the same ROI polygons keeps the ROI items
+    coronal.slider.setValue(2)
+    get_update_scheduler().flush()
+    assert coronal.scene is scene
+    assert scene.pixmap is pixmaps[1][2]
+    assert scene.roi_layer.items == roi_items
+    assert (scene.horizontal_line, scene.vertical_line) == lines
+
+    # Moving the cut lines moves the same line items
+    line = scene.vertical_line.line()
+    sagittal.slider.setValue(0)
+    coronal.update_view()
+    assert scene.vertical_line is lines[1]
+    assert scene.vertical_line.line() != line
+
+    # Selecting another ROI rebuilds the ROI layer
+    patient_dict_container.set("selected_rois", [1, 2])
+    coronal.update_view()
+    assert len(scene.roi_layer.items) == 2
+    assert roi_items[0] not in scene.roi_layer.items
+    assert len(scene.items()) == 5
+
+    get_update_scheduler().clear()
+    patient_dict_container.clear()
+
+
+def test_preview_stretched_to_image_size(qtbot):
+    scene = GraphicsScene()
+    pixmap = QtGui.QPixmap(64, 32)
+    scene.set_pixmap(pixmap)
+    assert (scene.init_width, scene.init_height) == (64, 32)
+
+    # A preview of a quarter of the resolution covers the same rect
+    scene.set_pixmap(QtGui.QPixmap(16, 8), QtCore.QSize(64, 32))
+    assert scene.sceneRect() == QtCore.QRectF(0, 0, 64, 32)
+    scene.set_pixmap(pixmap, QtCore.QSize(64, 32))
+    assert scene.label.transform().isIdentity()
+    assert scene.sceneRect() == QtCore.QRectF(0, 0, 64, 32)
@@ -6,6 +6,7 @@ from src.Model.PatientDictContainer import PatientDictContainer
 from src.View.ImageLoader import ImageLoading
 from src.Model.GetPatientInfo import DicomTree
 
+from PySide6.QtCore import QModelIndex
 from pydicom import dcmread
 from pydicom.errors import InvalidDicomError
 from pathlib import Path
@@ -32,26 +33,33 @@ def get_dicom_files(directory):
     return dicom_files
 
 
-def recursive_search(dict_tree, parent):
+def recursive_search(dict_tree, model, parent):
     """
     Recursive Function to test all rows match the data from the dictionary
     :param dict_tree: The dictionary to be compared to
-    :param parent: Parent node of the DICOM Tree
+    :param model: Model of the DICOM Tree
+    :param parent: Index of the parent node of the DICOM Tree
     """
     count = 0  # Keep track of rows
     for key in dict_tree:
         value = dict_tree[key]  # get value from dict tree
+        child = model.index(count, 0, parent)
         if isinstance(value, type(dict_tree)):  # if dict_tree object in row
-            child = parent.child(count)
-            recursive_search(value, child)
+            # Sequences and sequence items are expanded on demand
+            assert model.data(child) == key
+            recursive_search(value, model, child)
         else:
             # Check row matches
-            assert parent.child(count, 0).text() == key
-            assert parent.child(count, 1).text() == str(value[0])
-            assert parent.child(count, 2).text() == str(value[1])
-            assert parent.child(count, 3).text() == str(value[2])
-            assert parent.child(count, 4).text() == str(value[3])
+            text = [model.data(model.index(count, column, parent))
+                    for column in range(5)]
+            assert text[0] == key
+            assert text[1] == str(value[0]) or text[1].endswith(
+                "(%s values)" % value[2])
+            assert text[2] == str(value[1])
+            assert text[3] == str(value[2])
+            assert text[4] == str(value[3])
         count += 1
+    assert model.rowCount(parent) == count
     return count
 
 
@@ -125,27 +133,23 @@ def test_file_components(test_obj):
         current_text = test_obj.dicom_tree.selector.currentText()
 
         # Make New Tree to compare
+        filepaths = test_obj.dicom_tree.patient_dict_container.filepaths
         if i > len(test_obj.dicom_tree.special_files):
             index = i - len(test_obj.dicom_tree.special_files) - 1
-            name = test_obj.dicom_tree.patient_dict_container.filepaths[index]
-            dicom_tree_slice = DicomTree(name)
-            dict_tree = dicom_tree_slice.dict
+            dict_tree = DicomTree(filepaths[index]).dict
             text = "Image Slice " + str(index + 1)
             assert current_text == text
 
         elif test_obj.dicom_tree.special_files[i - 1] == "rtss":
-            dict_tree = test_obj.dicom_tree.patient_dict_container.get(
-                "dict_dicom_tree_rtss")
+            dict_tree = DicomTree(filepaths["rtss"]).dict
             assert current_text == "RT Structure Set"
 
         elif test_obj.dicom_tree.special_files[i - 1] == "rtdose":
-            dict_tree = test_obj.dicom_tree.patient_dict_container.get(
-                "dict_dicom_tree_rtdose")
+            dict_tree = DicomTree(filepaths["rtdose"]).dict
             assert current_text == "RT Dose"
 
         elif test_obj.dicom_tree.special_files[i - 1] == "rtplan":
-            dict_tree = test_obj.dicom_tree.patient_dict_container.get(
-                "dict_dicom_tree_rtplan")
+            dict_tree = DicomTree(filepaths["rtplan"]).dict
             assert current_text == "RT Plan"
 
         else:
@@ -153,6 +157,7 @@ def test_file_components(test_obj):
             print("Error filename in update_tree function")
 
         # Loop Through Each Row
-        parent = test_obj.dicom_tree.model_tree.invisibleRootItem()
-        total_count = test_obj.dicom_tree.model_tree.rowCount()
-        assert recursive_search(dict_tree, parent) == total_count
+        model = test_obj.dicom_tree.model_tree
+        total_count = model.rowCount()
+        assert recursive_search(dict_tree, model, QModelIndex()) == \
+            total_count
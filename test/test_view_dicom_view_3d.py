@@ -0,0 +1,37 @@
+import numpy as np
+
+from src.Model.PatientDictContainer import PatientDictContainer
+from src.View.mainpage.DicomView3D import DicomView3D
+
+
+def test_window_level_updates_transfer_functions(qtbot):
+    rng = np.random.default_rng(0)
+    pixel_values = rng.integers(0, 2000, (6, 8, 10)).astype(np.int16)
+    patient_dict_container = PatientDictContainer()
+    patient_dict_container.clear()
+    patient_dict_container.set_initial_values(
+        None, {}, {}, pixel_values=pixel_values, window=400, level=800)
+
+    view = DicomView3D()
+    qtbot.addWidget(view)
+    view.initialize_volume_color()
+    view.convert_pixel_values_to_vtk_3d_array()
+    depth_array = view.depth_array
+    assert view.shape == (6, 8, 10)
+    # VTK reads the pixel values in Fortran order
+    assert depth_array.GetValue(1) == pixel_values[1, 0, 0]
+    assert depth_array.GetValue(6) == pixel_values[0, 1, 0]
+
+    # The opacity rises from the bottom of the window to its centre
+    opacity = view.volume_scalar_opacity
+    assert opacity.GetValue(700) == 0
+    assert opacity.GetValue(1000) > 0.9
+
+    patient_dict_container.set("window", 200)
+    patient_dict_container.set("level", 1500)
+    view.update_volume_by_window_level()
+    assert opacity.GetValue(1000) == 0
+    assert opacity.GetValue(1600) > 0.9
+    assert view.depth_array is depth_array
+
+    patient_dict_container.clear()
@@ -0,0 +1,60 @@
+import pytest
+import shiboken6
+from PySide6 import QtWidgets
+
+from src.View.mainpage.UpdateScheduler import UpdateScheduler
+
+
+class View:
+    def __init__(self):
+        self.updates = 0
+
+    def update_view(self):
+        self.updates += 1
+
+
+def test_updates_coalesced_per_frame(qtbot):
+    scheduler = UpdateScheduler(max_frame_rate=20)
+    view, linked_view = View(), View()
+    # A slider passing through 10 values before the next frame
+    for _ in range(10):
+        scheduler.request_update(view)
+        scheduler.request_update(linked_view)
+    qtbot.waitUntil(lambda: scheduler.get_statistics()["frames"] == 1)
+    assert (view.updates, linked_view.updates) == (1, 1)
+
+    # The next frame waits for the frame interval
+    scheduler.request_update(view)
+    assert scheduler.timer.remainingTime() > 0
+    # A view updated directly is not updated again
+    scheduler.discard(view)
+    scheduler.flush()
+    assert view.updates == 1
+
+    assert scheduler.get_statistics() == {
+        "requested": 21, "coalesced": 19, "rendered": 2, "frames": 1,
+        "pending": 0}
+
+
+def test_deleted_views_skipped(qtbot):
+    scheduler = UpdateScheduler(max_frame_rate=0)
+    widget = QtWidgets.QWidget()
+    widget.update_view = lambda: None
+    view = View()
+    scheduler.request_update(widget)
+    scheduler.request_update(view)
+    shiboken6.delete(widget)
+    scheduler.flush()
+    assert view.updates == 1
+    assert scheduler.get_statistics()["rendered"] == 1
+
+
+def test_update_errors_propagate(qtbot):
+    class FailingView:
+        def update_view(self):
+            raise RuntimeError("drawing failed")
+
+    scheduler = UpdateScheduler(max_frame_rate=0)
+    scheduler.request_update(FailingView())
+    with pytest.raises(RuntimeError):
+        scheduler.flush()